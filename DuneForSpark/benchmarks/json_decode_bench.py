@@ -0,0 +1,102 @@
+import sys
+import os
+import argparse
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.payloads import encode, make_label_payload, make_portfolio_payload
+from services.common.json_decoder import (
+    JSON_DECODERS,
+    exact_loads,
+    get_json_loads,
+    portfolio_loads,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare JSON decoders on Arkham response bodies"
+    )
+    parser.add_argument(
+        "--payload",
+        action="append",
+        default=[],
+        help="Path of a recorded response body to benchmark (can be repeated); "
+        "synthetic portfolio and label payloads are used when omitted",
+    )
+    parser.add_argument(
+        "--tokens-per-chain",
+        type=int,
+        default=50,
+        help="Token entries per chain in the synthetic portfolio payload",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Timing rounds per decoder"
+    )
+    parser.add_argument(
+        "--number", type=int, default=200, help="Decodes per timing round"
+    )
+    return parser.parse_args()
+
+
+def load_payloads(args) -> dict:
+    """
+    Collect the raw response bodies to decode, keyed by display name.
+    """
+    if args.payload:
+        payloads = {}
+        for path in args.payload:
+            with open(path, "rb") as f:
+                payloads[os.path.basename(path)] = f.read()
+        return payloads
+
+    return {
+        "portfolio": encode(make_portfolio_payload(args.tokens_per_chain)),
+        "label": encode(make_label_payload()),
+    }
+
+
+def available_decoders() -> dict:
+    """
+    Return the decoders that can run in this environment, including the
+    exact and portfolio decoders the API clients use for portfolio bodies.
+    """
+    decoders = {}
+    for backend in JSON_DECODERS:
+        try:
+            decoders[backend] = get_json_loads(backend)
+        except ImportError:
+            print(f"⚠️ Skipping {backend}: not installed")
+    decoders["exact"] = exact_loads  # Every number kept exact
+    decoders["portfolio"] = portfolio_loads  # Used by ArkhamApi for portfolio bodies
+    return decoders
+
+
+def main():
+    args = parse_args()
+    payloads = load_payloads(args)
+    decoders = available_decoders()
+    print(f"Default decoder: {get_json_loads().__name__}")
+
+    for name, body in payloads.items():
+        print(f"\n📦 {name}: {len(body) / 1024:.1f} KB")
+        baseline = None
+        for backend, decode in decoders.items():
+            decode(body)  # Warm up and fail fast on invalid payloads
+            best = min(
+                timeit.repeat(
+                    lambda: decode(body), repeat=args.repeat, number=args.number
+                )
+            )
+            per_call_us = best / args.number * 1_000_000
+            throughput = len(body) * args.number / best / (1024 * 1024)
+            if baseline is None:
+                baseline = per_call_us
+            print(
+                f"  {backend:<9} {per_call_us:10.1f} µs/decode  "
+                f"{throughput:8.1f} MB/s  {baseline / per_call_us:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
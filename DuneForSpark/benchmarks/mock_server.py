@@ -0,0 +1,451 @@
+import sys
+import os
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.payloads import encode, make_label_payload, make_portfolio_payload
+
+# Routes served by the mock, matched against the request path
+ROUTES = [
+    ("portfolio", "GET", re.compile(r"^/portfolio/address/([^/]+)$")),
+    ("intelligence", "GET", re.compile(r"^/intelligence/address/([^/]+)/all$")),
+    ("query_results", "GET", re.compile(r"^/api/v1/query/(\d+)/results$")),
+    ("table_insert", "POST", re.compile(r"^/api/v1/table/([^/]+)/([^/]+)/insert$")),
+    ("table_clear", "POST", re.compile(r"^/api/v1/table/([^/]+)/([^/]+)/clear$")),
+]
+ARKHAM_ROUTES = {"portfolio", "intelligence"}  # Routes subject to Arkham fault injection
+
+
+@dataclass
+class MockServerConfig:
+    """
+    Behaviour of the mock Arkham and Dune endpoints.
+
+    Attributes:
+        latency_ms: Mean added latency of Arkham responses in milliseconds
+        jitter_ms: Uniform +/- jitter applied to every added latency
+        throttle_rate: Fraction of Arkham requests answered with 429
+        error_rate: Fraction of Arkham requests answered with a 5xx error
+        retry_after: Retry-After seconds sent with 429 responses
+        dune_latency_ms: Mean added latency of Dune responses in milliseconds
+        dune_error_rate: Fraction of Dune requests answered with a 5xx error
+        address_count: Number of addresses returned by the Dune query results endpoint
+        tokens_per_chain: Token entries per chain in the synthetic portfolio payload
+        portfolio_payload: Optional recorded portfolio response served instead
+        label_payload: Optional recorded intelligence response served instead
+        seed: Random seed for payloads and fault injection
+    """
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: float = 1.0
+    dune_latency_ms: float = 20.0
+    dune_error_rate: float = 0.0
+    address_count: int = 1000
+    tokens_per_chain: int = 50
+    portfolio_payload: Optional[str] = None
+    label_payload: Optional[str] = None
+    seed: int = 0
+
+
+def bench_address(index: int) -> str:
+    """Deterministic EVM address for the index-th row of the mock query result"""
+    return "0x" + f"{index:040x}"
+
+
+class MockServerStats:
+    """
+    Thread-safe counters kept by the mock server, readable through /_mock/stats.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters"""
+        with self.lock:
+            self.requests: Dict[str, int] = {}
+            self.status_codes: Dict[str, Dict[str, int]] = {}
+            self.latencies: Dict[str, List[float]] = {}  # Seconds per handled request
+            self.bytes_received: Dict[str, int] = {}
+            self.bytes_sent: Dict[str, int] = {}
+            self.rows_inserted = 0
+
+    def record(
+        self, route: str, status: int, elapsed: float, received: int, sent: int
+    ) -> None:
+        """Record one handled request"""
+        with self.lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            codes = self.status_codes.setdefault(route, {})
+            codes[str(status)] = codes.get(str(status), 0) + 1
+            self.latencies.setdefault(route, []).append(elapsed)
+            self.bytes_received[route] = self.bytes_received.get(route, 0) + received
+            self.bytes_sent[route] = self.bytes_sent.get(route, 0) + sent
+
+    def snapshot(self) -> dict:
+        """Return a JSON-serializable copy of the counters"""
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "status_codes": {k: dict(v) for k, v in self.status_codes.items()},
+                "latencies": {k: list(v) for k, v in self.latencies.items()},
+                "bytes_received": dict(self.bytes_received),
+                "bytes_sent": dict(self.bytes_sent),
+                "rows_inserted": self.rows_inserted,
+            }
+
+
+class MockApiServer:
+    """
+    Local HTTP stand-in for the Arkham and Dune endpoints used by the pipeline.
+
+    Serves the Arkham portfolio and intelligence endpoints, the Dune query
+    results endpoint (a paged list of deterministic addresses) and the Dune
+    table insert and clear endpoints. Latency, 429 throttling and 5xx errors are
+    injected according to MockServerConfig, and per-route counters can be read
+    from /_mock/stats and cleared with POST /_mock/reset.
+    """
+
+    def __init__(
+        self,
+        config: Optional[MockServerConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,  # 0 picks a free port
+    ):
+        """
+        Initialize the MockApiServer.
+
+        Args:
+            config: Endpoint behaviour (defaults to MockServerConfig())
+            host: Interface to bind
+            port: Port to bind, or 0 for a free port
+        """
+        self.config = config or MockServerConfig()
+        self.stats = MockServerStats()
+        self.random = random.Random(self.config.seed)
+        self.random_lock = threading.Lock()
+        self.portfolio_body = self._load_body(
+            self.config.portfolio_payload,
+            lambda: make_portfolio_payload(self.config.tokens_per_chain),
+        )
+        self.label_body = self._load_body(
+            self.config.label_payload, make_label_payload
+        )
+
+        handler = type("BoundMockHandler", (_MockHandler,), {"server_ref": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _load_body(path: Optional[str], factory) -> bytes:
+        """Read a recorded response body, or encode a synthetic one"""
+        if path:
+            with open(path, "rb") as f:
+                return f.read()
+        return encode(factory())
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to ArkhamApi and TableApi"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockApiServer":
+        """Serve requests on a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self) -> "MockApiServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def draw(self) -> float:
+        """Uniform random number shared by all handler threads"""
+        with self.random_lock:
+            return self.random.random()
+
+    def delay(self, mean_ms: float) -> None:
+        """Sleep for the configured latency with jitter"""
+        jitter = self.config.jitter_ms * (2 * self.draw() - 1)
+        seconds = max(0.0, mean_ms + jitter) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Request handler dispatching to the routes of MockApiServer"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, as the real APIs
+    server_ref: MockApiServer = None
+
+    def log_message(self, format, *args) -> None:
+        pass  # Keep benchmark output readable
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _read_body(self) -> bytes:
+        """Read a request body sent with Content-Length or chunked encoding"""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()  # Trailing CRLF after the last chunk
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(parts)
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: bytes, headers: Optional[dict] = None) -> int:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
+    def _dispatch(self, method: str) -> None:
+        start = time.perf_counter()
+        server = self.server_ref
+        parsed = urlparse(self.path)
+        body = self._read_body() if method == "POST" else b""
+
+        if parsed.path == "/_mock/stats":
+            self._send(200, json.dumps(server.stats.snapshot()).encode("utf-8"))
+            return
+        if parsed.path == "/_mock/reset" and method == "POST":
+            server.stats.reset()
+            self._send(200, b"{}")
+            return
+
+        for route, route_method, pattern in ROUTES:
+            match = pattern.match(parsed.path)
+            if match and route_method == method:
+                break
+        else:
+            self._send(404, b'{"error": "not found"}')
+            return
+
+        config = server.config
+        is_arkham = route in ARKHAM_ROUTES
+        server.delay(config.latency_ms if is_arkham else config.dune_latency_ms)
+
+        status, payload, headers = self._fault(route, is_arkham)
+        if status == 200:
+            payload = self._handle(route, match, parse_qs(parsed.query), body)
+        sent = self._send(status, payload, headers)
+        server.stats.record(
+            route, status, time.perf_counter() - start, len(body), sent
+        )
+
+    def _fault(self, route: str, is_arkham: bool):
+        """Decide whether this request gets an injected 429 or 5xx answer"""
+        server = self.server_ref
+        config = server.config
+        draw = server.draw()
+        if is_arkham:
+            if draw < config.throttle_rate:
+                return (
+                    429,
+                    b'{"error": "rate limit exceeded"}',
+                    {"Retry-After": f"{config.retry_after:g}"},
+                )
+            if draw < config.throttle_rate + config.error_rate:
+                return 503, b'{"error": "service unavailable"}', None
+        elif draw < config.dune_error_rate:
+            return 502, b'{"error": "bad gateway"}', None
+        return 200, b"", None
+
+    def _handle(self, route: str, match, query: dict, body: bytes) -> bytes:
+        server = self.server_ref
+        if route == "portfolio":
+            return server.portfolio_body
+        if route == "intelligence":
+            return server.label_body
+        if route == "query_results":
+            return self._query_results(query)
+        if route == "table_insert":
+            if self.headers.get("Content-Encoding", "").lower() == "gzip":
+                body = gzip.decompress(body)
+            rows = max(0, body.count(b"\n") - 1)  # Every chunk repeats the header row
+            with server.stats.lock:
+                server.stats.rows_inserted += rows
+            return json.dumps(
+                {"rows_written": rows, "bytes_written": len(body)}
+            ).encode("utf-8")
+        return json.dumps(
+            {"message": f"Table {match.group(1)}.{match.group(2)} cleared"}
+        ).encode("utf-8")
+
+    def _query_results(self, query: dict) -> bytes:
+        """One page of the deterministic address list"""
+        total = self.server_ref.config.address_count
+        limit = int(query.get("limit", ["10000"])[0])
+        offset = int(query.get("offset", ["0"])[0])
+        end = min(total, offset + limit)
+        return json.dumps(
+            {
+                "result": {
+                    "rows": [{"address": bench_address(i)} for i in range(offset, end)],
+                    "metadata": {"total_row_count": total},
+                },
+                "next_offset": end if end < total else None,
+            }
+        ).encode("utf-8")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Serve mock Arkham and Dune endpoints for benchmarks"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument(
+        "--port", type=int, default=0, help="Port to bind (0 picks a free port)"
+    )
+    add_config_args(parser)
+    return parser.parse_args()
+
+
+def add_config_args(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the MockServerConfig options to an argument parser.
+    """
+    defaults = MockServerConfig()
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=defaults.latency_ms,
+        help="Mean added latency of Arkham responses",
+    )
+    parser.add_argument(
+        "--jitter-ms",
+        type=float,
+        default=defaults.jitter_ms,
+        help="Uniform +/- jitter on every added latency",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=defaults.throttle_rate,
+        help="Fraction of Arkham requests answered with 429",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=defaults.error_rate,
+        help="Fraction of Arkham requests answered with 503",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=defaults.retry_after,
+        help="Retry-After seconds sent with 429 responses",
+    )
+    parser.add_argument(
+        "--dune-latency-ms",
+        type=float,
+        default=defaults.dune_latency_ms,
+        help="Mean added latency of Dune responses",
+    )
+    parser.add_argument(
+        "--dune-error-rate",
+        type=float,
+        default=defaults.dune_error_rate,
+        help="Fraction of Dune requests answered with 502",
+    )
+    parser.add_argument(
+        "--addresses",
+        type=int,
+        default=defaults.address_count,
+        help="Number of addresses returned by the Dune query",
+    )
+    parser.add_argument(
+        "--tokens-per-chain",
+        type=int,
+        default=defaults.tokens_per_chain,
+        help="Token entries per chain in the synthetic portfolio payload",
+    )
+    parser.add_argument(
+        "--portfolio-payload",
+        default=None,
+        help="Recorded portfolio response to serve instead of a synthetic one",
+    )
+    parser.add_argument(
+        "--label-payload",
+        default=None,
+        help="Recorded intelligence response to serve instead of a synthetic one",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=defaults.seed,
+        help="Random seed for payloads and fault injection",
+    )
+
+def config_from_args(args) -> MockServerConfig:
+    """
+    Build a MockServerConfig from parsed add_config_args options.
+    """
+    return MockServerConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        dune_latency_ms=args.dune_latency_ms,
+        dune_error_rate=args.dune_error_rate,
+        address_count=args.addresses,
+        tokens_per_chain=args.tokens_per_chain,
+        portfolio_payload=args.portfolio_payload,
+        label_payload=args.label_payload,
+        seed=args.seed,
+    )
+
+
+def main():
+    args = parse_args()
+    server = MockApiServer(config_from_args(args), args.host, args.port)
+    print(server.url, flush=True)  # First line is read by run_benchmarks.py
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import json
+import random
+from typing import Optional
+
+# Chains returned by the Arkham portfolio and intelligence endpoints
+CHAINS = [
+    "ethereum",
+    "arbitrum_one",
+    "base",
+    "bsc",
+    "optimism",
+    "polygon",
+    "avalanche",
+    "tron",
+]
+
+
+def _address(rng: random.Random) -> str:
+    """Generate a random EVM address"""
+    return "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+
+
+def make_portfolio_payload(
+    tokens_per_chain: int = 50, seed: Optional[int] = 0
+) -> dict:
+    """
+    Build a synthetic portfolio response shaped like /portfolio/address/{address}.
+
+    Args:
+        tokens_per_chain: Number of token entries generated for every chain
+        seed: Random seed so runs decode identical payloads
+
+    Returns:
+        dict: Response body keyed by chain name, then token id
+    """
+    rng = random.Random(seed)
+    payload = {}
+    for chain in CHAINS:
+        tokens = {}
+        for index in range(tokens_per_chain):
+            token_id = f"{chain}-token-{index}"
+            price = rng.uniform(0.0001, 5000)
+            balance = rng.uniform(0, 1_000_000)
+            tokens[token_id] = {
+                "id": token_id,
+                "name": f"Token {index}",
+                "symbol": f"TK{index}",
+                "balance": balance,
+                "price": price,
+                "usd": balance * price,
+            }
+        payload[chain] = tokens
+    return payload
+
+
+def make_label_payload(seed: Optional[int] = 0) -> dict:
+    """
+    Build a synthetic intelligence response shaped like /intelligence/address/{address}/all.
+
+    Args:
+        seed: Random seed so runs decode identical payloads
+
+    Returns:
+        dict: Response body keyed by chain name
+    """
+    rng = random.Random(seed)
+    address = _address(rng)
+    payload = {}
+    for chain in CHAINS:
+        payload[chain] = {
+            "address": address,
+            "chain": chain,
+            "isUserAddress": rng.random() < 0.5,
+            "contract": rng.random() < 0.2,
+            "arkhamEntity": {
+                "name": "Example Fund",
+                "type": "fund",
+                "website": "https://example.com",
+                "twitter": "https://twitter.com/example",
+                "crunchbase": "",
+                "linkedin": "",
+            },
+            "arkhamLabel": {"name": "Example Fund: Hot Wallet"},
+        }
+    return payload
+
+
+def encode(payload: dict) -> bytes:
+    """Encode a payload to the raw bytes an HTTP response would carry"""
+    return json.dumps(payload).encode("utf-8")
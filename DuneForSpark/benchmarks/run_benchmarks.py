@@ -0,0 +1,397 @@
+import sys
+import os
+import argparse
+import contextlib
+import json
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_server import add_config_args
+from services.arkham.arkham_api import ArkhamApi
+from services.arkham.http_session import create_pooled_session
+from services.arkham.label_service import LabelService
+from services.arkham.portfolio_service import PortfolioService
+from services.arkham.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    TokenBucketRateLimiter,
+)
+from services.dune.table_api import TableApi
+from services.common.logger import configure_logging
+
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_server.py")
+BENCH_NAMESPACE = "benchmark"  # Namespace used for the mock table endpoints
+BENCH_TABLE = "dataset_whale_portfolio_benchmark"
+BENCH_QUERY_ID = 1  # Query id served by the mock results endpoint
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Arkham and Dune pipeline stages against a local mock server"
+    )
+    parser.add_argument(
+        "--stages",
+        default="dune_read,labels,portfolios,upload",
+        help="Comma-separated stages to run, in order",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=10, help="Worker threads of the Arkham services"
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=1000.0,
+        help="Arkham rate limit; keep it high to measure the client, low to reproduce the quota",
+    )
+    parser.add_argument(
+        "--burst", type=int, default=50, help="Burst size of the Arkham rate limiter"
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=10000, help="Rows per Dune result page"
+    )
+    parser.add_argument(
+        "--chunk-size-mb", type=float, default=50.0, help="Dune upload chunk size"
+    )
+    parser.add_argument(
+        "--compress", action="store_true", help="Gzip-compress Dune uploads"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show the services' own output instead of only the benchmark report",
+    )
+    parser.add_argument(
+        "--output", default=None, help="Write the results as JSON to this path"
+    )
+    add_config_args(parser)
+    return parser.parse_args()
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of a list of values.
+
+    Args:
+        values: Observed values
+        fraction: Percentile as a fraction, e.g. 0.99
+
+    Returns:
+        float: Percentile value, or None if there are no values
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak RSS of this process so the next reading covers one stage only.
+
+    Returns:
+        bool: True if the platform supports resetting (Linux), False otherwise
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")  # Resets VmHWM
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024  # Reported in kB
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class MockServerProcess:
+    """
+    Mock server running in a child process, so its CPU and memory are not
+    counted against the pipeline being measured.
+    """
+
+    def __init__(self, args):
+        command = [sys.executable, MOCK_SERVER, "--port", "0"]
+        for option in (
+            "latency_ms",
+            "jitter_ms",
+            "throttle_rate",
+            "error_rate",
+            "retry_after",
+            "dune_latency_ms",
+            "dune_error_rate",
+            "tokens_per_chain",
+            "portfolio_payload",
+            "label_payload",
+            "seed",
+        ):
+            value = getattr(args, option)
+            if value is not None:
+                command += [f"--{option.replace('_', '-')}", str(value)]
+        command += ["--addresses", str(args.addresses)]
+
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        self.url = self.process.stdout.readline().strip()
+        if not self.url:
+            self.process.kill()
+            raise RuntimeError("Mock server failed to start")
+
+    def stats(self) -> dict:
+        """Counters recorded by the server since the last reset"""
+        return requests.get(f"{self.url}/_mock/stats", timeout=10).json()
+
+    def reset(self) -> None:
+        """Clear the server counters"""
+        requests.post(f"{self.url}/_mock/reset", timeout=10)
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+class LatencyRecorder:
+    """
+    Response hook collecting client-observed Arkham request latencies.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: List[float] = []
+
+    def __call__(self, response, *args, **kwargs):
+        with self.lock:
+            self.latencies.append(response.elapsed.total_seconds())
+        return response
+
+    def drain(self) -> List[float]:
+        """Return and clear the latencies recorded so far"""
+        with self.lock:
+            latencies, self.latencies = self.latencies, []
+        return latencies
+
+
+class BenchmarkRunner:
+    """
+    Runs the pipeline stages against the mock server and collects per-stage results.
+
+    Stages:
+        dune_read: stream addresses from the Dune query results endpoint
+        labels: LabelService.export_labels over the addresses
+        portfolios: PortfolioService.export_portfolios over the addresses
+        upload: TableApi.clearTable and insertCsvToTable of the portfolio CSV
+
+    Latency percentiles of the Arkham stages are measured on the client (time to
+    response headers, including connection waits); those of the Dune stages are
+    measured by the server (including reading the uploaded body).
+    """
+
+    def __init__(self, args, server: MockServerProcess, work_dir: str):
+        self.args = args
+        self.server = server
+        self.work_dir = work_dir
+        self.addresses: List[str] = []
+        self.portfolio_csv: Optional[str] = None
+        self.recorder = LatencyRecorder()
+
+        session = create_pooled_session(pool_maxsize=args.workers)
+        session.hooks["response"].append(self.recorder)
+        self.arkham_api = ArkhamApi(
+            "benchmark",
+            server.url,
+            rate_limiter=TokenBucketRateLimiter(
+                args.requests_per_second, args.burst
+            ),
+            concurrency_limiter=AdaptiveConcurrencyLimiter(args.workers),
+            session=session,
+        )
+        self.table_api = TableApi("benchmark", base_url=server.url)
+
+    def run_stage(self, name: str) -> Dict:
+        """
+        Run one stage and measure it.
+
+        Args:
+            name: Stage name (see class docstring)
+
+        Returns:
+            dict: Stage results
+        """
+        stage: Callable[[], int] = getattr(self, f"stage_{name}")
+        self._quietly(lambda: self.prepare(name))  # Inputs of skipped stages are not timed
+        self.server.reset()
+        self.recorder.drain()
+        rss_reset = reset_peak_rss()
+
+        start_time = time.perf_counter()
+        items = self._quietly(stage)
+        elapsed = time.perf_counter() - start_time
+
+        stats = self.server.stats()
+        if name in ("labels", "portfolios"):
+            latencies = self.recorder.drain()
+        else:
+            latencies = [
+                latency for values in stats["latencies"].values() for latency in values
+            ]
+        received = sum(stats["bytes_received"].values())
+        sent = sum(stats["bytes_sent"].values())
+        p50 = percentile(latencies, 0.50)
+        p99 = percentile(latencies, 0.99)
+
+        return {
+            "stage": name,
+            "items": items,
+            "seconds": round(elapsed, 3),
+            "items_per_second": round(items / elapsed, 1) if elapsed > 0 else None,
+            "requests": sum(stats["requests"].values()),
+            "status_codes": stats["status_codes"],
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "peak_rss_is_stage_only": rss_reset,
+            "download_mb_per_second": round(sent / (1024 * 1024) / elapsed, 2)
+            if elapsed > 0
+            else None,
+            "upload_mb_per_second": round(received / (1024 * 1024) / elapsed, 2)
+            if elapsed > 0
+            else None,
+        }
+
+    def _quietly(self, function: Callable[[], int]) -> int:
+        """Run a function with the services' output suppressed unless --verbose"""
+        if self.args.verbose:
+            return function()
+        with open(os.devnull, "w") as output, contextlib.redirect_stdout(output):
+            return function()
+
+    def prepare(self, name: str) -> None:
+        """
+        Produce the inputs of a stage whose predecessor stages were not selected.
+
+        Args:
+            name: Stage about to run
+        """
+        if name in ("labels", "portfolios", "upload") and not self.addresses:
+            self.stage_dune_read()
+        if name == "upload" and self.portfolio_csv is None:
+            self.stage_portfolios()
+
+    def stage_dune_read(self) -> int:
+        self.addresses = list(
+            self.table_api.streamRowDataByTableId(
+                BENCH_QUERY_ID, "address", page_size=self.args.page_size
+            )
+        )
+        return len(self.addresses)
+
+    def stage_labels(self) -> int:
+        service = LabelService(
+            "benchmark",
+            self.server.url,
+            max_workers=self.args.workers,
+            retry_base_delay=0.5,
+            use_cache=False,
+            arkham_api=self.arkham_api,
+        )
+        service.export_labels(
+            self.addresses, filename=os.path.join(self.work_dir, "labels.csv")
+        )
+        return len(self.addresses)
+
+    def stage_portfolios(self) -> int:
+        service = PortfolioService(
+            "benchmark",
+            self.server.url,
+            max_workers=self.args.workers,
+            retry_base_delay=0.5,
+            arkham_api=self.arkham_api,
+        )
+        self.portfolio_csv = service.export_portfolios(
+            self.addresses, filename=os.path.join(self.work_dir, "portfolios.csv")
+        )
+        return len(self.addresses)
+
+    def stage_upload(self) -> int:
+        self.table_api.clearTable(BENCH_NAMESPACE, BENCH_TABLE)
+        rows_written = self.table_api.insertCsvRowsToTable(
+            self.portfolio_csv,
+            BENCH_NAMESPACE,
+            BENCH_TABLE,
+            chunk_size_mb=self.args.chunk_size_mb,
+            compress=self.args.compress,
+        )
+        return rows_written or 0
+
+
+def print_report(results: List[Dict]) -> None:
+    """
+    Print the per-stage results as a table.
+    """
+    print(
+        f"\n{'stage':<12}{'items':>8}{'items/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'peak RSS MB':>13}{'down MB/s':>11}{'up MB/s':>9}  status codes"
+    )
+    for result in results:
+        codes = {}
+        for route_codes in result["status_codes"].values():
+            for code, count in route_codes.items():
+                codes[code] = codes.get(code, 0) + count
+        print(
+            f"{result['stage']:<12}{result['items']:>8}"
+            f"{result['items_per_second'] or 0:>10.1f}"
+            f"{result['p50_ms'] or 0:>9.1f}{result['p99_ms'] or 0:>9.1f}"
+            f"{result['peak_rss_mb']:>13.1f}"
+            f"{result['download_mb_per_second'] or 0:>11.2f}"
+            f"{result['upload_mb_per_second'] or 0:>9.2f}  "
+            + ", ".join(f"{code}: {count}" for code, count in sorted(codes.items()))
+        )
+    if results and not results[0]["peak_rss_is_stage_only"]:
+        print("⚠️ Peak RSS could not be reset between stages and is cumulative")
+
+
+def main():
+    args = parse_args()
+    configure_logging("INFO" if args.verbose else "ERROR")
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    for stage in stages:
+        if not hasattr(BenchmarkRunner, f"stage_{stage}"):
+            raise SystemExit(f"Unknown stage: {stage}")
+
+    server = MockServerProcess(args)
+    print(f"🚀 Mock server at {server.url}")
+    try:
+        with tempfile.TemporaryDirectory(prefix="duneforspark_bench_") as work_dir:
+            runner = BenchmarkRunner(args, server, work_dir)
+            results = []
+            for stage in stages:
+                print(f"⏱️ Running stage: {stage}")
+                results.append(runner.run_stage(stage))
+    finally:
+        server.stop()
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import sys
+import os
+import argparse
+import json
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    ARKHAM_API_KEY,
+    DUNE_API_KEY_WALLE,
+)
+from services.dune.table_api import TableApi
+from services.arkham.portfolio_service import PortfolioService
+from services.arkham.checkpoint import CheckpointJournal
+from services.common.address_normalizer import AddressNormalizer
+from services.common.logger import configure_logging
+from services.common.metrics import report_metrics_at_exit
+
+DUNE_TABLE_QUERY_ID = 6074774  # Dune query returning the whale addresses
+DUNE_TABLE_NAME_SPACE = "sparkdotfi"
+BACKFILL_TABLE_NAME = "dataset_whale_portfolio_snapshots_arkham_api"
+BACKFILL_TABLE_DESCRIPTION = "Daily whale portfolio snapshots backfilled from Arkham"
+BACKFILL_SCHEMA: list[dict[str, str]] = [
+    {"name": "snapshot_date", "type": "date"},  # Date the portfolio was valued at
+    {"name": "chain", "type": "varchar"},  # Wallet chain column
+    {"name": "address", "type": "varbinary"},  # Wallet address column
+    {"name": "symbol", "type": "varchar"},  # Token symbol column
+    {"name": "balance", "type": "double"},  # Token balance column
+    {"name": "price", "type": "double"},  # Token price column
+    {"name": "usd", "type": "double"},  # USD value column
+]
+CHECKPOINT_NAME = "backfill_portfolio"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Backfill historical Arkham whale portfolios into a Dune snapshot table"
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=None,
+        help="First snapshot date (YYYY-MM-DD); defaults to --days before --end",
+    )
+    parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=None,
+        help="Last snapshot date (YYYY-MM-DD); defaults to yesterday",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=90,
+        help="Number of days to backfill when --start is not given",
+    )
+    parser.add_argument(
+        "--step-days",
+        type=int,
+        default=1,
+        help="Days between snapshots, e.g. 7 for weekly",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted backfill, skipping snapshots already fetched or uploaded",
+    )
+    parser.add_argument(
+        "--allow-incomplete",
+        type=float,
+        default=0.0,
+        help="Upload a snapshot date even when up to this fraction of its addresses "
+        "failed (e.g. 0.01), listing the failed addresses; by default a date is only "
+        "uploaded once every address succeeded",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Minimum log level; DEBUG adds one line per request",
+    )
+    parser.add_argument(
+        "--log-json",
+        default=None,
+        help="Also write every log record as a JSON line to this file",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Write request metrics at the end of the run (.prom for Prometheus text, JSON otherwise)",
+    )
+    return parser.parse_args()
+
+
+def load_uploaded_dates(path: str, resume: bool) -> set:
+    """
+    Load the snapshot dates already uploaded by an interrupted backfill.
+    """
+    if not resume or not os.path.exists(path):
+        return set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        return set()
+
+
+def save_uploaded_dates(path: str, uploaded_dates: set) -> None:
+    """
+    Record the snapshot dates uploaded so far, so a resumed run does not insert them twice.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sorted(uploaded_dates), f)
+    os.replace(tmp_path, path)
+
+
+def main():
+    args = parse_args()
+    if not 0.0 <= args.allow_incomplete <= 1.0:
+        print("❌ --allow-incomplete must be between 0 and 1")
+        return
+    configure_logging(args.log_level, args.log_json)
+    report_metrics_at_exit(args.metrics_out)
+
+    end_date = args.end or date.today() - timedelta(days=1)
+    start_date = args.start or end_date - timedelta(days=args.days - 1)
+    schedule = PortfolioService.backfill_schedule(start_date, end_date, args.step_days)
+    if not schedule:
+        print("❌ No snapshot dates in the requested range")
+        return
+
+    checkpoint = CheckpointJournal(CHECKPOINT_NAME, resume=args.resume)
+    uploaded_path = f"{os.path.splitext(checkpoint.path)[0]}_uploaded.json"
+    uploaded_dates = load_uploaded_dates(uploaded_path, args.resume)
+    schedule = [item for item in schedule if item[0] not in uploaded_dates]
+    if uploaded_dates:
+        print(f"ℹ️  {len(uploaded_dates)} snapshot dates already uploaded, skipping them")
+    if not schedule:
+        print("✅ Backfill already complete")
+        return
+
+    duneServiceWalle = TableApi(DUNE_API_KEY_WALLE)
+    isTableCreated = duneServiceWalle.createTable(
+        DUNE_TABLE_NAME_SPACE,
+        BACKFILL_TABLE_NAME,
+        BACKFILL_TABLE_DESCRIPTION,
+        BACKFILL_SCHEMA,
+    )
+    if not isTableCreated:
+        return
+
+    # The snapshot table is append-only: CSVs exported by an interrupted run are
+    # uploaded again as they are, so their chunked uploads resume instead of
+    # inserting the chunks that already succeeded a second time
+    file_paths = {}
+    for snapshot_date, _ in schedule:
+        pending = checkpoint.pending_export(snapshot_date)
+        if pending:
+            file_paths[snapshot_date] = pending["path"]
+    if file_paths:
+        print(f"📤 Resuming the upload of {len(file_paths)} snapshot dates exported earlier")
+    crawl_schedule = [item for item in schedule if item[0] not in file_paths]
+
+    if crawl_schedule:
+        print("📊 Fetching addresses from Dune...")
+        normalizer = AddressNormalizer()
+        address_params = normalizer.normalize(
+            duneServiceWalle.streamRowDataByTableId(DUNE_TABLE_QUERY_ID, "user_addr")
+        )
+        if not address_params:
+            print("❌ No addresses found in Dune table")
+            return
+
+        print(
+            f"🔍 Backfilling {len(crawl_schedule)} snapshots from {crawl_schedule[0][0]} to "
+            f"{crawl_schedule[-1][0]} for {len(address_params)} addresses..."
+        )
+        portfolioService = PortfolioService(ARKHAM_API_KEY)
+        exported_paths = portfolioService.export_portfolio_backfill(
+            address_params,
+            crawl_schedule,
+            checkpoint=checkpoint,
+            allow_incomplete=args.allow_incomplete,
+        )
+        for snapshot_date, file_path in exported_paths.items():
+            checkpoint.record_export(file_path, key=snapshot_date)
+        file_paths.update(exported_paths)
+    checkpoint.close()
+
+    # One insert per complete snapshot date; each uploaded date is recorded before the next
+    print("📤 Uploading snapshots to Dune...")
+    for snapshot_date, file_path in sorted(file_paths.items()):
+        isInserted = duneServiceWalle.insertCsvToTable(
+            file_path, DUNE_TABLE_NAME_SPACE, BACKFILL_TABLE_NAME
+        )
+        if not isInserted:
+            print(f"❌ Upload of {snapshot_date} failed, re-run with --resume to continue")
+            return
+        uploaded_dates.add(snapshot_date)
+        save_uploaded_dates(uploaded_path, uploaded_dates)
+        print(f"✅ Snapshot {snapshot_date} uploaded")
+
+    # Only complete dates (or dates within --allow-incomplete) are exported, so the
+    # checkpoint is kept while any date is still held back
+    if len(file_paths) == len(schedule):
+        checkpoint.discard()
+        if os.path.exists(uploaded_path):
+            os.remove(uploaded_path)
+        print("✅ Backfill complete")
+    else:
+        print(
+            f"⚠️  {len(schedule) - len(file_paths)} snapshot dates are incomplete and were "
+            "not uploaded, re-run with --resume to retry their failed addresses, or "
+            "with --allow-incomplete to upload them without the addresses that keep failing"
+        )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Program execution interrupted by user")
+    except Exception as e:
+        print(f"\n❌ Program execution error: {str(e)}")
@@ -0,0 +1,344 @@
+import sys
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DUNE_API_KEY_WALLE, ARKHAM_API_KEY
+from services.dune.table_api import TableApi
+from services.arkham.crawl_pipeline import CrawlPipeline
+from services.arkham.label_manifest import LabelSyncManifest
+from services.arkham.checkpoint import CheckpointJournal
+from services.arkham.work_queue import RunBudget
+from services.common.address_normalizer import AddressNormalizer
+from services.common.logger import configure_logging
+from services.common.metrics import report_metrics_at_exit
+
+ADDRESS_QUERY_ID = 6074774  # Dune query returning the whale addresses
+DUNE_TABLE_NAME_SPACE = "sparkdotfi"
+
+LABELS_TABLE_NAME = "dataset_whale_labels_arkham_api"
+LABELS_TABLE_DESCRIPTION = "Whale labels dataset from Arkham"
+LABELS_SCHEMA: list[dict[str, str]] = [
+    {"name": "no", "type": "integer"},
+    {"name": "address", "type": "varbinary"},
+    {"name": "name", "type": "varchar"},
+    {"name": "type", "type": "varchar"},
+    {"name": "label", "type": "varchar"},
+    {"name": "isuseraddress", "type": "boolean"},
+    {"name": "website", "type": "varchar"},
+    {"name": "twitter", "type": "varchar"},
+    {"name": "crunchbase", "type": "varchar"},
+    {"name": "linkedin", "type": "varchar"},
+    {"name": "update_date", "type": "date"},
+]
+
+PORTFOLIO_TABLE_NAME = "dataset_whale_portfolio_arkham_api"
+PORTFOLIO_TABLE_DESCRIPTION = "Whale portfolio dataset from Arkham"
+PORTFOLIO_SCHEMA: list[dict[str, str]] = [
+    {"name": "chain", "type": "varchar"},  # Wallet chain column
+    {"name": "address", "type": "varbinary"},  # Wallet address column
+    {"name": "symbol", "type": "varchar"},  # Token symbol column
+    {"name": "balance", "type": "double"},  # Token balance column
+    {"name": "price", "type": "double"},  # Token price column
+    {"name": "usd", "type": "double"},  # USD value column
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Sync Arkham whale labels and portfolios to Dune in one pass"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Label every address instead of only new or stale ones",
+    )
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=30.0,
+        help="Re-label addresses last synced more than this many days ago",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping requests already in its checkpoints",
+    )
+    parser.add_argument(
+        "--view-query-id",
+        type=int,
+        default=None,
+        help="Dune query readers use to access the portfolio table; enables staged "
+        "loading into a versioned table instead of clearing the table in place",
+    )
+    parser.add_argument(
+        "--rank-column",
+        default=None,
+        help="Numeric column of the address query to crawl by, highest first "
+        "(e.g. a USD balance), so the largest wallets are covered first",
+    )
+    parser.add_argument(
+        "--time-budget-minutes",
+        type=float,
+        default=None,
+        help="Stop starting new Arkham requests after this many minutes",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=None,
+        help="Stop after this many Arkham requests",
+    )
+    parser.add_argument(
+        "--migrate-schema",
+        action="store_true",
+        help="Recreate the portfolio table when its column types differ from the "
+        "typed schema; safe because the table is fully replaced on every run. The "
+        "append-only labels table is never recreated, a mismatch there aborts the run",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Minimum log level; DEBUG adds one line per address",
+    )
+    parser.add_argument(
+        "--log-json",
+        default=None,
+        help="Also write every log record as a JSON line to this file",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Write request metrics at the end of the run (.prom for Prometheus text, JSON otherwise)",
+    )
+    return parser.parse_args()
+
+
+def upload_labels(duneService, manifest, checkpoint, file_path, complete=True):
+    """
+    Append the labels CSV to its Dune table and record the addresses as synced.
+
+    When the run was incomplete (budget exhausted) the checkpoint keeps its
+    addresses for --resume, but drops their rows so they are not appended twice.
+    """
+    print("📤 Uploading labels to Dune...")
+    isInserted = duneService.insertCsvToTable(
+        file_path, DUNE_TABLE_NAME_SPACE, LABELS_TABLE_NAME
+    )
+    if isInserted:
+        synced_count = manifest.mark_synced_from_csv(file_path)
+        print(f"✅ {synced_count} addresses recorded in label manifest")
+        if complete:
+            checkpoint.discard()
+        else:
+            checkpoint.mark_uploaded()
+            checkpoint.close()
+    return isInserted
+
+
+def upload_portfolios(duneService, checkpoint, file_path, view_query_id=None):
+    """
+    Replace the contents of the portfolio table with the portfolios CSV.
+
+    With a view query the CSV is staged into a versioned table and readers are
+    switched over once it is complete; otherwise the table is cleared in place.
+    Only called for complete runs, so the checkpoint is discarded once uploaded.
+    """
+    print("📤 Uploading portfolios to Dune...")
+    if view_query_id:
+        isInserted = duneService.stagedLoadCsvToTable(
+            file_path,
+            DUNE_TABLE_NAME_SPACE,
+            PORTFOLIO_TABLE_NAME,
+            PORTFOLIO_TABLE_DESCRIPTION,
+            PORTFOLIO_SCHEMA,
+            view_query_id,
+        )
+        if isInserted:
+            checkpoint.discard()
+        return isInserted
+
+    isClear = duneService.clearTable(DUNE_TABLE_NAME_SPACE, PORTFOLIO_TABLE_NAME)
+    if not isClear:
+        return False
+
+    # The table was just cleared, so every chunk is uploaded again
+    isInserted = duneService.insertCsvToTable(
+        file_path, DUNE_TABLE_NAME_SPACE, PORTFOLIO_TABLE_NAME, resume=False
+    )
+    if isInserted:
+        checkpoint.discard()
+    return isInserted
+
+
+def main():
+    args = parse_args()
+    configure_logging(args.log_level, args.log_json)
+    report_metrics_at_exit(args.metrics_out)
+    budget = None
+    if args.time_budget_minutes or args.max_requests:
+        budget = RunBudget(
+            args.time_budget_minutes * 60 if args.time_budget_minutes else None,
+            args.max_requests,
+        )
+
+    duneServiceWalle = TableApi(DUNE_API_KEY_WALLE)
+
+    print("📋 Checking if tables exist...")
+    if not duneServiceWalle.createTable(
+        DUNE_TABLE_NAME_SPACE, LABELS_TABLE_NAME, LABELS_TABLE_DESCRIPTION, LABELS_SCHEMA, False
+    ):
+        # The labels table keeps the label history, so it is not dropped by --migrate-schema
+        print(
+            "ℹ️  The labels table is append-only and is not recreated automatically; "
+            "fix its columns in Dune before re-running"
+        )
+        return
+    if args.view_query_id:
+        pass  # The staged load creates typed, versioned portfolio tables
+    elif args.migrate_schema:
+        if not duneServiceWalle.migrateTableSchema(
+            DUNE_TABLE_NAME_SPACE,
+            PORTFOLIO_TABLE_NAME,
+            PORTFOLIO_TABLE_DESCRIPTION,
+            PORTFOLIO_SCHEMA,
+            False,
+        ):
+            return
+    elif not duneServiceWalle.createTable(
+        DUNE_TABLE_NAME_SPACE,
+        PORTFOLIO_TABLE_NAME,
+        PORTFOLIO_TABLE_DESCRIPTION,
+        PORTFOLIO_SCHEMA,
+        False,
+    ):
+        print(
+            "ℹ️  Re-run with --migrate-schema to recreate the portfolio table, "
+            "or with --view-query-id for a staged load"
+        )
+        return
+
+    manifest = LabelSyncManifest()
+    label_checkpoint = CheckpointJournal("update_all_labels", resume=args.resume)
+    portfolio_checkpoint = CheckpointJournal("update_all_portfolio", resume=args.resume)
+    # An interrupted upload is resumed with the same CSVs: chunks already appended
+    # to the labels table are not inserted again, and a staged portfolio load
+    # reuses its half-loaded shadow table instead of discarding it
+    pending_labels = label_checkpoint.pending_export()
+    pending_portfolios = portfolio_checkpoint.pending_export()
+    if pending_labels or pending_portfolios:
+        label_path = pending_labels["path"] if pending_labels else None
+        portfolio_path = pending_portfolios["path"] if pending_portfolios else None
+        print(
+            "📤 Resuming the upload of the interrupted run: "
+            + ", ".join(path for path in (label_path, portfolio_path) if path)
+        )
+        complete = all(
+            pending["complete"] for pending in (pending_labels, pending_portfolios) if pending
+        )
+    else:
+        # ====================
+        # Fetch the address list once for both datasets
+        # ====================
+        print("📊 Fetching addresses from Dune...")
+        ranks = None
+        if args.rank_column:
+            ranked_params = duneServiceWalle.queryRankedRowDataByTableId(
+                ADDRESS_QUERY_ID, "user_addr", args.rank_column
+            )
+            if not ranked_params:
+                print("❌ No addresses found in Dune table")
+                return
+            ranks = AddressNormalizer().normalize_ranked(ranked_params)
+            unique_addresses = list(ranks)  # Largest wallets first
+        else:
+            address_params = duneServiceWalle.queryRowDataByTableId(
+                ADDRESS_QUERY_ID, "user_addr"
+            )
+            if not address_params:
+                print("❌ No addresses found in Dune table")
+                return
+
+            unique_addresses = AddressNormalizer().normalize(address_params)
+        if not unique_addresses:
+            print("❌ No valid addresses found in Dune table")
+            return
+        print(f"✅ Found {len(unique_addresses)} unique addresses")
+
+        label_addresses = unique_addresses
+        if not args.full:
+            label_addresses, skipped_count = manifest.filter_pending(
+                unique_addresses, args.max_age_days
+            )
+            print(
+                f"ℹ️  Incremental label sync: {len(label_addresses)} new or stale addresses, "
+                f"{skipped_count} already synced"
+            )
+
+        print("🔍 Fetching labels and portfolios from Arkham API...")
+        pipeline = CrawlPipeline(ARKHAM_API_KEY, budget=budget)
+        label_path, portfolio_path = pipeline.run(
+            unique_addresses,
+            label_addresses=label_addresses,
+            label_checkpoint=label_checkpoint,
+            portfolio_checkpoint=portfolio_checkpoint,
+            ranks=ranks,
+        )
+        complete = budget is None or not budget.exhausted
+        if label_path:
+            label_checkpoint.record_export(label_path, complete)
+        if portfolio_path and complete:
+            portfolio_checkpoint.record_export(portfolio_path)
+    label_checkpoint.close()
+    portfolio_checkpoint.close()
+
+    # ====================
+    # Upload both CSVs concurrently
+    # ====================
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {}
+        if label_path:
+            futures["labels"] = executor.submit(
+                upload_labels,
+                duneServiceWalle,
+                manifest,
+                label_checkpoint,
+                label_path,
+                complete,
+            )
+        if portfolio_path and not complete:
+            # Replacing the table with a partial crawl would drop the wallets not
+            # reached yet; labels are appended, so they are still uploaded
+            print(
+                "⏱️  Budget reached: the portfolio table is not replaced with partial "
+                "results, re-run with --resume to finish the crawl"
+            )
+        elif portfolio_path:
+            futures["portfolios"] = executor.submit(
+                upload_portfolios,
+                duneServiceWalle,
+                portfolio_checkpoint,
+                portfolio_path,
+                args.view_query_id,
+            )
+        for name, future in futures.items():
+            if future.result():
+                print(f"✅ {name.capitalize()} uploaded to Dune")
+            else:
+                print(f"❌ Failed to upload {name} to Dune")
+
+    manifest.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Program execution interrupted by user")
+    except Exception as e:
+        print(f"\n❌ Program execution error: {str(e)}")
+        import traceback
+
+        traceback.print_exc()
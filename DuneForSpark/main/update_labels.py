@@ -1,14 +1,91 @@
 import sys
 import os
+import argparse
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import DUNE_API_KEY_WALLE, ARKHAM_API_KEY
 from services.dune.table_api import TableApi
 from services.arkham.label_service import LabelService
+from services.arkham.label_manifest import LabelSyncManifest
+from services.arkham.checkpoint import CheckpointJournal
+from services.arkham.work_queue import RunBudget
+from services.common.address_normalizer import AddressNormalizer
+from services.common.logger import configure_logging
+from services.common.metrics import report_metrics_at_exit
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync Arkham whale labels to Dune")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Label every address instead of only new or stale ones",
+    )
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=30.0,
+        help="Re-label addresses last synced more than this many days ago",
+    )
+    parser.add_argument(
+        "--labels-query-id",
+        type=int,
+        default=None,
+        help="Dune query returning the addresses already in the labels table, used to seed the local manifest",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping addresses already in its checkpoint",
+    )
+    parser.add_argument(
+        "--rank-column",
+        default=None,
+        help="Numeric column of the address query to crawl by, highest first "
+        "(e.g. a USD balance), so the largest wallets are covered first",
+    )
+    parser.add_argument(
+        "--time-budget-minutes",
+        type=float,
+        default=None,
+        help="Stop starting new Arkham requests after this many minutes",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=None,
+        help="Stop after this many Arkham requests",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Minimum log level; DEBUG adds one line per address",
+    )
+    parser.add_argument(
+        "--log-json",
+        default=None,
+        help="Also write every log record as a JSON line to this file",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Write request metrics at the end of the run (.prom for Prometheus text, JSON otherwise)",
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+    configure_logging(args.log_level, args.log_json)
+    report_metrics_at_exit(args.metrics_out)
+    budget = None
+    if args.time_budget_minutes or args.max_requests:
+        budget = RunBudget(
+            args.time_budget_minutes * 60 if args.time_budget_minutes else None,
+            args.max_requests,
+        )
 
     DUNE_TABLE_ID = 6074774
     DUNE_TABLE_NAME_SPACE = "sparkdotfi"
@@ -34,34 +111,83 @@ def main():
     # Table creation (only runs if table doesn't exist)
     # ====================
     print("📋 Checking if table exists...")
-    try:
-        isTableCreated = duneServiceWalle.createTable(
-            DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME, DUNE_TABLE_DESCRIPTION, SCHEMA
+    isTableCreated = duneServiceWalle.createTable(
+        DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME, DUNE_TABLE_DESCRIPTION, SCHEMA
+    )
+    if not isTableCreated:
+        # Same as update_all: the labels table keeps the label history, so a
+        # mismatched table is never recreated and nothing is inserted into it
+        print(
+            "ℹ️  The labels table is append-only and is not recreated automatically; "
+            "fix its columns in Dune before re-running"
         )
-        if isTableCreated:
-            print("✅ Table created successfully")
+        return
+
+    manifest = LabelSyncManifest()
+    checkpoint = CheckpointJournal("update_labels", resume=args.resume)
+    # The labels table is append-only: an interrupted upload is resumed with the
+    # same CSV, so the chunks that already succeeded are not inserted again
+    pending = checkpoint.pending_export()
+    if pending:
+        print(f"📤 Resuming the upload of the interrupted run: {pending['path']}")
+        file_path = pending["path"]
+        complete = pending["complete"]
+    else:
+        # ====================
+        # PRODUCTION MODE: Fetch addresses from Dune and call Arkham API
+        # ====================
+        print("📊 Fetching addresses from Dune...")
+        ranks = None
+        if args.rank_column:
+            # Ranked read: the largest wallets are labeled first
+            ranks = AddressNormalizer().normalize_ranked(
+                duneServiceWalle.queryRankedRowDataByTableId(
+                    DUNE_TABLE_ID, "user_addr", args.rank_column
+                )
+            )
+            address_params = list(ranks)
         else:
-            print("ℹ️  Table already exists, continuing...")
-    except Exception as e:
-        print(f"⚠️  Table check: {str(e)}")
-        print("ℹ️  Assuming table exists, continuing...")
+            address_params = duneServiceWalle.queryRowDataByTableId(DUNE_TABLE_ID, "user_addr")
+            address_params = AddressNormalizer().normalize(address_params)
 
-    # ====================
-    # PRODUCTION MODE: Fetch addresses from Dune and call Arkham API
-    # ====================
-    print("📊 Fetching addresses from Dune...")
-    address_params = duneServiceWalle.queryRowDataByTableId(DUNE_TABLE_ID, "user_addr")
-    
-    if not address_params:
-        print("❌ No addresses found in Dune table")
-        return
-    
-    print(f"✅ Found {len(address_params)} addresses")
-    
-    print("🔍 Fetching labels from Arkham API...")
-    labelService = LabelService(ARKHAM_API_KEY)
-    file_path = labelService.export_labels(address_params)
+        if not address_params:
+            print("❌ No addresses found in Dune table")
+            return
     
+        print(f"✅ Found {len(address_params)} addresses")
+
+        # ====================
+        # INCREMENTAL MODE: Only label addresses not yet synced (or stale)
+        # ====================
+        if args.labels_query_id:
+            print("📊 Seeding label manifest from the Dune labels table...")
+            existing_addresses = duneServiceWalle.queryRowDataByTableId(
+                args.labels_query_id, "address"
+            )
+            print(f"ℹ️  {manifest.seed(existing_addresses)} addresses added to manifest")
+
+        if not args.full:
+            address_params, skipped_count = manifest.filter_pending(
+                address_params, args.max_age_days
+            )
+            print(
+                f"ℹ️  Incremental sync: {len(address_params)} new or stale addresses, "
+                f"{skipped_count} already synced"
+            )
+            if not address_params:
+                print("✅ Labels table is already up to date")
+                return
+
+        print("🔍 Fetching labels from Arkham API...")
+        labelService = LabelService(ARKHAM_API_KEY, budget=budget)
+        file_path = labelService.export_labels(
+            address_params, checkpoint=checkpoint, ranks=ranks
+        )
+        complete = budget is None or not budget.exhausted
+        if file_path:
+            checkpoint.record_export(file_path, complete)
+    checkpoint.close()
+
     if not file_path or not os.path.exists(file_path):
         print("❌ Failed to get labels from Arkham")
         return
@@ -70,7 +196,21 @@ def main():
 
     # Upload CSV to Dune table (append mode)
     print("📤 Uploading data to Dune...")
-    duneServiceWalle.insertCsvToTable(file_path, DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME)
+    isInserted = duneServiceWalle.insertCsvToTable(
+        file_path, DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME
+    )
+    if isInserted:
+        synced_count = manifest.mark_synced_from_csv(file_path)
+        print(f"✅ {synced_count} addresses recorded in label manifest")
+        if complete:
+            checkpoint.discard()
+        else:
+            # Keep the addresses for --resume but not their rows, which are
+            # already in the append-only labels table
+            checkpoint.mark_uploaded()
+            checkpoint.close()
+            if pending:
+                print("ℹ️  Re-run with --resume to continue with the remaining addresses")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
@@ -8,9 +9,87 @@ from config import (
 )
 from services.dune.table_api import TableApi
 from services.arkham.portfolio_service import PortfolioService
+from services.arkham.checkpoint import CheckpointJournal
+from services.arkham.work_queue import RunBudget
+from services.arkham.portfolio_snapshot import PortfolioSnapshotStore
+from services.common.address_normalizer import AddressNormalizer
+from services.common.logger import configure_logging
+from services.common.metrics import report_metrics_at_exit
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync Arkham whale portfolios to Dune")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping addresses already in its checkpoint",
+    )
+    parser.add_argument(
+        "--view-query-id",
+        type=int,
+        default=None,
+        help="Dune query readers use to access the portfolio table; enables staged "
+        "loading into a versioned table instead of clearing the table in place",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Append only added, changed and removed rows since the last uploaded "
+        "snapshot to the portfolio history table",
+    )
+    parser.add_argument(
+        "--rank-column",
+        default=None,
+        help="Numeric column of the address query to crawl by, highest first "
+        "(e.g. a USD balance), so the largest wallets are covered first",
+    )
+    parser.add_argument(
+        "--time-budget-minutes",
+        type=float,
+        default=None,
+        help="Stop starting new Arkham requests after this many minutes",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=None,
+        help="Stop after this many Arkham requests",
+    )
+    parser.add_argument(
+        "--migrate-schema",
+        action="store_true",
+        help="Recreate the portfolio table when its column types differ from the "
+        "typed schema; safe because the table is fully replaced on every run",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Minimum log level; DEBUG adds one line per address",
+    )
+    parser.add_argument(
+        "--log-json",
+        default=None,
+        help="Also write every log record as a JSON line to this file",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Write request metrics at the end of the run (.prom for Prometheus text, JSON otherwise)",
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+    configure_logging(args.log_level, args.log_json)
+    report_metrics_at_exit(args.metrics_out)
+    budget = None
+    if args.time_budget_minutes or args.max_requests:
+        budget = RunBudget(
+            args.time_budget_minutes * 60 if args.time_budget_minutes else None,
+            args.max_requests,
+        )
 
     DUNE_TABLE_QUERY_ID = 6074774
     DUNE_TABLE_NAME_SPACE = "sparkdotfi"
@@ -20,37 +99,160 @@ def main():
         {"name": "chain", "type": "varchar"},  # Wallet chain column
         {"name": "address", "type": "varbinary"},  # Wallet address column
         {"name": "symbol", "type": "varchar"},  # Token symbol column
-        {"name": "balance", "type": "varchar"},  # Token balance column
-        {"name": "price", "type": "varchar"},  # Token price column
-        {"name": "usd", "type": "varchar"},  # USD value column
+        {"name": "balance", "type": "double"},  # Token balance column
+        {"name": "price", "type": "double"},  # Token price column
+        {"name": "usd", "type": "double"},  # USD value column
+    ]
+    HISTORY_TABLE_NAME = "dataset_whale_portfolio_history_arkham_api"
+    HISTORY_TABLE_DESCRIPTION = "Whale portfolio changes between Arkham snapshots"
+    HISTORY_SCHEMA: list[dict[str, str]] = [
+        {"name": "snapshot_time", "type": "timestamp"},  # Run that saw the change
+        {"name": "change_type", "type": "varchar"},  # added, changed or removed
+        {"name": "chain", "type": "varchar"},  # Wallet chain column
+        {"name": "address", "type": "varbinary"},  # Wallet address column
+        {"name": "token_id", "type": "varchar"},  # Arkham token id column
+        {"name": "symbol", "type": "varchar"},  # Token symbol column
+        {"name": "balance", "type": "double"},  # Token balance column
+        {"name": "price", "type": "double"},  # Token price column
+        {"name": "usd", "type": "double"},  # USD value column
     ]
     isPrevate = False
     duneServiceWalle = TableApi(DUNE_API_KEY_WALLE)
 
-    isTableCreated = duneServiceWalle.createTable(
-        DUNE_TABLE_NAME_SPACE,
-        DUNE_TABLE_NAME,
-        DUNE_TABLE_DESCRIPTION,
-        SCHEMA,
-        isPrevate,
-    )
+    if args.delta:
+        isTableCreated = duneServiceWalle.createTable(
+            DUNE_TABLE_NAME_SPACE,
+            HISTORY_TABLE_NAME,
+            HISTORY_TABLE_DESCRIPTION,
+            HISTORY_SCHEMA,
+            isPrevate,
+        )
+    elif args.view_query_id:
+        isTableCreated = True  # The staged load creates typed, versioned tables
+    elif args.migrate_schema:
+        isTableCreated = duneServiceWalle.migrateTableSchema(
+            DUNE_TABLE_NAME_SPACE,
+            DUNE_TABLE_NAME,
+            DUNE_TABLE_DESCRIPTION,
+            SCHEMA,
+            isPrevate,
+        )
+    else:
+        isTableCreated = duneServiceWalle.createTable(
+            DUNE_TABLE_NAME_SPACE,
+            DUNE_TABLE_NAME,
+            DUNE_TABLE_DESCRIPTION,
+            SCHEMA,
+            isPrevate,
+        )
     if not isTableCreated:
+        if not args.delta and not args.migrate_schema:
+            print(
+                "ℹ️  Re-run with --migrate-schema to recreate the portfolio table, "
+                "or with --view-query-id for a staged load"
+            )
         return
 
-    address_params = duneServiceWalle.queryRowDataByTableId(
-        DUNE_TABLE_QUERY_ID, "user_addr"
+    snapshotStore = None
+    if args.delta:
+        snapshotStore = PortfolioSnapshotStore()
+        if not args.resume:
+            snapshotStore.rollback()  # Drop rows staged by an earlier failed run
+
+    checkpoint = CheckpointJournal(
+        "update_portfolio_delta" if args.delta else "update_portfolio",
+        resume=args.resume,
     )
-    if not address_params:
+    # An interrupted upload is resumed with the same CSV: chunks already appended
+    # to the history table are not inserted again, and a staged load reuses its
+    # half-loaded shadow table instead of discarding it
+    pending = checkpoint.pending_export()
+    if pending:
+        print(f"📤 Resuming the upload of the interrupted run: {pending['path']}")
+        file_path = pending["path"]
+        complete = pending["complete"]
+    else:
+        normalizer = AddressNormalizer()
+        ranks = None
+        if args.rank_column:
+            # Ranking needs the whole list, so the largest wallets can be crawled first
+            ranks = normalizer.normalize_ranked(
+                duneServiceWalle.queryRankedRowDataByTableId(
+                    DUNE_TABLE_QUERY_ID, "user_addr", args.rank_column
+                )
+            )
+            address_params = list(ranks)
+        else:
+            # Stream addresses page by page so the crawl starts with the first page
+            address_params = normalizer.iter_normalize(
+                duneServiceWalle.streamRowDataByTableId(DUNE_TABLE_QUERY_ID, "user_addr")
+            )
+
+        portfolioService = PortfolioService(ARKHAM_API_KEY, budget=budget)
+        file_path = portfolioService.export_portfolios(
+            address_params,
+            checkpoint=checkpoint,
+            snapshot_store=snapshotStore,
+            ranks=ranks,
+        )
+        if ranks is None:
+            normalizer.print_summary()
+        complete = budget is None or not budget.exhausted
+        if file_path and not complete and not args.delta:
+            # Replacing the table with a partial crawl would drop the wallets not
+            # reached yet until a resumed run completes it
+            print(
+                "⏱️  Budget reached: the portfolio table is not replaced with partial "
+                "results, re-run with --resume to finish the crawl"
+            )
+            checkpoint.close()
+            return
+        if file_path:
+            checkpoint.record_export(file_path, complete)
+    checkpoint.close()
+    if not file_path:
         return
 
-    portfolioService = PortfolioService(ARKHAM_API_KEY)
-    file_path = portfolioService.export_portfolios(address_params)
+    if args.delta:
+        # History table is append-only: only the changed rows are inserted
+        isInserted = duneServiceWalle.insertCsvToTable(
+            file_path, DUNE_TABLE_NAME_SPACE, HISTORY_TABLE_NAME
+        )
+        if isInserted:
+            committed_count = snapshotStore.commit()
+            print(f"✅ Snapshot updated for {committed_count} addresses")
+        snapshotStore.close()
+    elif args.view_query_id:
+        # Staged load: readers keep the current version until the new one is complete
+        isInserted = duneServiceWalle.stagedLoadCsvToTable(
+            file_path,
+            DUNE_TABLE_NAME_SPACE,
+            DUNE_TABLE_NAME,
+            DUNE_TABLE_DESCRIPTION,
+            SCHEMA,
+            args.view_query_id,
+            isPrevate,
+        )
+    else:
+        isClear = duneServiceWalle.clearTable(DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME)
+        if not isClear:
+            return
 
-    isClear = duneServiceWalle.clearTable(DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME)
-    if not isClear:
+        # The table was just cleared, so every chunk is uploaded again
+        isInserted = duneServiceWalle.insertCsvToTable(
+            file_path, DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME, resume=False
+        )
+    if not isInserted:
         return
-
-    duneServiceWalle.insertCsvToTable(file_path, DUNE_TABLE_NAME_SPACE, DUNE_TABLE_NAME)
+    if complete:
+        checkpoint.discard()
+    else:
+        # Only delta runs upload partial results: keep the addresses for --resume
+        # but not their rows, which are already in the append-only history table
+        checkpoint.mark_uploaded()
+        checkpoint.close()
+        if pending:
+            print("ℹ️  Re-run with --resume to continue with the remaining addresses")
 
 
 if __name__ == "__main__":
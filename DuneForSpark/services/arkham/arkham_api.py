@@ -1,9 +1,22 @@
 import requests
 import time
-import threading
-from typing import Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
 from .portfolio_model import WalletPortfolio
 from .label_model import WalletLabel
+from .http_session import connection_stats, create_pooled_session
+from ..common.json_decoder import JsonLoads, loads as default_json_loads, portfolio_loads
+from ..common.logger import get_logger, truncate_body
+from ..common.metrics import RequestMetrics, get_shared_metrics
+from .rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    TokenBucketRateLimiter,
+    get_shared_concurrency_limiter,
+    get_shared_rate_limiter,
+)
+
+logger = get_logger("arkham_api")
 
 
 class ArkhamApi:
@@ -11,15 +24,26 @@ class ArkhamApi:
     Client for interacting with the Arkham Intelligence API.
 
     This class provides methods to query wallet portfolio data and wallet labels
-    from the Arkham Intelligence API. It manages API authentication, request delays,
-    and thread-safe session management.
+    from the Arkham Intelligence API. It manages API authentication, shared rate
+    limiting, adaptive 429 handling, and a keep-alive connection pool shared by
+    all worker threads.
     """
 
     def __init__(
         self,
         api_key: str,
         base_url: str = "https://api.arkm.com",  # Default Arkham API base URL
-        request_delay: float = 0.07,  # Delay between requests in seconds
+        requests_per_second: float = 15.0,  # Sustained request rate across all threads
+        burst: int = 5,  # Maximum back-to-back requests
+        max_concurrency: int = 10,  # Maximum in-flight requests across all threads
+        max_throttle_retries: int = 3,  # In-place retries after a 429 response
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        pool_maxsize: Optional[int] = None,  # Kept-alive connections (defaults to max_concurrency)
+        session: Optional[requests.Session] = None,
+        json_loads: Optional[JsonLoads] = None,
+        portfolio_json_loads: Optional[JsonLoads] = None,
+        metrics: Optional[RequestMetrics] = None,
     ):
         """
         Initialize the ArkhamApi client.
@@ -27,31 +51,245 @@ class ArkhamApi:
         Args:
             api_key: API key for authentication with Arkham Intelligence
             base_url: Base URL for the Arkham API endpoint
-            request_delay: Delay in seconds between consecutive API requests
+            requests_per_second: Sustained request rate used when creating the shared limiter
+            burst: Burst size used when creating the shared limiter
+            max_concurrency: In-flight request cap used when creating the shared limiter
+            max_throttle_retries: Number of times a throttled request is retried in place
+            rate_limiter: Optional limiter to use instead of the process-wide shared one
+            concurrency_limiter: Optional concurrency limiter to use instead of the shared one
+            pool_maxsize: Size of the shared connection pool (defaults to max_concurrency)
+            session: Optional pre-configured session to use instead of creating a pooled one
+            json_loads: Optional decoder for raw response bodies (defaults to orjson
+                when installed, otherwise the standard library)
+            portfolio_json_loads: Optional decoder for portfolio bodies (defaults to
+                the default decoder, switching to exact decoding for bodies whose
+                numbers a float cannot hold; pass exact_loads to always decode exactly)
+            metrics: Optional metrics registry to use instead of the process-wide one
         """
         self.api_key = api_key
         self.base_url = base_url
-        self.request_delay = request_delay
-        self.thread_local = (
-            threading.local()
-        )  # Thread-local storage for session management
+        self.max_throttle_retries = max_throttle_retries
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(
+            requests_per_second, burst
+        )
+        self.concurrency_limiter = (
+            concurrency_limiter or get_shared_concurrency_limiter(max_concurrency)
+        )
+        self.session = session or create_pooled_session(
+            pool_maxsize=pool_maxsize or max_concurrency
+        )  # Shared by all threads so warm connections survive across retries
+        self.json_loads = json_loads or default_json_loads
+        self.portfolio_json_loads = portfolio_json_loads or portfolio_loads
+        self.metrics = metrics or get_shared_metrics()
 
     def _get_session(self):
         """
-        Get or create a thread-local requests session.
+        Get the pooled requests session shared by all worker threads.
+
+        Returns:
+            requests.Session: Shared session object
+        """
+        return self.session
 
-        This method ensures each thread has its own session object for thread-safe
-        HTTP communication with the API.
+    def connection_stats(self) -> dict:
+        """
+        Report how many requests reused a kept-alive connection.
 
         Returns:
-            requests.Session: Thread-local session object
+            dict: requests, new_connections, reused_connections and reuse_rate
+        """
+        return connection_stats(self.session)
+
+    @staticmethod
+    def _parse_retry_after(response) -> Optional[float]:
         """
-        if not hasattr(self.thread_local, "session"):
-            self.thread_local.session = requests.Session()
-        return self.thread_local.session
+        Work out how long the server asked us to back off from a throttled response.
+
+        Supports the standard `Retry-After` header (delta seconds or HTTP date) and
+        the common `X-RateLimit-Reset` header (delta seconds, or epoch seconds or
+        milliseconds).
+
+        Args:
+            response: Throttled HTTP response
+
+        Returns:
+            float: Seconds to wait, or None if the response carries no hint
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return max(
+                        0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()
+                    )
+                except (TypeError, ValueError):
+                    pass
+
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset:
+            try:
+                reset_value = float(reset)
+            except ValueError:
+                return None
+            if reset_value > 1e12:  # Epoch milliseconds
+                return max(0.0, reset_value / 1000 - time.time())
+            if reset_value > 1e9:  # Epoch seconds
+                return max(0.0, reset_value - time.time())
+            return max(0.0, reset_value)
+
+        return None
+
+    def _observe_rate_limit_headers(self, response) -> None:
+        """
+        Pause the shared limiter early when the server reports an exhausted quota.
+
+        Args:
+            response: Successful HTTP response
+        """
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        try:
+            if int(float(remaining)) > 0:
+                return
+        except ValueError:
+            return
+        wait_time = self._parse_retry_after(response)
+        if wait_time:
+            self.rate_limiter.pause(wait_time)
+
+    def _record_failure(
+        self, endpoint: str, failure: str, request_start: Optional[float]
+    ) -> None:
+        """
+        Record a request that ended without an HTTP response.
+
+        Args:
+            endpoint: Endpoint name used in metrics
+            failure: Failure name recorded in place of a status code
+            request_start: Monotonic time the request was sent, or None if it never was
+        """
+        if request_start is not None:
+            self.metrics.record_request(
+                endpoint, failure, time.monotonic() - request_start
+            )
+
+    def _send_request(
+        self,
+        address: str,
+        url: str,
+        params: Optional[dict] = None,
+        endpoint: str = "arkham",
+        json_loads: Optional[JsonLoads] = None,
+    ) -> Optional[dict]:
+        """
+        Send a rate-limited GET request and return the decoded JSON body.
+
+        Throttled (HTTP 429) responses reduce the shared request rate and
+        concurrency, pause all workers for the server-provided Retry-After period,
+        and are retried in place up to max_throttle_retries times. Successful
+        responses let the rate and concurrency recover.
+
+        Args:
+            address: Wallet address being queried (for logging purposes)
+            url: Request URL
+            params: Optional query parameters
+            endpoint: Endpoint name under which the request is recorded in metrics
+            json_loads: Optional decoder for this body (defaults to self.json_loads)
+
+        Returns:
+            dict: Decoded JSON response body, or None if the request fails
+        """
+        headers = {
+            "Accept": "application/json",
+            "API-Key": self.api_key,
+        }  # Request headers with authentication
+
+        for attempt in range(self.max_throttle_retries + 1):
+            request_start = None
+            try:
+                self.metrics.record_sleep("rate_limit", self.rate_limiter.acquire())
+
+                queued_at = time.monotonic()
+                with self.concurrency_limiter:
+                    request_start = time.monotonic()
+                    self.metrics.record_sleep(
+                        "concurrency_limit", request_start - queued_at
+                    )
+                    session = self._get_session()
+                    response = session.get(
+                        url, params=params, headers=headers, timeout=15
+                    )  # Request timeout in seconds
+                    content = response.content  # Read the body inside the timed window
+                self.metrics.record_request(
+                    endpoint,
+                    response.status_code,
+                    time.monotonic() - request_start,
+                    bytes_downloaded=len(content),
+                )
+
+                if response.status_code == 200:  # Success status code
+                    self.rate_limiter.on_success()
+                    self.concurrency_limiter.on_success()
+                    self._observe_rate_limit_headers(response)
+                    return (json_loads or self.json_loads)(content)  # Decode the raw bytes
+
+                elif response.status_code == 429:  # Rate limit error code
+                    retry_after = self._parse_retry_after(response)
+                    if retry_after is None:
+                        retry_after = 2.0  # Fallback backoff when the server gives no hint
+                    self.rate_limiter.on_throttle(retry_after)
+                    self.concurrency_limiter.on_throttle()
+                    self.metrics.record_retry(endpoint, "throttled")
+                    logger.debug(
+                        f"Error 429 Address: {address} - Too many requests, "
+                        f"rate lowered to {self.rate_limiter.requests_per_second:.2f} req/s, "
+                        f"retry after {retry_after:.1f}s "
+                        f"(attempt {attempt + 1}/{self.max_throttle_retries + 1})"
+                    )
+                    continue
+
+                elif response.status_code == 400:  # Bad request error code
+                    logger.warning(
+                        f"Error 400 Address: {address} - Request parameter error: {truncate_body(response.text)}"
+                    )
+                elif response.status_code == 401:  # Unauthorized error code
+                    logger.warning(
+                        f"Error 401 Address: {address} - Unauthorized access: {truncate_body(response.text)}"
+                    )
+                elif response.status_code == 500:  # Internal server error code
+                    logger.warning(
+                        f"Error 500 Address: {address} - Server internal error: {truncate_body(response.text)}"
+                    )
+                else:
+                    logger.warning(
+                        f"Error {response.status_code} Address: {address} - {truncate_body(response.text)}"
+                    )
+
+            except requests.exceptions.Timeout:
+                self._record_failure(endpoint, "timeout", request_start)
+                logger.warning(f"Timeout Address: {address} - Request timeout")
+            except requests.exceptions.ConnectionError:
+                self._record_failure(endpoint, "connection_error", request_start)
+                logger.warning(f"Connection Error Address: {address} - Connection failed")
+            except requests.exceptions.RequestException as e:
+                self._record_failure(endpoint, "request_error", request_start)
+                logger.warning(f"Request Exception Address: {address} - {str(e)}")
+            except Exception as e:
+                logger.warning(f"Unknown Exception Address: {address} - {str(e)}")
+
+            return None
+
+        return None
 
     def get_portfolio(
-        self, address: str, time_param: Optional[int] = None
+        self,
+        address: str,
+        time_param: Optional[int] = None,
+        chains: Optional[Iterable[str]] = None,
     ) -> Optional[WalletPortfolio]:
         """
         Retrieve wallet portfolio data for a given address.
@@ -62,6 +300,7 @@ class ArkhamApi:
         Args:
             address: Wallet address to query
             time_param: Timestamp in milliseconds for historical data (defaults to current time)
+            chains: Optional chain allowlist; other chains in the response are not parsed
 
         Returns:
             WalletPortfolio: Portfolio object containing wallet data, or None if request fails
@@ -70,60 +309,36 @@ class ArkhamApi:
             time_param = int(time.time() * 1000)  # Current timestamp in milliseconds
 
         url = f"{self.base_url}/portfolio/address/{address}"  # Portfolio endpoint URL
-
         params = {"time": time_param}  # Query parameters
-        headers = {
-            "Accept": "application/json",
-            "API-Key": self.api_key,
-        }  # Request headers with authentication
 
-        try:
-            time.sleep(self.request_delay)
-
-            session = self._get_session()
-            response = session.get(
-                url, params=params, headers=headers, timeout=15
-            )  # Request timeout in seconds
+        response_data = self._send_request(
+            address, url, params, "arkham_portfolio", self.portfolio_json_loads
+        )
+        if response_data is None:
+            return None
 
-            if response.status_code == 200:  # Success status code
-                response_data = response.json()
-                wallet_portfolio = WalletPortfolio.from_response(address, response_data)
-                return wallet_portfolio
+        try:
+            return WalletPortfolio.from_response(address, response_data, chains)
+        except Exception as e:
+            logger.warning(f"Parse Exception Address: {address} - {str(e)}")
+            return None
 
-            elif response.status_code == 400:  # Bad request error code
-                print(
-                    f"Error 400 Address: {address} - Request parameter error: {response.text}"
-                )
-            elif response.status_code == 401:  # Unauthorized error code
-                print(
-                    f"Error 401 Address: {address} - Unauthorized access: {response.text}"
-                )
-            elif response.status_code == 429:  # Rate limit error code
-                print(
-                    f"Error 429 Address: {address} - Too many requests, API rate limit: {response.text}"
-                )
-                time.sleep(2)  # Backoff delay for rate limiting
-            elif response.status_code == 500:  # Internal server error code
-                print(
-                    f"Error 500 Address: {address} - Server internal error: {response.text}"
-                )
-            else:
-                print(
-                    f"Error {response.status_code} Address: {address} - {response.text}"
-                )
+    def get_label_data(self, address: str) -> Optional[dict]:
+        """
+        Retrieve the raw label and intelligence response for a given address.
 
-        except requests.exceptions.Timeout:
-            print(f"Timeout Address: {address} - Request timeout")
-        except requests.exceptions.ConnectionError:
-            print(f"Connection Error Address: {address} - Connection failed")
-        except requests.exceptions.RequestException as e:
-            print(f"Request Exception Address: {address} - {str(e)}")
-        except Exception as e:
-            print(f"Unknown Exception Address: {address} - {str(e)}")
+        Args:
+            address: Wallet address to query
 
-        return None
+        Returns:
+            dict: Raw response data keyed by chain name, or None if request fails
+        """
+        url = f"{self.base_url}/intelligence/address/{address}/all"  # Intelligence endpoint URL
+        return self._send_request(address, url, endpoint="arkham_intelligence")
 
-    def get_label(self, address: str) -> Optional[WalletLabel]:
+    def get_label(
+        self, address: str, chains: Optional[Iterable[str]] = None
+    ) -> Optional[WalletLabel]:
         """
         Retrieve wallet label and intelligence data for a given address.
 
@@ -132,58 +347,17 @@ class ArkhamApi:
 
         Args:
             address: Wallet address to query
+            chains: Optional chain allowlist; other chains in the response are not parsed
 
         Returns:
             WalletLabel: Label object containing wallet intelligence data, or None if request fails
         """
-        url = f"{self.base_url}/intelligence/address/{address}/all"  # Intelligence endpoint URL
-        headers = {
-            "Accept": "application/json",
-            "API-Key": self.api_key,
-        }  # Request headers with authentication
+        response_data = self.get_label_data(address)
+        if response_data is None:
+            return None
 
         try:
-            time.sleep(self.request_delay)
-
-            session = self._get_session()
-            response = session.get(
-                url, headers=headers, timeout=15
-            )  # Request timeout in seconds
-
-            if response.status_code == 200:  # Success status code
-                response_data = response.json()
-                wallet_label = WalletLabel.from_response(address, response_data)
-                return wallet_label
-
-            elif response.status_code == 400:  # Bad request error code
-                print(
-                    f"Error 400 Address: {address} - Request parameter error: {response.text}"
-                )
-            elif response.status_code == 401:  # Unauthorized error code
-                print(
-                    f"Error 401 Address: {address} - Unauthorized access: {response.text}"
-                )
-            elif response.status_code == 429:  # Rate limit error code
-                print(
-                    f"Error 429 Address: {address} - Too many requests, API rate limit: {response.text}"
-                )
-                time.sleep(2)  # Backoff delay for rate limiting
-            elif response.status_code == 500:  # Internal server error code
-                print(
-                    f"Error 500 Address: {address} - Server internal error: {response.text}"
-                )
-            else:
-                print(
-                    f"Error {response.status_code} Address: {address} - {response.text}"
-                )
-
-        except requests.exceptions.Timeout:
-            print(f"Timeout Address: {address} - Request timeout")
-        except requests.exceptions.ConnectionError:
-            print(f"Connection Error Address: {address} - Connection failed")
-        except requests.exceptions.RequestException as e:
-            print(f"Request Exception Address: {address} - {str(e)}")
+            return WalletLabel.from_response(address, response_data, chains)
         except Exception as e:
-            print(f"Unknown Exception Address: {address} - {str(e)}")
-
-        return None
+            logger.warning(f"Parse Exception Address: {address} - {str(e)}")
+            return None
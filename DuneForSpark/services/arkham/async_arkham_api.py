@@ -0,0 +1,290 @@
+import asyncio
+import time
+from typing import Iterable, Optional
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency, only needed for the async client
+    aiohttp = None
+
+from .arkham_api import ArkhamApi
+from .portfolio_model import WalletPortfolio
+from .label_model import WalletLabel
+from ..common.json_decoder import JsonLoads, loads as default_json_loads, portfolio_loads
+from ..common.logger import get_logger, truncate_body
+from ..common.metrics import RequestMetrics, get_shared_metrics
+from .rate_limiter import TokenBucketRateLimiter, get_shared_rate_limiter
+
+logger = get_logger("async_arkham_api")
+
+
+class AsyncArkhamApi:
+    """
+    Asynchronous client for the Arkham Intelligence API built on aiohttp.
+
+    This class mirrors the get_label/get_portfolio surface of ArkhamApi and
+    returns the same WalletLabel/WalletPortfolio models, but runs on a single
+    event loop so hundreds of requests can be in flight at once. Fan-out is
+    bounded by a semaphore and the request rate by the same shared token-bucket
+    limiter used by the threaded client.
+
+    Use it as an async context manager so the underlying HTTP session is
+    opened and closed with the event loop:
+
+        async with AsyncArkhamApi(api_key) as api:
+            label = await api.get_label(address)
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.arkm.com",  # Default Arkham API base URL
+        requests_per_second: float = 15.0,  # Sustained request rate across all clients
+        burst: int = 5,  # Maximum back-to-back requests
+        max_concurrency: int = 100,  # Maximum in-flight requests on the event loop
+        max_throttle_retries: int = 3,  # In-place retries after a 429 response
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        json_loads: Optional[JsonLoads] = None,
+        portfolio_json_loads: Optional[JsonLoads] = None,
+        metrics: Optional[RequestMetrics] = None,
+    ):
+        """
+        Initialize the AsyncArkhamApi client.
+
+        Args:
+            api_key: API key for authentication with Arkham Intelligence
+            base_url: Base URL for the Arkham API endpoint
+            requests_per_second: Sustained request rate used when creating the shared limiter
+            burst: Burst size used when creating the shared limiter
+            max_concurrency: Maximum number of requests in flight at once
+            max_throttle_retries: Number of times a throttled request is retried in place
+            rate_limiter: Optional limiter to use instead of the process-wide shared one
+            json_loads: Optional decoder for raw response bodies (defaults to orjson
+                when installed, otherwise the standard library)
+            portfolio_json_loads: Optional decoder for portfolio bodies (defaults to
+                the default decoder, switching to exact decoding for bodies whose
+                numbers a float cannot hold; pass exact_loads to always decode exactly)
+            metrics: Optional metrics registry to use instead of the process-wide one
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for AsyncArkhamApi, install it with 'pip install aiohttp'"
+            )
+
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.max_throttle_retries = max_throttle_retries
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(
+            requests_per_second, burst
+        )
+        self.json_loads = json_loads or default_json_loads
+        self.portfolio_json_loads = portfolio_json_loads or portfolio_loads
+        self.metrics = metrics or get_shared_metrics()
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.session: Optional["aiohttp.ClientSession"] = None
+
+    async def __aenter__(self) -> "AsyncArkhamApi":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """
+        Open the HTTP session. Must be called from a running event loop.
+        """
+        if self.session is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "Accept": "application/json",
+                    "API-Key": self.api_key,
+                },  # Request headers with authentication
+                timeout=aiohttp.ClientTimeout(total=15),  # Request timeout in seconds
+            )
+
+    async def close(self) -> None:
+        """
+        Close the HTTP session.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _record_failure(
+        self, endpoint: str, failure: str, request_start: Optional[float]
+    ) -> None:
+        """
+        Record a request that ended without an HTTP response.
+
+        Args:
+            endpoint: Endpoint name used in metrics
+            failure: Failure name recorded in place of a status code
+            request_start: Monotonic time the request was sent, or None if it never was
+        """
+        if request_start is not None:
+            self.metrics.record_request(
+                endpoint, failure, time.monotonic() - request_start
+            )
+
+    async def _send_request(
+        self,
+        address: str,
+        url: str,
+        params: Optional[dict] = None,
+        json_loads: Optional[JsonLoads] = None,
+        endpoint: str = "arkham",
+    ) -> Optional[dict]:
+        """
+        Send a rate-limited GET request and return the decoded JSON body.
+
+        Args:
+            address: Wallet address being queried (for logging purposes)
+            url: Request URL
+            params: Optional query parameters
+            json_loads: Optional decoder for this body (defaults to self.json_loads)
+            endpoint: Endpoint name under which the request is recorded in metrics
+
+        Returns:
+            dict: Decoded JSON response body, or None if the request fails
+        """
+        await self.open()
+
+        for attempt in range(self.max_throttle_retries + 1):
+            request_start = None
+            try:
+                wait_time = self.rate_limiter.reserve()
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+                    self.metrics.record_sleep("rate_limit", wait_time)
+
+                queued_at = time.monotonic()
+                async with self.semaphore:
+                    request_start = time.monotonic()
+                    self.metrics.record_sleep(
+                        "concurrency_limit", request_start - queued_at
+                    )
+                    async with self.session.get(url, params=params) as response:
+                        content = await response.read()  # Read the body inside the timed window
+                        self.metrics.record_request(
+                            endpoint,
+                            response.status,
+                            time.monotonic() - request_start,
+                            bytes_downloaded=len(content),
+                        )
+
+                        if response.status == 200:  # Success status code
+                            self.rate_limiter.on_success()
+                            return (json_loads or self.json_loads)(content)
+
+                        if response.status == 429:  # Rate limit error code
+                            retry_after = ArkhamApi._parse_retry_after(response)
+                            if retry_after is None:
+                                retry_after = 2.0  # Fallback backoff when the server gives no hint
+                            self.rate_limiter.on_throttle(retry_after)
+                            self.metrics.record_retry(endpoint, "throttled")
+                            logger.debug(
+                                f"Error 429 Address: {address} - Too many requests, "
+                                f"rate lowered to {self.rate_limiter.requests_per_second:.2f} req/s, "
+                                f"retry after {retry_after:.1f}s "
+                                f"(attempt {attempt + 1}/{self.max_throttle_retries + 1})"
+                            )
+                            continue
+
+                        text = content.decode("utf-8", errors="replace")
+                        logger.warning(
+                            f"Error {response.status} Address: {address} - {truncate_body(text)}"
+                        )
+
+            except asyncio.TimeoutError:
+                self._record_failure(endpoint, "timeout", request_start)
+                logger.warning(f"Timeout Address: {address} - Request timeout")
+            except aiohttp.ClientConnectionError:
+                self._record_failure(endpoint, "connection_error", request_start)
+                logger.warning(f"Connection Error Address: {address} - Connection failed")
+            except aiohttp.ClientError as e:
+                self._record_failure(endpoint, "request_error", request_start)
+                logger.warning(f"Request Exception Address: {address} - {str(e)}")
+            except Exception as e:
+                logger.warning(f"Unknown Exception Address: {address} - {str(e)}")
+
+            return None
+
+        return None
+
+    async def get_portfolio(
+        self,
+        address: str,
+        time_param: Optional[int] = None,
+        chains: Optional[Iterable[str]] = None,
+    ) -> Optional[WalletPortfolio]:
+        """
+        Retrieve wallet portfolio data for a given address.
+
+        Args:
+            address: Wallet address to query
+            time_param: Timestamp in milliseconds for historical data (defaults to current time)
+            chains: Optional chain allowlist; other chains in the response are not parsed
+
+        Returns:
+            WalletPortfolio: Portfolio object containing wallet data, or None if request fails
+        """
+        if time_param is None:
+            time_param = int(time.time() * 1000)  # Current timestamp in milliseconds
+
+        url = f"{self.base_url}/portfolio/address/{address}"  # Portfolio endpoint URL
+        params = {"time": time_param}  # Query parameters
+
+        response_data = await self._send_request(
+            address, url, params, self.portfolio_json_loads, "arkham_portfolio"
+        )
+        if response_data is None:
+            return None
+
+        try:
+            return WalletPortfolio.from_response(address, response_data, chains)
+        except Exception as e:
+            logger.warning(f"Parse Exception Address: {address} - {str(e)}")
+            return None
+
+    async def get_label_data(self, address: str) -> Optional[dict]:
+        """
+        Retrieve the raw label and intelligence response for a given address.
+
+        Args:
+            address: Wallet address to query
+
+        Returns:
+            dict: Raw response data keyed by chain name, or None if request fails
+        """
+        url = f"{self.base_url}/intelligence/address/{address}/all"  # Intelligence endpoint URL
+        return await self._send_request(
+            address, url, endpoint="arkham_intelligence"
+        )
+
+    async def get_label(
+        self, address: str, chains: Optional[Iterable[str]] = None
+    ) -> Optional[WalletLabel]:
+        """
+        Retrieve wallet label and intelligence data for a given address.
+
+        Args:
+            address: Wallet address to query
+            chains: Optional chain allowlist; other chains in the response are not parsed
+
+        Returns:
+            WalletLabel: Label object containing wallet intelligence data, or None if request fails
+        """
+        response_data = await self.get_label_data(address)
+        if response_data is None:
+            return None
+
+        try:
+            return WalletLabel.from_response(address, response_data, chains)
+        except Exception as e:
+            logger.warning(f"Parse Exception Address: {address} - {str(e)}")
+            return None
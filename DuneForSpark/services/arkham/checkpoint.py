@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of completed addresses for resumable crawls.
+
+    Every address that succeeds is appended to a JSON-lines file in the data
+    directory together with the CSV rows it produced, and flushed immediately.
+    When a run is resumed the journal is replayed into the new CSV and the
+    completed addresses are skipped, so an interrupted crawl continues where it
+    stopped instead of starting over.
+
+    The CSV files exported from the journal are recorded too before they are
+    uploaded. A resumed run uploads the same file again instead of exporting a
+    new one, so an interrupted chunked upload continues from its progress file
+    and chunks already appended to a table are not inserted twice.
+    """
+
+    def __init__(self, name: str, resume: bool = False, path: Optional[str] = None):
+        """
+        Initialize the CheckpointJournal.
+
+        Args:
+            name: Name of the job, used for the default journal file name
+            resume: Keep and load an existing journal instead of starting fresh
+            path: Optional path of the journal file (defaults to data/checkpoints/<name>.jsonl)
+        """
+        if path is None:
+            checkpoint_dir = os.path.join(
+                os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                ),
+                "data",
+                "checkpoints",
+            )
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            path = os.path.join(checkpoint_dir, f"{name}.jsonl")
+
+        self.path = path
+        self.completed_addresses: Set[str] = set()
+        self.exports: Dict[str, dict] = {}  # Exported CSVs by key, see record_export
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            for record in self._iter_lines():
+                if "export" in record:
+                    self.exports[record["export"]] = record
+                elif "address" in record:
+                    self.completed_addresses.add(record["address"])
+            self._file = open(path, "a+", encoding="utf-8")
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")  # Terminate a line cut off by a crash
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+
+    def _iter_lines(self) -> Iterator[dict]:
+        """
+        Read every journal line back from disk.
+
+        Lines that were only partially written before a crash are skipped.
+
+        Yields:
+            dict: Decoded journal line
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    def iter_records(self) -> Iterator[Tuple[str, List[list]]]:
+        """
+        Read the completed records back from disk.
+
+        Yields:
+            Tuple[str, List[list]]: (address, CSV rows produced for it)
+        """
+        for record in self._iter_lines():
+            if "address" in record and "rows" in record:
+                yield record["address"], record["rows"]
+
+    def _write_line(self, record: dict) -> None:
+        """
+        Append one line to the journal, reopening it if it was closed.
+
+        Args:
+            record: JSON-serializable journal line
+        """
+        line = json.dumps(record, separators=(",", ":"))
+        if self._file.closed:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    def record(self, address: str, rows: List[list]) -> None:
+        """
+        Append a completed address and its rows to the journal.
+
+        Args:
+            address: Wallet address that completed
+            rows: CSV rows produced for the address
+        """
+        with self._lock:
+            self._write_line({"address": address, "rows": rows})
+            self.completed_addresses.add(address)
+
+    def record_export(self, path: str, complete: bool = True, key: str = "csv") -> None:
+        """
+        Record a CSV exported from the journal before it is uploaded.
+
+        Args:
+            path: File path of the exported CSV
+            complete: Whether the CSV covers every requested address (False when a
+                budget stopped the run early)
+            key: Name of the export, for jobs exporting several files (e.g. one per date)
+        """
+        record = {"export": key, "path": path, "complete": complete}
+        with self._lock:
+            self._write_line(record)
+            self.exports[key] = record
+
+    def pending_export(self, key: str = "csv") -> Optional[dict]:
+        """
+        Look up a CSV exported by the interrupted run that has not been uploaded yet.
+
+        Args:
+            key: Name of the export
+
+        Returns:
+            dict: {"path": ..., "complete": ...} of the export, or None if there is
+                none or its file no longer exists
+        """
+        record = self.exports.get(key)
+        if record is None or not os.path.exists(record["path"]):
+            return None
+        return record
+
+    def close(self) -> None:
+        """
+        Close the journal file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def mark_uploaded(self) -> None:
+        """
+        Drop the journaled rows once they have been appended to an append-only table.
+
+        The completed addresses are kept, so a resumed run still skips them, but
+        their rows are no longer replayed into the next CSV and inserted twice;
+        the recorded exports are dropped as well, since they have been uploaded.
+        The journal is rewritten through a temporary file so a crash leaves
+        either the old or the new version on disk.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+            self.exports.clear()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for address in sorted(self.completed_addresses):
+                    f.write(
+                        json.dumps({"address": address, "rows": []}, separators=(",", ":"))
+                        + "\n"
+                    )
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def discard(self) -> None:
+        """
+        Close and delete the journal once its results have been safely uploaded.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
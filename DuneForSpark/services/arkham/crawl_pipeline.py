@@ -0,0 +1,278 @@
+import os
+import time
+from datetime import datetime
+from itertools import chain, zip_longest
+from typing import Dict, List, Optional, Tuple
+
+from .arkham_api import ArkhamApi
+from .checkpoint import CheckpointJournal
+from .csv_writer import StreamingCsvWriter
+from .label_model import WalletLabel
+from .label_service import LabelService
+from .portfolio_model import WalletPortfolio
+from .portfolio_service import PortfolioService
+from .work_queue import RetryWorkQueue, RunBudget
+from ..common.logger import ProgressReporter
+
+LABEL_TASK = "label"  # Work item kind for label requests
+PORTFOLIO_TASK = "portfolio"  # Work item kind for portfolio requests
+
+
+class CrawlPipeline:
+    """
+    Combined crawler fetching labels and portfolios in one pass over an address list.
+
+    Both kinds of request are scheduled as (kind, address) items on a single
+    RetryWorkQueue and sent through one ArkhamApi client, so they share the same
+    rate limiter, concurrency limiter and connection pool. Label and portfolio
+    rows are streamed to their own CSV files as each request succeeds.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.arkm.com",
+        max_workers: int = 10,
+        max_retries: int = 10,
+        requests_per_second: float = 15.0,
+        burst: int = 5,
+        retry_base_delay: float = 2.0,
+        retry_max_delay: float = 60.0,
+        use_cache: bool = True,
+        budget: Optional[RunBudget] = None,
+    ):
+        """
+        Initialize the CrawlPipeline.
+
+        Args:
+            api_key: API key for authentication with Arkham Intelligence
+            base_url: Base URL for the Arkham API endpoint
+            max_workers: Maximum number of concurrent threads shared by both request kinds
+            max_retries: Maximum number of attempts per request
+            requests_per_second: Sustained Arkham request rate shared by all threads
+            burst: Maximum number of back-to-back Arkham requests
+            retry_base_delay: Backoff delay in seconds before a request is first retried
+            retry_max_delay: Upper bound on the per-request backoff delay in seconds
+            use_cache: Serve labels from the persistent on-disk cache when still fresh
+            budget: Optional time and request budget shared by both request kinds
+        """
+        self.arkham_api = ArkhamApi(
+            api_key,
+            base_url,
+            requests_per_second=requests_per_second,
+            burst=burst,
+            max_concurrency=max_workers,
+        )
+        self.label_service = LabelService(
+            api_key,
+            base_url,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            use_cache=use_cache,
+            arkham_api=self.arkham_api,
+            budget=budget,
+        )
+        self.portfolio_service = PortfolioService(
+            api_key,
+            base_url,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            arkham_api=self.arkham_api,
+            budget=budget,
+        )
+        self.max_retries = max_retries
+        self.work_queue = RetryWorkQueue(
+            max_workers=max_workers,
+            max_retries=max_retries,
+            base_delay=retry_base_delay,
+            max_delay=retry_max_delay,
+            metrics=self.arkham_api.metrics,
+            budget=budget,
+        )
+
+    def run(
+        self,
+        addresses: List[str],
+        label_addresses: Optional[List[str]] = None,
+        time_param: Optional[int] = None,
+        label_checkpoint: Optional[CheckpointJournal] = None,
+        portfolio_checkpoint: Optional[CheckpointJournal] = None,
+        ranks: Optional[Dict[str, Optional[float]]] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Fetch labels and portfolios and stream both to CSV files in the data directory.
+
+        Label and portfolio requests are interleaved on the queue so both files
+        fill up at the same pace and neither kind starves the other. With ranks,
+        both requests of the highest-ranked address are queued first.
+
+        Args:
+            addresses: Wallet addresses whose portfolios are fetched; duplicates are dropped
+            label_addresses: Optional subset of addresses to label (defaults to all
+                addresses), e.g. only the new or stale ones of an incremental sync
+            time_param: Optional timestamp parameter for historical portfolio queries
+            label_checkpoint: Optional journal of completed label addresses
+            portfolio_checkpoint: Optional journal of completed portfolio addresses
+            ranks: Optional rank per address (e.g. USD balance); the largest wallets
+                are then crawled first, so a budgeted run covers them before the rest
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: (labels CSV path, portfolios CSV path);
+                a path is None when that export produced no results
+        """
+        addresses = list(dict.fromkeys(addresses))
+        if label_addresses is None:
+            label_addresses = addresses
+        else:
+            label_addresses = list(dict.fromkeys(label_addresses))
+
+        if not addresses and not label_addresses:
+            print("No addresses provided")
+            return None, None
+
+        label_path = self.label_service.build_csv_path()
+        portfolio_path = self.portfolio_service.build_csv_path()
+
+        # 🆕 Get current date for all label records
+        current_date = datetime.now().strftime("%Y-%m-%d")
+
+        start_time = time.time()
+
+        try:
+            with StreamingCsvWriter(
+                label_path, LabelService.CSV_HEADERS, numbered=True
+            ) as label_writer, StreamingCsvWriter(
+                portfolio_path, PortfolioService.CSV_HEADERS
+            ) as portfolio_writer:
+
+                def write_label(wallet_label: WalletLabel) -> None:
+                    rows = self.label_service.label_rows(wallet_label, current_date)
+                    label_writer.write_record(rows)
+                    if label_checkpoint is not None:
+                        label_checkpoint.record(wallet_label.address, rows)
+
+                def write_portfolio(wallet_portfolio: WalletPortfolio) -> None:
+                    rows = self.portfolio_service.portfolio_rows(wallet_portfolio)
+                    portfolio_writer.write_record(rows)
+                    if portfolio_checkpoint is not None:
+                        portfolio_checkpoint.record(wallet_portfolio.address, rows)
+
+                pending_labels = self.label_service.restore_checkpoint(
+                    label_addresses, label_writer, label_checkpoint
+                )
+                pending_labels = self.label_service.resolve_cached_labels(
+                    pending_labels, lambda address, label: write_label(label)
+                )
+                pending_portfolios = self.portfolio_service.restore_checkpoint(
+                    addresses, portfolio_writer, portfolio_checkpoint
+                )
+
+                tasks = [
+                    task
+                    for task in chain.from_iterable(
+                        zip_longest(
+                            [(PORTFOLIO_TASK, a) for a in pending_portfolios],
+                            [(LABEL_TASK, a) for a in pending_labels],
+                        )
+                    )
+                    if task is not None
+                ]
+                total_count = len(tasks)
+                positions = {task: i for i, task in enumerate(tasks, 1)}
+
+                print(
+                    f"Starting combined crawl of {len(pending_portfolios)} portfolios and "
+                    f"{len(pending_labels)} labels with up to {self.max_retries} attempts per request..."
+                )
+
+                def handle(task: Tuple[str, str], attempt: int):
+                    kind, address = task
+                    if kind == LABEL_TASK:
+                        result = self.label_service.process_single_address(
+                            address, positions[task], total_count
+                        )
+                        return result.wallet_label if result.is_success else None
+                    result = self.portfolio_service.process_single_address(
+                        address, time_param, positions[task], total_count
+                    )
+                    return result.wallet_portfolio if result.is_success else None
+
+                def collect(task: Tuple[str, str], result) -> None:
+                    if task[0] == LABEL_TASK:
+                        write_label(result)
+                    else:
+                        write_portfolio(result)
+
+                def priority(task: Tuple[str, str]) -> Optional[float]:
+                    return ranks.get(task[1])
+
+                with ProgressReporter("Requests", total_count) as progress:
+                    failed_tasks = self.work_queue.run(
+                        tasks,
+                        handle,
+                        collect,
+                        progress,
+                        priority if ranks is not None else None,
+                    )
+        except Exception as e:
+            print(f"Error saving CSV file: {str(e)}")
+            return None, None
+
+        processing_time = time.time() - start_time
+
+        if failed_tasks:
+            print(f"\n⚠️  Maximum retries ({self.max_retries}) reached!")
+            print(f"❌ {len(failed_tasks)} requests failed after {self.max_retries} attempts:")
+            for i, (kind, address) in enumerate(failed_tasks, 1):
+                print(f"  {i:3d}. {kind:<9} {address}")
+            print()
+        if self.work_queue.budget is not None:
+            self.work_queue.budget.print_summary("requests")
+
+        # Output final statistics
+        print(f"\n{'='*60}")
+        print("Combined Crawl Summary:")
+        print(f"  Unique addresses: {len(addresses)}")
+        print(f"  Labels: {label_writer.record_count}/{len(label_addresses)} succeeded")
+        print(
+            f"  Portfolios: {portfolio_writer.record_count}/{len(addresses)} succeeded "
+            f"({portfolio_writer.row_count} rows)"
+        )
+        print(f"  Processing time: {processing_time:.2f} seconds")
+        connection_stats = self.arkham_api.connection_stats()
+        print(
+            f"  Connections: {connection_stats['new_connections']} opened for "
+            f"{connection_stats['requests']} requests, "
+            f"{connection_stats['reuse_rate']*100:.1f}% reused via keep-alive"
+        )
+        if self.label_service.label_cache is not None:
+            cache_stats = self.label_service.label_cache.stats()
+            print(
+                f"  Label cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['expired']} expired), hit rate {cache_stats['hit_rate']*100:.1f}%"
+            )
+        print(f"{'='*60}\n")
+
+        return (
+            self._finalize_csv(label_path, label_writer.record_count),
+            self._finalize_csv(portfolio_path, portfolio_writer.record_count),
+        )
+
+    @staticmethod
+    def _finalize_csv(filepath: str, record_count: int) -> Optional[str]:
+        """
+        Keep a CSV file that received results, or delete it if it stayed empty.
+
+        Args:
+            filepath: Path of the CSV file
+            record_count: Number of records written to it
+
+        Returns:
+            str: The file path, or None if the file was removed
+        """
+        if record_count:
+            print(f"✅ CSV file created: {filepath}")
+            return filepath
+
+        os.remove(filepath)
+        return None
@@ -0,0 +1,68 @@
+import csv
+import threading
+from typing import Iterable, List
+
+
+class StreamingCsvWriter:
+    """
+    Thread-safe CSV writer that flushes rows to disk as soon as they are written.
+
+    Worker threads hand over the rows for one record (e.g. one address) as soon
+    as it succeeds, so results never accumulate in memory and a crash halfway
+    through a long crawl leaves every completed record on disk.
+    """
+
+    def __init__(self, filepath: str, headers: List[str], numbered: bool = False):
+        """
+        Initialize the StreamingCsvWriter and write the header row.
+
+        Args:
+            filepath: Full path of the CSV file to create
+            headers: Column names written as the first row
+            numbered: Prepend a sequential row number to every row
+        """
+        self.filepath = filepath
+        self.numbered = numbered
+        self.row_count = 0
+        self.record_count = 0
+        self._lock = threading.Lock()
+        self._file = open(filepath, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+        self._file.flush()
+
+    def write_record(self, rows: Iterable[list]) -> int:
+        """
+        Write all rows belonging to one record and flush them to disk.
+
+        Args:
+            rows: Rows to write (without the row number when numbered is set)
+
+        Returns:
+            int: Number of rows written
+        """
+        with self._lock:
+            written = 0
+            for row in rows:
+                if self.numbered:
+                    row = [self.row_count + 1, *row]
+                self._writer.writerow(row)
+                self.row_count += 1
+                written += 1
+            self.record_count += 1
+            self._file.flush()
+            return written
+
+    def close(self) -> None:
+        """
+        Close the underlying file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self) -> "StreamingCsvWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,124 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class LabelCache:
+    """
+    Persistent on-disk cache of raw Arkham label responses.
+
+    Entity labels rarely change, so the raw `/intelligence/address/{address}/all`
+    JSON is stored in a SQLite database in the data directory together with the
+    time it was fetched. Entries older than the configured TTL are treated as
+    missing and refetched. The cache is safe to share between worker threads.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl_days: float = 30.0):
+        """
+        Initialize the LabelCache.
+
+        Args:
+            db_path: Path of the SQLite database (defaults to data/arkham_label_cache.sqlite)
+            ttl_days: Number of days a cached label stays valid
+        """
+        if db_path is None:
+            data_dir = os.path.join(
+                os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                ),
+                "data",
+            )
+            os.makedirs(data_dir, exist_ok=True)
+            db_path = os.path.join(data_dir, "arkham_label_cache.sqlite")
+
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS label_cache (
+                address TEXT PRIMARY KEY,
+                response_json TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get(self, address: str) -> Optional[dict]:
+        """
+        Look up the cached label response for an address.
+
+        Args:
+            address: Wallet address to look up
+
+        Returns:
+            dict: Raw label response data, or None if missing or expired
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response_json, fetched_at FROM label_cache WHERE address = ?",
+                (address.lower(),),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response_json, fetched_at = row
+            if time.time() - fetched_at > self.ttl_seconds:
+                self.misses += 1
+                self.expired += 1
+                return None
+
+            self.hits += 1
+
+        return json.loads(response_json)
+
+    def put(self, address: str, response_data: dict) -> None:
+        """
+        Store the raw label response for an address.
+
+        Args:
+            address: Wallet address the response belongs to
+            response_data: Raw label response data from the Arkham API
+        """
+        response_json = json.dumps(response_data, separators=(",", ":"))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO label_cache (address, response_json, fetched_at) "
+                "VALUES (?, ?, ?)",
+                (address.lower(), response_json, time.time()),
+            )
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        """
+        Get hit and miss statistics for lookups made through this instance.
+
+        Returns:
+            dict: Lookup counts and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._connection.close()
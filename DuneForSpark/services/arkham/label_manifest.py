@@ -0,0 +1,149 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+
+class LabelSyncManifest:
+    """
+    Local manifest of addresses already uploaded to the Dune labels table.
+
+    The manifest lets update_labels.py run incrementally: only addresses that
+    were never synced, or were last synced more than `max_age_days` ago, are
+    sent through LabelService. It is stored as SQLite in the data directory and
+    can be seeded from the addresses already present in the Dune table.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the LabelSyncManifest.
+
+        Args:
+            db_path: Path of the SQLite database (defaults to data/arkham_label_manifest.sqlite)
+        """
+        if db_path is None:
+            data_dir = os.path.join(
+                os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                ),
+                "data",
+            )
+            os.makedirs(data_dir, exist_ok=True)
+            db_path = os.path.join(data_dir, "arkham_label_manifest.sqlite")
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS synced_labels (
+                address TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def filter_pending(
+        self, addresses: Iterable[str], max_age_days: Optional[float] = 30.0
+    ) -> Tuple[List[str], int]:
+        """
+        Diff an address list against the manifest.
+
+        Args:
+            addresses: Candidate wallet addresses from the Dune query
+            max_age_days: Days after which a synced address is considered stale
+                and fetched again (None never refreshes synced addresses)
+
+        Returns:
+            Tuple[List[str], int]: (new or stale addresses, number of addresses skipped)
+        """
+        with self._lock:
+            synced = dict(
+                self._connection.execute("SELECT address, synced_at FROM synced_labels")
+            )
+
+        cutoff = (
+            time.time() - max_age_days * 24 * 60 * 60
+            if max_age_days is not None
+            else None
+        )
+        pending: List[str] = []
+        skipped = 0
+        for address in addresses:
+            synced_at = synced.get(address.lower())
+            if synced_at is None or (cutoff is not None and synced_at < cutoff):
+                pending.append(address)
+            else:
+                skipped += 1
+
+        return pending, skipped
+
+    def mark_synced(
+        self, addresses: Iterable[str], synced_at: Optional[float] = None
+    ) -> int:
+        """
+        Record addresses as uploaded to the Dune labels table.
+
+        Args:
+            addresses: Wallet addresses that were uploaded
+            synced_at: Unix timestamp of the upload (defaults to now)
+
+        Returns:
+            int: Number of addresses recorded
+        """
+        synced_at = time.time() if synced_at is None else synced_at
+        rows = [(address.lower(), synced_at) for address in addresses if address]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO synced_labels (address, synced_at) VALUES (?, ?)",
+                rows,
+            )
+            self._connection.commit()
+        return len(rows)
+
+    def seed(self, addresses: Iterable[str]) -> int:
+        """
+        Import addresses already stored in the Dune labels table.
+
+        Addresses already in the manifest keep their recorded sync time.
+
+        Args:
+            addresses: Wallet addresses read back from the Dune labels table
+
+        Returns:
+            int: Number of addresses newly added to the manifest
+        """
+        now = time.time()
+        rows = [(address.lower(), now) for address in addresses if address]
+        with self._lock:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO synced_labels (address, synced_at) VALUES (?, ?)",
+                rows,
+            )
+            self._connection.commit()
+            return self._connection.total_changes - before
+
+    def mark_synced_from_csv(self, csv_file_path: str, column: str = "address") -> int:
+        """
+        Record every address in an exported labels CSV as uploaded.
+
+        Args:
+            csv_file_path: Path of the CSV file that was uploaded
+            column: Name of the address column
+
+        Returns:
+            int: Number of addresses recorded
+        """
+        with open(csv_file_path, newline="", encoding="utf-8") as csvfile:
+            return self.mark_synced(row[column] for row in csv.DictReader(csvfile))
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._connection.close()
@@ -1,4 +1,5 @@
-from typing import Dict, Optional
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional
 from dataclasses import dataclass
 
 
@@ -108,6 +109,44 @@ class ChainData:
         )
 
 
+class LazyChainMap(Mapping):
+    """
+    Read-only mapping of chain name to ChainData that parses chains on first access.
+
+    Only the chains a caller actually reads (typically the primary chain) are
+    turned into ChainData objects; the rest of the raw response is never parsed.
+    """
+
+    def __init__(self, raw_chains: Dict[str, dict]):
+        """
+        Initialize the LazyChainMap.
+
+        Args:
+            raw_chains: Raw chain data from the API response, keyed by chain name
+        """
+        self._raw_chains = raw_chains
+        self._parsed: Dict[str, ChainData] = {}
+
+    def __getitem__(self, chain_name: str) -> ChainData:
+        chain_data = self._parsed.get(chain_name)
+        if chain_data is None:
+            chain_data = ChainData.from_dict(self._raw_chains[chain_name])
+            self._parsed[chain_name] = chain_data
+        return chain_data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw_chains)
+
+    def __len__(self) -> int:
+        return len(self._raw_chains)
+
+    def __contains__(self, chain_name) -> bool:
+        return chain_name in self._raw_chains
+
+    def __repr__(self) -> str:
+        return f"LazyChainMap({list(self._raw_chains)})"
+
+
 @dataclass
 class WalletLabel:
     """
@@ -119,28 +158,46 @@ class WalletLabel:
     """
 
     address: str
-    chains: Dict[str, ChainData]
+    chains: Mapping  # Chain name -> ChainData, parsed on first access
     primary_chain_data: Optional[ChainData]
 
     @classmethod
-    def from_response(cls, address: str, response_data: dict) -> "WalletLabel":
+    def from_response(
+        cls,
+        address: str,
+        response_data: dict,
+        chains: Optional[Iterable[str]] = None,
+    ) -> "WalletLabel":
         """
         Create a WalletLabel instance from API response data.
 
         This method processes multi-chain response data and selects the primary
-        chain based on a predefined priority list.
+        chain based on a predefined priority list. Chains are looked up directly
+        and parsed lazily: only the primary chain is turned into ChainData up
+        front, other chains only if a fallback needs them, and chains outside
+        the allowlist are never parsed.
 
         Args:
             address: Wallet address
             response_data: Dictionary containing chain data from API response
+            chains: Optional chain names to consider (defaults to every chain in the response)
 
         Returns:
             WalletLabel: New instance with parsed chain data and primary chain selected
         """
-        chains = {}
-        for chain_name, chain_data in response_data.items():
-            if isinstance(chain_data, dict):
-                chains[chain_name] = ChainData.from_dict(chain_data)
+        if chains is None:
+            raw_chains = {
+                chain_name: chain_data
+                for chain_name, chain_data in response_data.items()
+                if isinstance(chain_data, dict)
+            }
+        else:
+            raw_chains = {}
+            for chain_name in chains:
+                chain_data = response_data.get(chain_name)
+                if isinstance(chain_data, dict):
+                    raw_chains[chain_name] = chain_data
+        chains = LazyChainMap(raw_chains)
 
         priority_chains = [
             "ethereum",  # Highest priority blockchain
@@ -158,9 +215,9 @@ class WalletLabel:
                 break
 
         if primary_chain_data is None and chains:
-            primary_chain_data = next(
-                iter(chains.values())
-            )  # Select first available chain if no priority match
+            primary_chain_data = chains[
+                next(iter(chains))
+            ]  # Select first available chain if no priority match
 
         return cls(
             address=address,
@@ -1,14 +1,21 @@
-import csv
+import asyncio
 import os
 from datetime import datetime
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 
 from .arkham_api import ArkhamApi
+from .checkpoint import CheckpointJournal
+from .csv_writer import StreamingCsvWriter
+from .async_arkham_api import AsyncArkhamApi
+from .label_cache import LabelCache
 from .label_model import WalletLabel
+from .work_queue import RetryWorkQueue, RunBudget
+from ..common.logger import ProgressReporter, get_logger
+
+logger = get_logger("label_service")
 
 
 @dataclass
@@ -26,16 +33,43 @@ class LabelService:
     Service for batch processing wallet labels from Arkham Intelligence API.
 
     This class provides functionality to query wallet labels for multiple addresses
-    concurrently with retry mechanism, process the results, and export them to CSV format.
+    concurrently with per-address retries, process the results, and export them to CSV format.
     It manages API interactions, thread-safe operations, and file export capabilities.
     """
 
+    # CSV columns of the labels export
+    CSV_HEADERS = [
+        "no",  # Sequential row number
+        "address",  # Wallet address
+        "name",  # Entity name
+        "type",  # Entity type classification
+        "label",  # Wallet label or tag
+        "isuseraddress",  # Flag indicating if address is user-owned
+        "website",  # Entity website URL
+        "twitter",  # Entity Twitter handle
+        "crunchbase",  # Entity Crunchbase profile URL
+        "linkedin",  # Entity LinkedIn profile URL
+        "update_date",  # 🆕 Date when this data was fetched
+    ]
+
     def __init__(
         self,
         api_key: str,
         base_url: str = "https://api.arkm.com",
-        max_workers: int = 5,
+        max_workers: int = 10,
         max_retries: int = 10,
+        requests_per_second: float = 15.0,
+        burst: int = 5,
+        retry_base_delay: float = 2.0,
+        retry_max_delay: float = 60.0,
+        use_async: bool = False,
+        async_concurrency: int = 100,
+        use_cache: bool = True,
+        cache_ttl_days: float = 30.0,
+        cache_path: Optional[str] = None,
+        arkham_api: Optional[ArkhamApi] = None,
+        label_chains: Optional[List[str]] = None,
+        budget: Optional[RunBudget] = None,
     ):
         """
         Initialize the LabelService.
@@ -43,16 +77,48 @@ class LabelService:
         Args:
             api_key: API key for authentication with Arkham Intelligence
             base_url: Base URL for the Arkham API endpoint
-            request_delay: Delay in seconds between consecutive API requests
             max_workers: Maximum number of concurrent threads for batch processing
-            max_retries: Maximum number of retry attempts for failed addresses
+            max_retries: Maximum number of attempts per address
+            requests_per_second: Sustained Arkham request rate shared by all threads
+            burst: Maximum number of back-to-back Arkham requests
+            retry_base_delay: Backoff delay in seconds before an address is first retried
+            retry_max_delay: Upper bound on the per-address backoff delay in seconds
+            use_async: Use the aiohttp-based AsyncArkhamApi instead of worker threads
+            async_concurrency: Maximum in-flight requests when use_async is enabled
+            use_cache: Serve labels from the persistent on-disk cache when still fresh
+            cache_ttl_days: Number of days a cached label stays valid
+            cache_path: Optional path of the cache database (defaults to the data directory)
+            arkham_api: Optional ArkhamApi client shared with other services; its
+                rate limiter and connection pool are then shared as well
+            label_chains: Optional chain allowlist; chains outside it are never parsed
+                and are not used for the primary chain or label fallback
+            budget: Optional time and request budget of the run; addresses not
+                attempted when it runs out are left for a resumed run
         """
-        self.arkham_api = ArkhamApi(api_key, base_url)
+        self.arkham_api = arkham_api or ArkhamApi(
+            api_key,
+            base_url,
+            requests_per_second=requests_per_second,
+            burst=burst,
+            max_concurrency=max_workers,
+        )
         self.max_workers = max_workers
         self.max_retries = max_retries
-        # Use fine-grained locks for better thread safety
+        self.use_async = use_async
+        self.async_concurrency = async_concurrency
+        self.work_queue = RetryWorkQueue(
+            max_workers=max_workers,
+            max_retries=max_retries,
+            base_delay=retry_base_delay,
+            max_delay=retry_max_delay,
+            metrics=self.arkham_api.metrics,
+            budget=budget,
+        )
+        self.label_cache = (
+            LabelCache(cache_path, cache_ttl_days) if use_cache else None
+        )
+        self.label_chains = label_chains
         self.results_lock = threading.Lock()
-        self.failed_lock = threading.Lock()
 
     def process_single_address(
         self, address: str, index: int, total: int
@@ -62,7 +128,8 @@ class LabelService:
 
         This method queries the Arkham API for label information about a specific
         wallet address and handles both successful and failed requests by returning
-        ProcessResult objects with detailed status information.
+        ProcessResult objects with detailed status information. Successful raw
+        responses are stored in the label cache when it is enabled.
 
         Args:
             address: Wallet address to process
@@ -73,15 +140,16 @@ class LabelService:
             ProcessResult: Contains wallet label, success status, and error info
         """
         try:
-            wallet_label = self.arkham_api.get_label(address)
+            response_data = self.arkham_api.get_label_data(address)
+            wallet_label = self._build_label(address, response_data)
 
             if wallet_label:
-                print(f"[{index}/{total}] ✅ Success - {address}")
+                logger.debug(f"[{index}/{total}] ✅ Success - {address}")
                 return ProcessResult(
                     address=address, wallet_label=wallet_label, is_success=True
                 )
             else:
-                print(f"[{index}/{total}] ❌ Failed - {address}")
+                logger.debug(f"[{index}/{total}] ❌ Failed - {address}")
                 return ProcessResult(
                     address=address,
                     wallet_label=None,
@@ -89,7 +157,7 @@ class LabelService:
                     error_message="API returned no data",
                 )
         except Exception as e:
-            print(f"[{index}/{total}] ❌ Error - {address}: {str(e)}")
+            logger.warning(f"[{index}/{total}] ❌ Error - {address}: {str(e)}")
             return ProcessResult(
                 address=address,
                 wallet_label=None,
@@ -97,124 +165,201 @@ class LabelService:
                 error_message=str(e),
             )
 
-    def process_batch_single_round(
-        self, addresses: List[str], round_number: int
-    ) -> Tuple[List[WalletLabel], List[str]]:
+    def batch_process_addresses_concurrent(
+        self,
+        addresses: List[str],
+        on_result: Optional[Callable[[WalletLabel], None]] = None,
+        ranks: Optional[Dict[str, Optional[float]]] = None,
+    ) -> List[WalletLabel]:
         """
-        Process a batch of addresses in a single round.
+        Process multiple wallet addresses concurrently with per-address retries.
 
-        This method handles concurrent processing of addresses using ThreadPoolExecutor
-        and collects results in a thread-safe manner.
+        Addresses with a fresh entry in the label cache are served from disk.
+        The rest are fed through a single long-lived RetryWorkQueue. A failed
+        address is rescheduled on its own with exponential backoff and jitter
+        while the workers keep processing the rest, until it succeeds or has been
+        attempted max_retries times.
 
         Args:
-            addresses: List of addresses to process
-            round_number: Current round number for logging
+            addresses: List of wallet addresses to process
+            on_result: Optional callback invoked from the worker thread with each
+                label as soon as it succeeds; results are then not kept in memory
+            ranks: Optional rank per address (e.g. USD balance); addresses are then
+                processed highest rank first, so a budgeted run covers the largest
+                wallets before the small ones
 
         Returns:
-            Tuple[List[WalletLabel], List[str]]: (successful results, failed addresses)
+            List[WalletLabel]: List of label objects for all successfully processed
+                addresses (empty when on_result is given)
         """
+        if not addresses:
+            return []
+
         successful_labels: List[WalletLabel] = []
-        failed_addresses: List[str] = []
+
+        def collect(address: str, wallet_label: WalletLabel) -> None:
+            if on_result is not None:
+                on_result(wallet_label)
+                return
+            with self.results_lock:
+                successful_labels.append(wallet_label)
+
+        addresses = self.resolve_cached_labels(addresses, collect)
+        if not addresses:
+            print("✅ All addresses served from the label cache!")
+            return successful_labels
+
         total_count = len(addresses)
+        positions = {addr: i for i, addr in enumerate(addresses, 1)}
+        priority = ranks.get if ranks is not None else None
 
-        print(f"\n--- Round {round_number}: Processing {total_count} addresses ---")
+        print(
+            f"Starting processing of {total_count} addresses with up to {self.max_retries} attempts per address..."
+        )
+
+        def handle(address: str, attempt: int) -> Optional[WalletLabel]:
+            result = self.process_single_address(
+                address, positions[address], total_count
+            )
+            return result.wallet_label if result.is_success else None
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_address = {}
-            for i, addr in enumerate(addresses, 1):
-                future = executor.submit(
-                    self.process_single_address, addr, i, total_count
+        with ProgressReporter("Labels", total_count) as progress:
+            if self.use_async:
+                failed_addresses = asyncio.run(
+                    self._process_addresses_async(
+                        addresses, positions, collect, progress, priority
+                    )
+                )
+            else:
+                failed_addresses = self.work_queue.run(
+                    addresses, handle, collect, progress, priority
                 )
-                future_to_address[future] = addr
 
-            # Collect results
-            for future in as_completed(future_to_address):
-                address = future_to_address[future]
-                try:
-                    result = future.result(timeout=30)  # Set timeout for safety
+        budget = self.work_queue.budget
+        if failed_addresses:
+            print(f"\n⚠️  Maximum retries ({self.max_retries}) reached!")
+            self._print_final_failed_addresses(failed_addresses)
+        elif budget is None or not budget.exhausted:
+            print("✅ All addresses processed successfully!")
+        if budget is not None:
+            budget.print_summary("addresses")
+
+        return successful_labels
+
+    def resolve_cached_labels(
+        self, addresses: List[str], on_success: Callable[[str, WalletLabel], None]
+    ) -> List[str]:
+        """
+        Serve labels from the cache and return the addresses that must be fetched.
 
-                    # Thread-safe result processing
-                    if result.is_success and result.wallet_label:
-                        with self.results_lock:
-                            successful_labels.append(result.wallet_label)
-                    else:
-                        with self.failed_lock:
-                            failed_addresses.append(address)
+        Args:
+            addresses: List of wallet addresses to process
+            on_success: Callback invoked with (address, label) for each cache hit
 
+        Returns:
+            List[str]: Addresses missing from the cache or expired
+        """
+        if self.label_cache is None:
+            return addresses
+
+        hit_count = 0
+        missing_addresses: List[str] = []
+        for address in addresses:
+            response_data = self.label_cache.get(address)
+            wallet_label = None
+            if response_data is not None:
+                try:
+                    wallet_label = WalletLabel.from_response(
+                        address, response_data, self.label_chains
+                    )
                 except Exception as e:
-                    print(f"Future execution failed for {address}: {str(e)}")
-                    with self.failed_lock:
-                        failed_addresses.append(address)
+                    print(f"Cached label unreadable for {address}: {str(e)}")
+            if wallet_label:
+                on_success(address, wallet_label)
+                hit_count += 1
+            else:
+                missing_addresses.append(address)
 
-        # Output round statistics
-        success_count = len(successful_labels)
-        failed_count = len(failed_addresses)
         print(
-            f"Round {round_number} completed: {success_count} successful, {failed_count} failed"
+            f"Label cache: {hit_count} hits, {len(missing_addresses)} addresses to fetch"
         )
+        return missing_addresses
 
-        return successful_labels, failed_addresses
-
-    def batch_process_addresses_concurrent(
-        self, addresses: List[str]
-    ) -> List[WalletLabel]:
+    def _build_label(
+        self, address: str, response_data: Optional[dict]
+    ) -> Optional[WalletLabel]:
         """
-        Process multiple wallet addresses concurrently with retry mechanism.
-
-        This method implements a retry loop that processes failed addresses up to
-        max_retries times. It distributes address processing across multiple worker
-        threads to improve performance and handles failures gracefully.
+        Parse a raw label response and store it in the label cache.
 
         Args:
-            addresses: List of wallet addresses to process
+            address: Wallet address the response belongs to
+            response_data: Raw label response data, or None if the request failed
 
         Returns:
-            List[WalletLabel]: List of label objects for all successfully processed addresses
+            WalletLabel: Parsed label, or None if the request failed
         """
-        if not addresses:
-            return []
-
-        all_successful_labels: List[WalletLabel] = []
-        current_addresses = addresses.copy()
-        circle_count = 0
+        if response_data is None:
+            return None
 
-        print(
-            f"Starting batch processing of {len(addresses)} addresses with up to {self.max_retries} retries..."
+        wallet_label = WalletLabel.from_response(
+            address, response_data, self.label_chains
         )
+        if self.label_cache is not None:
+            self.label_cache.put(address, response_data)
+        return wallet_label
+
+    async def _process_addresses_async(
+        self,
+        addresses: List[str],
+        positions: Dict[str, int],
+        on_success: Callable[[str, WalletLabel], None],
+        progress: Optional[ProgressReporter] = None,
+        priority: Optional[Callable[[str], Optional[float]]] = None,
+    ) -> List[str]:
+        """
+        Process addresses on an asyncio event loop using AsyncArkhamApi.
 
-        while current_addresses and circle_count < self.max_retries:
-            circle_count += 1
+        The async client shares the rate limiter of the threaded client, so the
+        quota is respected whichever path is used.
 
-            # Process current batch
-            successful_labels, failed_addresses = self.process_batch_single_round(
-                current_addresses, circle_count
-            )
+        Args:
+            addresses: List of wallet addresses to process
+            positions: Mapping of address to its index in the batch (for logging purposes)
+            on_success: Callback invoked with (address, result) for each success
+            progress: Optional reporter receiving the outcome of every attempt
+            priority: Optional rank lookup; higher-ranked addresses are processed first
 
-            # Accumulate successful results
-            all_successful_labels.extend(successful_labels)
+        Returns:
+            List[str]: Addresses that still failed after max_retries attempts
+        """
+        total_count = len(addresses)
 
-            # Check if retry is needed
-            if failed_addresses:
-                if circle_count < self.max_retries:
-                    print(
-                        f"Preparing to retry {len(failed_addresses)} failed addresses..."
-                    )
-                    current_addresses = failed_addresses
-                    # Add delay before retry
-                    time.sleep(2)
+        async with AsyncArkhamApi(
+            self.arkham_api.api_key,
+            self.arkham_api.base_url,
+            max_concurrency=self.async_concurrency,
+            rate_limiter=self.arkham_api.rate_limiter,
+            metrics=self.arkham_api.metrics,
+        ) as api:
+
+            async def handle(address: str, attempt: int) -> Optional[WalletLabel]:
+                response_data = await api.get_label_data(address)
+                wallet_label = self._build_label(address, response_data)
+                index = positions[address]
+                if wallet_label:
+                    logger.debug(f"[{index}/{total_count}] ✅ Success - {address}")
                 else:
-                    # Maximum retries reached
-                    print(f"\n⚠️  Maximum retries ({self.max_retries}) reached!")
-                    self._print_final_failed_addresses(failed_addresses)
-                    break
-            else:
-                print(
-                    f"✅ All addresses processed successfully after {circle_count} rounds!"
-                )
-                break
-
-        return all_successful_labels
+                    logger.debug(f"[{index}/{total_count}] ❌ Failed - {address}")
+                return wallet_label
+
+            return await self.work_queue.run_async(
+                addresses,
+                handle,
+                on_success,
+                max_concurrency=self.async_concurrency,
+                progress=progress,
+                priority=priority,
+            )
 
     def _print_final_failed_addresses(self, failed_addresses: List[str]) -> None:
         """
@@ -225,34 +370,26 @@ class LabelService:
         """
         if failed_addresses:
             print(
-                f"\n❌ {len(failed_addresses)} addresses failed after {self.max_retries} retries:"
+                f"\n❌ {len(failed_addresses)} addresses failed after {self.max_retries} attempts:"
             )
             print("Failed addresses that may have persistent issues:")
             for i, addr in enumerate(failed_addresses, 1):
                 print(f"  {i:3d}. {addr}")
             print()
 
-    def export_to_csv(
-        self, wallet_labels: List[WalletLabel], filename: str = None
-    ) -> Optional[str]:
+    def build_csv_path(self, filename: Optional[str] = None) -> str:
         """
-        Export wallet label data to a CSV file.
+        Build the full path of a CSV file in the data directory.
 
-        This method writes wallet label information to a CSV file in the data directory.
         If no filename is provided, a timestamped filename is automatically generated.
         The method creates the data directory if it does not exist.
 
         Args:
-            wallet_labels: List of WalletLabel objects to export
             filename: Optional custom filename for the CSV file (without path)
 
         Returns:
-            str: Full file path of the created CSV file, or None if export failed
+            str: Full file path of the CSV file
         """
-        if not wallet_labels:
-            print("No wallet labels to export")
-            return None
-
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"ArcHam_Intelligence_Report_{timestamp}.csv"
@@ -269,62 +406,131 @@ class LabelService:
         )
 
         os.makedirs(data_dir, exist_ok=True)
-        filepath = os.path.join(data_dir, filename)
-
-        headers = [
-            "no",  # Sequential row number
-            "address",  # Wallet address
-            "name",  # Entity name
-            "type",  # Entity type classification
-            "label",  # Wallet label or tag
-            "isuseraddress",  # Flag indicating if address is user-owned
-            "website",  # Entity website URL
-            "twitter",  # Entity Twitter handle
-            "crunchbase",  # Entity Crunchbase profile URL
-            "linkedin",  # Entity LinkedIn profile URL
-            "update_date",  # 🆕 Date when this data was fetched
+        return os.path.join(data_dir, filename)
+
+    @staticmethod
+    def label_rows(wallet_label: WalletLabel, current_date: str) -> List[list]:
+        """
+        Build the CSV rows (without the row number) for one wallet label.
+
+        Args:
+            wallet_label: Label to convert
+            current_date: Date when this data was fetched (YYYY-MM-DD)
+
+        Returns:
+            List[list]: CSV rows for the label
+        """
+        return [
+            [
+                wallet_label.address,
+                wallet_label.name,
+                wallet_label.entity_type,
+                wallet_label.label,
+                wallet_label.is_user_address,
+                wallet_label.website,
+                wallet_label.twitter,
+                wallet_label.crunchbase,
+                wallet_label.linkedin,
+                current_date,  # 🆕 Add update_date to each row
+            ]
+        ]
+
+    def restore_checkpoint(
+        self,
+        addresses: List[str],
+        writer: StreamingCsvWriter,
+        checkpoint: Optional[CheckpointJournal],
+    ) -> List[str]:
+        """
+        Replay completed addresses from a checkpoint journal into the CSV writer.
+
+        Args:
+            addresses: List of wallet addresses requested for this run
+            writer: Writer of the CSV file being produced
+            checkpoint: Optional checkpoint journal of a previous interrupted run
+
+        Returns:
+            List[str]: Addresses that still need to be fetched
+        """
+        if checkpoint is None or not checkpoint.completed_addresses:
+            return addresses
+
+        requested = set(addresses)
+        for address, rows in checkpoint.iter_records():
+            if address in requested:
+                writer.write_record(rows)
+
+        pending_addresses = [
+            address
+            for address in addresses
+            if address not in checkpoint.completed_addresses
         ]
+        print(
+            f"Resuming from checkpoint: {len(addresses) - len(pending_addresses)} addresses "
+            f"already completed, {len(pending_addresses)} remaining"
+        )
+        return pending_addresses
+
+    def export_to_csv(
+        self, wallet_labels: List[WalletLabel], filename: str = None
+    ) -> Optional[str]:
+        """
+        Export wallet label data to a CSV file.
+
+        This method writes wallet label information to a CSV file in the data directory.
+        If no filename is provided, a timestamped filename is automatically generated.
+        The method creates the data directory if it does not exist.
+
+        Args:
+            wallet_labels: List of WalletLabel objects to export
+            filename: Optional custom filename for the CSV file (without path)
+
+        Returns:
+            str: Full file path of the created CSV file, or None if export failed
+        """
+        if not wallet_labels:
+            print("No wallet labels to export")
+            return None
+
+        filepath = self.build_csv_path(filename)
 
         # 🆕 Get current date for all records
         current_date = datetime.now().strftime("%Y-%m-%d")
 
         try:
-            with open(filepath, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-
-                for i, wallet_label in enumerate(wallet_labels, 1):
-                    writer.writerow(
-                        [
-                            i,
-                            wallet_label.address,
-                            wallet_label.name,
-                            wallet_label.entity_type,
-                            wallet_label.label,
-                            wallet_label.is_user_address,
-                            wallet_label.website,
-                            wallet_label.twitter,
-                            wallet_label.crunchbase,
-                            wallet_label.linkedin,
-                            current_date,  # 🆕 Add update_date to each row
-                        ]
-                    )
+            with StreamingCsvWriter(filepath, self.CSV_HEADERS, numbered=True) as writer:
+                for wallet_label in wallet_labels:
+                    writer.write_record(self.label_rows(wallet_label, current_date))
 
             return filepath
         except Exception as e:
             print(f"Error saving CSV file: {str(e)}")
             return None
 
-    def export_labels(self, addresses: List[str]) -> Optional[str]:
+    def export_labels(
+        self,
+        addresses: List[str],
+        filename: Optional[str] = None,
+        checkpoint: Optional[CheckpointJournal] = None,
+        ranks: Optional[Dict[str, Optional[float]]] = None,
+    ) -> Optional[str]:
         """
         Main method to export wallet labels for a batch of addresses.
 
         This method orchestrates the entire workflow: validates input addresses,
-        processes them concurrently through the Arkham API with retry mechanism,
-        measures execution time, and exports the results to a CSV file in the data directory.
+        processes them concurrently through the Arkham API with per-address retries,
+        measures execution time, and streams the results to a CSV file in the data
+        directory. Each row is flushed as soon as its address succeeds, so memory
+        stays flat and partial results survive if the process dies mid-run.
 
         Args:
             addresses: List of wallet addresses to process and export
+            filename: Optional custom filename for the CSV file
+            checkpoint: Optional journal recording completed addresses; addresses
+                already in it are replayed into the CSV instead of being fetched again
+            ranks: Optional rank per address (e.g. from
+                AddressNormalizer.normalize_ranked); the largest wallets are then
+                labeled first
 
         Returns:
             str: Full file path of the created CSV file, or None if export failed
@@ -333,31 +539,73 @@ class LabelService:
             print("No addresses provided")
             return None
 
+        filepath = self.build_csv_path(filename)
+
+        # 🆕 Get current date for all records
+        current_date = datetime.now().strftime("%Y-%m-%d")
+
+        budget = self.work_queue.budget
+        skipped_before = budget.skipped if budget is not None else 0
+        abandoned_before = budget.abandoned if budget is not None else 0
         start_time = time.time()
 
-        # Process addresses with retry mechanism
-        wallet_labels = self.batch_process_addresses_concurrent(addresses)
+        # Process addresses with per-address retries, streaming rows to disk
+        try:
+            with StreamingCsvWriter(filepath, self.CSV_HEADERS, numbered=True) as writer:
+                pending_addresses = self.restore_checkpoint(
+                    addresses, writer, checkpoint
+                )
+
+                def write_label(wallet_label: WalletLabel) -> None:
+                    rows = self.label_rows(wallet_label, current_date)
+                    writer.write_record(rows)
+                    if checkpoint is not None:
+                        checkpoint.record(wallet_label.address, rows)
+
+                self.batch_process_addresses_concurrent(
+                    pending_addresses, on_result=write_label, ranks=ranks
+                )
+        except Exception as e:
+            print(f"Error saving CSV file: {str(e)}")
+            return None
 
+        success_count = writer.record_count
+        # Addresses the budget left unattempted are not failures
+        skipped_count = budget.skipped - skipped_before if budget is not None else 0
+        abandoned_count = budget.abandoned - abandoned_before if budget is not None else 0
         end_time = time.time()
         processing_time = end_time - start_time
 
         # Output final statistics
         print(f"\n{'='*60}")
-        print(f"Processing Summary:")
+        print("Processing Summary:")
         print(f"  Total addresses: {len(addresses)}")
-        print(f"  Successfully processed: {len(wallet_labels)}")
-        print(f"  Failed addresses: {len(addresses) - len(wallet_labels)}")
-        print(f"  Success rate: {len(wallet_labels)/len(addresses)*100:.1f}%")
+        print(f"  Successfully processed: {success_count}")
+        print(f"  Failed addresses: {len(addresses) - success_count - skipped_count}")
+        if budget is not None and budget.exhausted:
+            print(f"  Skipped (budget, never attempted): {skipped_count}")
+            if abandoned_count:
+                print(f"  Failed and not retried (budget): {abandoned_count}")
+        print(f"  Success rate: {success_count/len(addresses)*100:.1f}%")
         print(f"  Processing time: {processing_time:.2f} seconds")
+        connection_stats = self.arkham_api.connection_stats()
+        print(
+            f"  Connections: {connection_stats['new_connections']} opened for "
+            f"{connection_stats['requests']} requests, "
+            f"{connection_stats['reuse_rate']*100:.1f}% reused via keep-alive"
+        )
+        if self.label_cache is not None:
+            cache_stats = self.label_cache.stats()
+            print(
+                f"  Label cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['expired']} expired), hit rate {cache_stats['hit_rate']*100:.1f}%"
+            )
         print(f"{'='*60}\n")
 
-        # Export to CSV
-        if wallet_labels:
-            csv_path = self.export_to_csv(wallet_labels)
-            if csv_path:
-                print(f"✅ CSV file created: {csv_path}")
-                return csv_path
-        else:
-            print("❌ No successful results to export")
+        if success_count:
+            print(f"✅ CSV file created: {filepath}")
+            return filepath
 
+        print("❌ No successful results to export")
+        os.remove(filepath)
         return None
@@ -1,7 +1,31 @@
-from typing import Dict
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Optional
 from dataclasses import dataclass
 
 
+def parse_decimal(value) -> Optional[Decimal]:
+    """
+    Parse a numeric API value into a Decimal without binary rounding.
+
+    Floats are converted through their shortest string form, so 0.1 becomes
+    Decimal("0.1") rather than its binary expansion; integers and numeric
+    strings of any size are kept exact.
+
+    Args:
+        value: Number or numeric string from the API response
+
+    Returns:
+        Decimal: Parsed value, or None if the value is missing or not numeric
+    """
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    try:
+        number = Decimal(value if isinstance(value, (int, str)) else str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return number if number.is_finite() else None
+
+
 @dataclass
 class Token:
     """
@@ -11,17 +35,20 @@ class Token:
         id: Unique identifier for the token
         name: Full name of the token
         symbol: Trading symbol of the token
-        balance: Amount of tokens held
-        price: Current price of the token
-        usd: Value in USD of the token balance
+        balance: Amount of tokens held, parsed exactly (None if missing)
+        price: Current price of the token in USD (None if missing)
+        usd: Value in USD of the token balance (None if missing)
     """
 
+    # Slotted: a full run holds one instance per exported token, so no per-instance __dict__
+    __slots__ = ("id", "name", "symbol", "balance", "price", "usd")
+
     id: str
     name: str
     symbol: str
-    balance: str
-    price: str
-    usd: str
+    balance: Optional[Decimal]
+    price: Optional[Decimal]
+    usd: Optional[Decimal]
 
     @classmethod
     def from_dict(cls, data: dict) -> "Token":
@@ -38,9 +65,9 @@ class Token:
             id=data["id"],
             name=data["name"],
             symbol=data["symbol"],
-            balance=data["balance"],
-            price=data["price"],
-            usd=data["usd"],
+            balance=parse_decimal(data["balance"]),
+            price=parse_decimal(data["price"]),
+            usd=parse_decimal(data["usd"]),
         )
 
 
@@ -54,6 +81,8 @@ class Network:
         tokens: Dictionary of tokens in this network, keyed by token ID
     """
 
+    __slots__ = ("name", "tokens")
+
     name: str
     tokens: Dict[str, Token]
 
@@ -85,22 +114,42 @@ class WalletPortfolio:
         networks: Dictionary of networks in this portfolio, keyed by network name
     """
 
+    __slots__ = ("address", "networks")
+
     address: str
     networks: Dict[str, Network]
 
     @classmethod
-    def from_response(cls, address: str, response_data: dict) -> "WalletPortfolio":
+    def from_response(
+        cls,
+        address: str,
+        response_data: dict,
+        chains: Optional[Iterable[str]] = None,
+    ) -> "WalletPortfolio":
         """
         Create a WalletPortfolio instance from API response data.
 
+        When a chain allowlist is given, only those networks are looked up in the
+        response and turned into Network and Token objects; every other chain is
+        skipped without being parsed, so memory scales with the exported rows.
+
         Args:
             address: The blockchain address of the wallet
             response_data: Dictionary containing portfolio data from API response
+            chains: Optional chain names to keep (defaults to every chain in the response)
 
         Returns:
             A new WalletPortfolio instance with networks populated from the response data
         """
         networks = {}
-        for network_name, network_data in response_data.items():
-            networks[network_name] = Network.from_dict(network_name, network_data)
+        if chains is None:
+            for network_name, network_data in response_data.items():
+                networks[network_name] = Network.from_dict(network_name, network_data)
+        else:
+            for network_name in chains:
+                network_data = response_data.get(network_name)
+                if network_data:
+                    networks[network_name] = Network.from_dict(
+                        network_name, network_data
+                    )
         return cls(address=address, networks=networks)
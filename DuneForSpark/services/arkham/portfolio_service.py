@@ -1,14 +1,34 @@
-import csv
+import asyncio
+import math
 import os
-from datetime import datetime
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
-from typing import List, Tuple, Optional
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+    Union,
+)
 from dataclasses import dataclass
 
 from .arkham_api import ArkhamApi
+from .checkpoint import CheckpointJournal
+from .async_arkham_api import AsyncArkhamApi
+from .csv_writer import StreamingCsvWriter
 from .portfolio_model import WalletPortfolio
+from .portfolio_snapshot import PortfolioSnapshotStore
+from .work_queue import RetryWorkQueue, RunBudget
+from ..common.logger import ProgressReporter, get_logger
+
+logger = get_logger("portfolio_service")
 
 
 @dataclass
@@ -26,17 +46,64 @@ class PortfolioService:
     Service for batch processing wallet portfolios from Arkham Intelligence API.
 
     This class provides functionality to query wallet portfolios for multiple addresses
-    concurrently with retry mechanism, process the results, and export them to CSV format.
+    concurrently with per-address retries, process the results, and export them to CSV format.
     It manages API interactions, thread-safe operations, and file export capabilities.
     """
 
+    # CSV columns of the portfolio export
+    CSV_HEADERS = [
+        "chain",  # Blockchain network name
+        "address",  # Wallet address
+        "symbol",  # Token symbol
+        "balance",  # Token balance amount (double)
+        "price",  # Token price in USD (double)
+        "usd",  # Total value in USD (double)
+    ]
+
+    # CSV columns of the portfolio history (delta) export
+    DELTA_CSV_HEADERS = [
+        "snapshot_time",  # UTC time of the run that detected the change
+        "change_type",  # added, changed or removed
+        "chain",  # Blockchain network name
+        "address",  # Wallet address
+        "token_id",  # Arkham token identifier
+        "symbol",  # Token symbol
+        "balance",  # Token balance amount (0 when removed)
+        "price",  # Token price in USD
+        "usd",  # Total value in USD (0 when removed)
+    ]
+
+    # CSV columns of the historical backfill export, one file per snapshot date
+    BACKFILL_CSV_HEADERS = [
+        "snapshot_date",  # UTC date the portfolio was valued at
+        "chain",  # Blockchain network name
+        "address",  # Wallet address
+        "symbol",  # Token symbol
+        "balance",  # Token balance amount (double)
+        "price",  # Token price in USD (double)
+        "usd",  # Total value in USD (double)
+    ]
+
+    # Supported blockchain networks
+    EXPORT_CHAINS = ["arbitrum_one", "ethereum", "base", "optimism"]
+
+    # Chain names written to the CSV where they differ from Arkham's
+    DISPLAY_CHAINS = {"arbitrum_one": "arbitrum"}
+
     def __init__(
         self,
         api_key: str,
         base_url: str = "https://api.arkm.com",
-        max_workers: int = 5,
+        max_workers: int = 10,
         max_retries: int = 10,
-        batch_delay: float = 2.0,
+        requests_per_second: float = 15.0,
+        burst: int = 5,
+        retry_base_delay: float = 2.0,
+        retry_max_delay: float = 60.0,
+        use_async: bool = False,
+        async_concurrency: int = 100,
+        arkham_api: Optional[ArkhamApi] = None,
+        budget: Optional[RunBudget] = None,
     ):
         """
         Initialize the PortfolioService.
@@ -44,21 +111,46 @@ class PortfolioService:
         Args:
             api_key: API key for authentication with Arkham Intelligence
             base_url: Base URL for the Arkham API endpoint
-            request_delay: Delay in seconds between consecutive API requests
             max_workers: Maximum number of concurrent threads for batch processing
-            max_retries: Maximum number of retry attempts for failed addresses
-            batch_delay: Delay in seconds between retry rounds
+            max_retries: Maximum number of attempts per address
+            requests_per_second: Sustained Arkham request rate shared by all threads
+            burst: Maximum number of back-to-back Arkham requests
+            retry_base_delay: Backoff delay in seconds before an address is first retried
+            retry_max_delay: Upper bound on the per-address backoff delay in seconds
+            use_async: Use the aiohttp-based AsyncArkhamApi instead of worker threads
+            async_concurrency: Maximum in-flight requests when use_async is enabled
+            arkham_api: Optional ArkhamApi client shared with other services; its
+                rate limiter and connection pool are then shared as well
+            budget: Optional time and request budget of the run; addresses not
+                attempted when it runs out are left for a resumed run
         """
-        self.arkham_api = ArkhamApi(api_key, base_url)
+        self.arkham_api = arkham_api or ArkhamApi(
+            api_key,
+            base_url,
+            requests_per_second=requests_per_second,
+            burst=burst,
+            max_concurrency=max_workers,
+        )
         self.max_workers = max_workers
         self.max_retries = max_retries
-        self.batch_delay = batch_delay
-        # Use fine-grained locks for better thread safety
+        self.use_async = use_async
+        self.async_concurrency = async_concurrency
+        self.work_queue = RetryWorkQueue(
+            max_workers=max_workers,
+            max_retries=max_retries,
+            base_delay=retry_base_delay,
+            max_delay=retry_max_delay,
+            metrics=self.arkham_api.metrics,
+            budget=budget,
+        )
         self.results_lock = threading.Lock()
-        self.failed_lock = threading.Lock()
 
     def process_single_address(
-        self, address: str, time_param: Optional[int], index: int, total: int
+        self,
+        address: str,
+        time_param: Optional[int],
+        index: int,
+        total: Union[int, str],
     ) -> PortfolioProcessResult:
         """
         Process a single wallet address and retrieve its portfolio data.
@@ -71,21 +163,24 @@ class PortfolioService:
             address: Wallet address to process
             time_param: Optional timestamp parameter for historical data query
             index: Current index in the batch (for logging purposes)
-            total: Total number of addresses in the batch (for logging purposes)
+            total: Total number of addresses in the batch, or "?" while the
+                addresses are still being streamed (for logging purposes)
 
         Returns:
             PortfolioProcessResult: Contains portfolio data, success status, and error info
         """
         try:
-            wallet_portfolio = self.arkham_api.get_portfolio(address, time_param)
+            wallet_portfolio = self.arkham_api.get_portfolio(
+                address, time_param, self.EXPORT_CHAINS
+            )
 
             if wallet_portfolio:
-                print(f"[{index}/{total}] ✅ Success - {address}")
+                logger.debug(f"[{index}/{total}] ✅ Success - {address}")
                 return PortfolioProcessResult(
                     address=address, wallet_portfolio=wallet_portfolio, is_success=True
                 )
             else:
-                print(f"[{index}/{total}] ❌ Failed - {address}")
+                logger.debug(f"[{index}/{total}] ❌ Failed - {address}")
                 return PortfolioProcessResult(
                     address=address,
                     wallet_portfolio=None,
@@ -93,7 +188,7 @@ class PortfolioService:
                     error_message="API returned no portfolio data",
                 )
         except Exception as e:
-            print(f"[{index}/{total}] ❌ Error - {address}: {str(e)}")
+            logger.warning(f"[{index}/{total}] ❌ Error - {address}: {str(e)}")
             return PortfolioProcessResult(
                 address=address,
                 wallet_portfolio=None,
@@ -101,128 +196,146 @@ class PortfolioService:
                 error_message=str(e),
             )
 
-    def process_batch_single_round(
-        self, addresses: List[str], time_param: Optional[int], round_number: int
-    ) -> Tuple[List[WalletPortfolio], List[str]]:
+    def batch_process_addresses_concurrent(
+        self,
+        addresses: Iterable[str],
+        time_param: Optional[int] = None,
+        on_result: Optional[Callable[[WalletPortfolio], None]] = None,
+        ranks: Optional[Dict[str, Optional[float]]] = None,
+    ) -> List[WalletPortfolio]:
         """
-        Process a batch of addresses in a single round.
+        Process multiple wallet addresses concurrently with per-address retries.
 
-        This method handles concurrent processing of addresses using ThreadPoolExecutor
-        and collects results in a thread-safe manner.
+        Addresses are fed through a single long-lived RetryWorkQueue, which pulls
+        them from the iterable on demand, so a streamed address list is crawled
+        while it is still being downloaded. A failed
+        address is rescheduled on its own with exponential backoff and jitter
+        while the workers keep processing the rest, until it succeeds or has been
+        attempted max_retries times.
 
         Args:
-            addresses: List of addresses to process
+            addresses: Wallet addresses to process, as a list or a lazy iterator
             time_param: Optional timestamp parameter for historical data query
-            round_number: Current round number for logging
+            on_result: Optional callback invoked from the worker thread with each
+                portfolio as soon as it succeeds; results are then not kept in memory
+            ranks: Optional rank per address (e.g. USD balance); addresses are then
+                processed highest rank first, so a budgeted run covers the largest
+                wallets before the small ones
 
         Returns:
-            Tuple[List[WalletPortfolio], List[str]]: (successful results, failed addresses)
+            List[WalletPortfolio]: List of portfolio objects for all successfully processed
+                addresses (empty when on_result is given)
         """
+        if isinstance(addresses, Sized) and not addresses:
+            return []
+
         successful_portfolios: List[WalletPortfolio] = []
-        failed_addresses: List[str] = []
-        total_count = len(addresses)
+        total_count = len(addresses) if isinstance(addresses, Sized) else "?"
+        positions: Dict[str, int] = {}
 
-        print(f"\n--- Round {round_number}: Processing {total_count} addresses ---")
+        print(
+            f"Starting processing of {total_count} addresses with up to {self.max_retries} attempts per address..."
+        )
+        priority = ranks.get if ranks is not None else None
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_address = {}
-            for i, addr in enumerate(addresses, 1):
-                future = executor.submit(
-                    self.process_single_address, addr, time_param, i, total_count
+        def handle(address: str, attempt: int) -> Optional[WalletPortfolio]:
+            with self.results_lock:
+                index = positions.setdefault(address, len(positions) + 1)
+            result = self.process_single_address(
+                address, time_param, index, total_count
+            )
+            return result.wallet_portfolio if result.is_success else None
+
+        def collect(address: str, wallet_portfolio: WalletPortfolio) -> None:
+            if on_result is not None:
+                on_result(wallet_portfolio)
+                return
+            with self.results_lock:
+                successful_portfolios.append(wallet_portfolio)
+
+        if self.use_async:
+            addresses = list(addresses)
+            positions = {addr: i for i, addr in enumerate(addresses, 1)}
+            with ProgressReporter("Portfolios", len(addresses)) as progress:
+                failed_addresses = asyncio.run(
+                    self._process_addresses_async(
+                        addresses, positions, time_param, collect, progress, priority
+                    )
+                )
+        else:
+            with ProgressReporter(
+                "Portfolios", total_count if isinstance(total_count, int) else None
+            ) as progress:
+                failed_addresses = self.work_queue.run(
+                    addresses, handle, collect, progress, priority
                 )
-                future_to_address[future] = addr
-
-            # Collect results
-            for future in as_completed(future_to_address):
-                address = future_to_address[future]
-                try:
-                    result = future.result(
-                        timeout=60
-                    )  # Longer timeout for portfolio API
-
-                    # Thread-safe result processing
-                    if result.is_success and result.wallet_portfolio:
-                        with self.results_lock:
-                            successful_portfolios.append(result.wallet_portfolio)
-                    else:
-                        with self.failed_lock:
-                            failed_addresses.append(address)
-
-                except Exception as e:
-                    print(f"Future execution failed for {address}: {str(e)}")
-                    with self.failed_lock:
-                        failed_addresses.append(address)
 
-        # Output round statistics
-        success_count = len(successful_portfolios)
-        failed_count = len(failed_addresses)
-        print(
-            f"Round {round_number} completed: {success_count} successful, {failed_count} failed"
-        )
+        budget = self.work_queue.budget
+        if failed_addresses:
+            print(f"\n⚠️  Maximum retries ({self.max_retries}) reached!")
+            self._print_final_failed_addresses(failed_addresses)
+        elif budget is None or not budget.exhausted:
+            print("✅ All addresses processed successfully!")
+        if budget is not None:
+            budget.print_summary("addresses")
 
-        return successful_portfolios, failed_addresses
+        return successful_portfolios
 
-    def batch_process_addresses_concurrent(
-        self, addresses: List[str], time_param: Optional[int] = None
-    ) -> List[WalletPortfolio]:
+    async def _process_addresses_async(
+        self,
+        addresses: List[str],
+        positions: Dict[str, int],
+        time_param: Optional[int],
+        on_success: Callable[[str, WalletPortfolio], None],
+        progress: Optional[ProgressReporter] = None,
+        priority: Optional[Callable[[str], Optional[float]]] = None,
+    ) -> List[str]:
         """
-        Process multiple wallet addresses concurrently with retry mechanism.
+        Process addresses on an asyncio event loop using AsyncArkhamApi.
 
-        This method implements a retry loop that processes failed addresses up to
-        max_retries times. It distributes address processing across multiple worker
-        threads to improve performance and handles failures gracefully.
+        The async client shares the rate limiter of the threaded client, so the
+        quota is respected whichever path is used.
 
         Args:
             addresses: List of wallet addresses to process
+            positions: Mapping of address to its index in the batch (for logging purposes)
             time_param: Optional timestamp parameter for historical data query
+            on_success: Callback invoked with (address, result) for each success
+            progress: Optional reporter receiving the outcome of every attempt
+            priority: Optional rank lookup; higher-ranked addresses are processed first
 
         Returns:
-            List[WalletPortfolio]: List of portfolio objects for all successfully processed addresses
+            List[str]: Addresses that still failed after max_retries attempts
         """
-        if not addresses:
-            return []
-
-        all_successful_portfolios: List[WalletPortfolio] = []
-        current_addresses = addresses.copy()
-        circle_count = 0
-
-        print(
-            f"Starting batch processing of {len(addresses)} addresses with up to {self.max_retries} retries..."
-        )
-
-        while current_addresses and circle_count < self.max_retries:
-            circle_count += 1
-
-            # Process current batch
-            successful_portfolios, failed_addresses = self.process_batch_single_round(
-                current_addresses, time_param, circle_count
-            )
-
-            # Accumulate successful results
-            all_successful_portfolios.extend(successful_portfolios)
+        total_count = len(addresses)
 
-            # Check if retry is needed
-            if failed_addresses:
-                if circle_count < self.max_retries:
-                    print(
-                        f"Preparing to retry {len(failed_addresses)} failed addresses..."
-                    )
-                    current_addresses = failed_addresses
-                    # Add delay before retry
-                    time.sleep(self.batch_delay)
-                else:
-                    # Maximum retries reached
-                    print(f"\n⚠️  Maximum retries ({self.max_retries}) reached!")
-                    self._print_final_failed_addresses(failed_addresses)
-                    break
-            else:
-                print(
-                    f"✅ All addresses processed successfully after {circle_count} rounds!"
+        async with AsyncArkhamApi(
+            self.arkham_api.api_key,
+            self.arkham_api.base_url,
+            max_concurrency=self.async_concurrency,
+            rate_limiter=self.arkham_api.rate_limiter,
+            metrics=self.arkham_api.metrics,
+        ) as api:
+
+            async def handle(address: str, attempt: int) -> Optional[WalletPortfolio]:
+                wallet_portfolio = await api.get_portfolio(
+                    address, time_param, self.EXPORT_CHAINS
                 )
-                break
-
-        return all_successful_portfolios
+                index = positions[address]
+                if wallet_portfolio:
+                    logger.debug(f"[{index}/{total_count}] ✅ Success - {address}")
+                else:
+                    logger.debug(f"[{index}/{total_count}] ❌ Failed - {address}")
+                return wallet_portfolio
+
+            return await self.work_queue.run_async(
+                addresses,
+                handle,
+                on_success,
+                max_concurrency=self.async_concurrency,
+                progress=progress,
+                priority=priority,
+            )
 
     def _print_final_failed_addresses(self, failed_addresses: List[str]) -> None:
         """
@@ -233,35 +346,26 @@ class PortfolioService:
         """
         if failed_addresses:
             print(
-                f"\n❌ {len(failed_addresses)} addresses failed after {self.max_retries} retries:"
+                f"\n❌ {len(failed_addresses)} addresses failed after {self.max_retries} attempts:"
             )
             print("Failed addresses that may have persistent issues:")
             for i, addr in enumerate(failed_addresses, 1):
                 print(f"  {i:3d}. {addr}")
             print()
 
-    def export_to_csv(
-        self, wallet_portfolios: List[WalletPortfolio], filename: str = None
-    ) -> Optional[str]:
+    def build_csv_path(self, filename: Optional[str] = None) -> str:
         """
-        Export wallet portfolio data to a CSV file.
+        Build the full path of a CSV file in the data directory.
 
-        This method writes portfolio data from multiple wallets to a CSV file,
-        organizing data by blockchain network and token. It automatically generates
-        a timestamped filename if none is provided and creates the data directory
-        if it does not exist.
+        If no filename is provided, a timestamped filename is automatically generated.
+        The method creates the data directory if it does not exist.
 
         Args:
-            wallet_portfolios: List of WalletPortfolio objects to export
             filename: Optional custom filename for the CSV file (without path)
 
         Returns:
-            str: Full file path of the created CSV file, or None if export failed
+            str: Full file path of the CSV file
         """
-        if not wallet_portfolios:
-            print("No wallet portfolios to export")
-            return None
-
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"ArcHam_portfolios_{timestamp}.csv"
@@ -278,48 +382,174 @@ class PortfolioService:
         )
 
         os.makedirs(data_dir, exist_ok=True)
-        filepath = os.path.join(data_dir, filename)
-
-        headers = [
-            "chain",  # Blockchain network name
-            "address",  # Wallet address
-            "symbol",  # Token symbol
-            "balance",  # Token balance amount
-            "price",  # Token price in USD
-            "usd",  # Total value in USD
-        ]
+        return os.path.join(data_dir, filename)
 
-        # Supported blockchain networks
-        chains = ["arbitrum_one", "ethereum", "base", "optimism"]
-        row_count = 0
+    @staticmethod
+    def _to_double(value) -> Optional[float]:
+        """
+        Convert a parsed amount to the float written to a double CSV column.
+
+        Args:
+            value: Decimal, numeric string or None
 
+        Returns:
+            float: Value for the CSV, or None (written as an empty cell) if missing
+                or outside the double range
+        """
+        if value is None:
+            return None
         try:
-            with open(filepath, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return number if math.isfinite(number) else None
+
+    def portfolio_rows(self, wallet_portfolio: WalletPortfolio) -> List[list]:
+        """
+        Build the CSV rows for one wallet portfolio, one row per token on each exported chain.
+
+        Args:
+            wallet_portfolio: Portfolio to convert
+
+        Returns:
+            List[list]: CSV rows for the portfolio
+        """
+        rows = []
+        for chain in self.EXPORT_CHAINS:
+            if chain in wallet_portfolio.networks:
+                network = wallet_portfolio.networks[chain]
+                # Convert 'arbitrum_one' to 'arbitrum' for display
+                display_chain = self.DISPLAY_CHAINS.get(chain, chain)
+                for token_id, token in network.tokens.items():
+                    rows.append(
+                        [
+                            display_chain,
+                            wallet_portfolio.address,
+                            token.symbol,
+                            self._to_double(token.balance),
+                            self._to_double(token.price),
+                            self._to_double(token.usd),
+                        ]
+                    )
+        return rows
+
+    def delta_rows(
+        self,
+        wallet_portfolio: WalletPortfolio,
+        snapshot_store: PortfolioSnapshotStore,
+    ) -> List[list]:
+        """
+        Build the history CSV rows for the tokens that changed since the last snapshot.
+
+        Args:
+            wallet_portfolio: Newly fetched portfolio
+            snapshot_store: Store holding the previously uploaded snapshot
 
+        Returns:
+            List[list]: Added, changed and removed rows for the portfolio
+        """
+        return self._format_delta_rows(
+            snapshot_store.diff(wallet_portfolio, self.EXPORT_CHAINS)
+        )
+
+    def _format_delta_rows(self, rows: List[list]) -> List[list]:
+        """
+        Convert delta rows from the snapshot store to history CSV rows in place.
+
+        Args:
+            rows: Rows as returned by PortfolioSnapshotStore.diff or diff_dropped
+
+        Returns:
+            List[list]: The same rows with display chain names and numeric values
+        """
+        for row in rows:
+            row[2] = self.DISPLAY_CHAINS.get(row[2], row[2])
+            row[6:9] = [self._to_double(value) for value in row[6:9]]
+        return rows
+
+    def restore_checkpoint(
+        self,
+        addresses: Iterable[str],
+        writer: StreamingCsvWriter,
+        checkpoint: Optional[CheckpointJournal],
+    ) -> Iterable[str]:
+        """
+        Replay completed addresses from a checkpoint journal into the CSV writer.
+
+        When the addresses are streamed, the requested set is not known up front,
+        so every journaled address is replayed and the remaining addresses are
+        filtered lazily.
+
+        Args:
+            addresses: Wallet addresses requested for this run, as a list or a lazy iterator
+            writer: Writer of the CSV file being produced
+            checkpoint: Optional checkpoint journal of a previous interrupted run
+
+        Returns:
+            Iterable[str]: Addresses that still need to be fetched
+        """
+        if checkpoint is None or not checkpoint.completed_addresses:
+            return addresses
+
+        if not isinstance(addresses, Sequence):
+            for address, rows in checkpoint.iter_records():
+                writer.write_record(rows)
+            print(
+                f"Resuming from checkpoint: {len(checkpoint.completed_addresses)} addresses "
+                f"already completed"
+            )
+            return (
+                address
+                for address in addresses
+                if address not in checkpoint.completed_addresses
+            )
+
+        requested = set(addresses)
+        for address, rows in checkpoint.iter_records():
+            if address in requested:
+                writer.write_record(rows)
+
+        pending_addresses = [
+            address
+            for address in addresses
+            if address not in checkpoint.completed_addresses
+        ]
+        print(
+            f"Resuming from checkpoint: {len(addresses) - len(pending_addresses)} addresses "
+            f"already completed, {len(pending_addresses)} remaining"
+        )
+        return pending_addresses
+
+    def export_to_csv(
+        self, wallet_portfolios: List[WalletPortfolio], filename: str = None
+    ) -> Optional[str]:
+        """
+        Export wallet portfolio data to a CSV file.
+
+        This method writes portfolio data from multiple wallets to a CSV file,
+        organizing data by blockchain network and token. It automatically generates
+        a timestamped filename if none is provided and creates the data directory
+        if it does not exist.
+
+        Args:
+            wallet_portfolios: List of WalletPortfolio objects to export
+            filename: Optional custom filename for the CSV file (without path)
+
+        Returns:
+            str: Full file path of the created CSV file, or None if export failed
+        """
+        if not wallet_portfolios:
+            print("No wallet portfolios to export")
+            return None
+
+        filepath = self.build_csv_path(filename)
+
+        try:
+            with StreamingCsvWriter(filepath, self.CSV_HEADERS) as writer:
                 for wallet_portfolio in wallet_portfolios:
-                    for chain in chains:
-                        if chain in wallet_portfolio.networks:
-                            network = wallet_portfolio.networks[chain]
-                            # Convert 'arbitrum_one' to 'arbitrum' for display
-                            display_chain = (
-                                "arbitrum" if chain == "arbitrum_one" else chain
-                            )
-                            for token_id, token in network.tokens.items():
-                                writer.writerow(
-                                    [
-                                        display_chain,
-                                        wallet_portfolio.address,
-                                        token.symbol,
-                                        token.balance,
-                                        token.price,
-                                        token.usd,
-                                    ]
-                                )
-                                row_count += 1
-
-            print(f"Total {row_count} rows written")
+                    writer.write_record(self.portfolio_rows(wallet_portfolio))
+
+            print(f"Total {writer.row_count} rows written")
             return filepath
 
         except Exception as e:
@@ -328,56 +558,359 @@ class PortfolioService:
 
     def export_portfolios(
         self,
-        addresses: List[str],
+        addresses: Iterable[str],
         time_param: Optional[int] = None,
         filename: Optional[str] = None,
+        checkpoint: Optional[CheckpointJournal] = None,
+        snapshot_store: Optional[PortfolioSnapshotStore] = None,
+        ranks: Optional[Dict[str, Optional[float]]] = None,
     ) -> Optional[str]:
         """
         Main method to export wallet portfolios for a batch of addresses.
 
         This method orchestrates the entire workflow: validates input addresses,
-        processes them concurrently through the Arkham API with retry mechanism,
-        measures execution time, and exports the results to a CSV file in the data directory.
+        processes them concurrently through the Arkham API with per-address retries,
+        measures execution time, and streams the results to a CSV file in the data
+        directory. Each address's rows are flushed as soon as it succeeds, so memory
+        stays flat and partial results survive if the process dies mid-run.
+        Addresses may be streamed (e.g. from TableApi.streamRowDataByTableId), in
+        which case crawling starts before the full list has been downloaded.
 
         Args:
-            addresses: List of wallet addresses to process and export
+            addresses: Wallet addresses to process and export, as a list or a lazy iterator
             time_param: Optional timestamp parameter for historical data query
             filename: Optional custom filename for the CSV file
+            checkpoint: Optional journal recording completed addresses; addresses
+                already in it are replayed into the CSV instead of being fetched again
+            snapshot_store: Optional store of the last uploaded snapshot; when given,
+                only added, changed and removed rows are exported (DELTA_CSV_HEADERS)
+                for appending to a history table
+            ranks: Optional rank per address (e.g. from
+                AddressNormalizer.normalize_ranked); the largest wallets are then
+                crawled first
 
         Returns:
             str: Full file path of the created CSV file, or None if export failed
         """
-        if not addresses:
+        if isinstance(addresses, Sized) and not addresses:
             print("No addresses provided")
             return None
 
+        if snapshot_store is not None and filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"ArcHam_portfolio_deltas_{timestamp}.csv"
+        filepath = self.build_csv_path(filename)
+        headers = (
+            self.DELTA_CSV_HEADERS if snapshot_store is not None else self.CSV_HEADERS
+        )
+        requested = {"count": 0, "addresses": set()}
+
+        def count_requested(source: Iterable[str]) -> Iterator[str]:
+            for address in source:
+                requested["count"] += 1
+                if snapshot_store is not None:
+                    requested["addresses"].add(address)  # Needed to find dropped addresses
+                yield address
+
+        if not isinstance(addresses, Sequence):
+            addresses = count_requested(addresses)
+
+        budget = self.work_queue.budget
+        skipped_before = budget.skipped if budget is not None else 0
+        abandoned_before = budget.abandoned if budget is not None else 0
         start_time = time.time()
 
-        # Process addresses with retry mechanism
-        wallet_portfolios = self.batch_process_addresses_concurrent(
-            addresses, time_param
+        # Process addresses with per-address retries, streaming rows to disk
+        try:
+            with StreamingCsvWriter(filepath, headers) as writer:
+                pending_addresses = self.restore_checkpoint(
+                    addresses, writer, checkpoint
+                )
+
+                def write_portfolio(wallet_portfolio: WalletPortfolio) -> None:
+                    if snapshot_store is not None:
+                        rows = self.delta_rows(wallet_portfolio, snapshot_store)
+                    else:
+                        rows = self.portfolio_rows(wallet_portfolio)
+                    writer.write_record(rows)
+                    if checkpoint is not None:
+                        checkpoint.record(wallet_portfolio.address, rows)
+
+                self.batch_process_addresses_concurrent(
+                    pending_addresses, time_param, on_result=write_portfolio, ranks=ranks
+                )
+                success_count = writer.record_count
+
+                requested_addresses = (
+                    addresses if isinstance(addresses, Sequence) else requested["addresses"]
+                )
+                if (
+                    snapshot_store is not None
+                    and requested_addresses
+                    and (budget is None or not budget.exhausted)
+                ):
+                    # The whole address list was covered, so stored addresses missing
+                    # from it have dropped out and their holdings are closed out
+                    removed_rows = self._format_delta_rows(
+                        snapshot_store.diff_dropped(requested_addresses)
+                    )
+                    if removed_rows:
+                        writer.write_record(removed_rows)
+                        print(
+                            f"Closed out {len({row[3] for row in removed_rows})} addresses "
+                            "no longer in the address list"
+                        )
+        except Exception as e:
+            print(f"Error saving CSV file: {str(e)}")
+            return None
+
+        total_addresses = (
+            len(addresses) if isinstance(addresses, Sequence) else requested["count"]
         )
+        if not total_addresses:
+            print("No addresses provided")
+            os.remove(filepath)
+            return None
 
+        # Addresses the budget left unattempted are not failures
+        skipped_count = budget.skipped - skipped_before if budget is not None else 0
+        abandoned_count = budget.abandoned - abandoned_before if budget is not None else 0
         end_time = time.time()
         processing_time = end_time - start_time
 
+        # A budget-stopped streamed run never read the rest of its input
+        at_least = (
+            "at least " if budget is not None and budget.skipped_is_lower_bound else ""
+        )
+
         # Output final statistics
         print(f"\n{'='*60}")
-        print(f"Portfolio Processing Summary:")
-        print(f"  Total addresses: {len(addresses)}")
-        print(f"  Successfully processed: {len(wallet_portfolios)}")
-        print(f"  Failed addresses: {len(addresses) - len(wallet_portfolios)}")
-        print(f"  Success rate: {len(wallet_portfolios)/len(addresses)*100:.1f}%")
+        print("Portfolio Processing Summary:")
+        print(f"  Total addresses: {at_least}{total_addresses}")
+        print(f"  Successfully processed: {success_count}")
+        print(f"  Failed addresses: {total_addresses - success_count - skipped_count}")
+        if budget is not None and budget.exhausted:
+            print(f"  Skipped (budget, never attempted): {at_least}{skipped_count}")
+            if abandoned_count:
+                print(f"  Failed and not retried (budget): {abandoned_count}")
+        print(f"  Success rate: {success_count/total_addresses*100:.1f}%")
+        print(f"  Rows written: {writer.row_count}")
+        if snapshot_store is not None:
+            change_counts = snapshot_store.change_counts
+            print(
+                f"  Changes: {change_counts['added']} added, "
+                f"{change_counts['changed']} changed, {change_counts['removed']} removed"
+            )
         print(f"  Processing time: {processing_time:.2f} seconds")
+        connection_stats = self.arkham_api.connection_stats()
+        print(
+            f"  Connections: {connection_stats['new_connections']} opened for "
+            f"{connection_stats['requests']} requests, "
+            f"{connection_stats['reuse_rate']*100:.1f}% reused via keep-alive"
+        )
         print(f"{'='*60}\n")
 
-        # Export to CSV
-        if wallet_portfolios:
-            csv_path = self.export_to_csv(wallet_portfolios, filename)
-            if csv_path:
-                print(f"✅ CSV file created: {csv_path}")
-                return csv_path
-        else:
-            print("❌ No successful results to export")
+        if success_count:
+            print(f"✅ CSV file created: {filepath}")
+            return filepath
 
+        print("❌ No successful results to export")
+        os.remove(filepath)
         return None
+
+    @staticmethod
+    def backfill_schedule(
+        start_date: date, end_date: date, step_days: int = 1
+    ) -> List[Tuple[str, int]]:
+        """
+        Build the snapshot dates of a historical backfill.
+
+        Args:
+            start_date: First snapshot date
+            end_date: Last snapshot date (included when the step lands on it)
+            step_days: Number of days between snapshots
+
+        Returns:
+            List[Tuple[str, int]]: (snapshot date as YYYY-MM-DD, time parameter in
+                milliseconds at 00:00 UTC of that date), oldest first
+        """
+        if step_days < 1:
+            raise ValueError("step_days must be at least 1")
+        schedule = []
+        current = start_date
+        while current <= end_date:
+            midnight = datetime(
+                current.year, current.month, current.day, tzinfo=timezone.utc
+            )
+            schedule.append(
+                (current.isoformat(), int(midnight.timestamp() * 1000))
+            )  # Timestamp in milliseconds
+            current += timedelta(days=step_days)
+        return schedule
+
+    def export_portfolio_backfill(
+        self,
+        addresses: List[str],
+        schedule: List[Tuple[str, int]],
+        filename_prefix: Optional[str] = None,
+        checkpoint: Optional[CheckpointJournal] = None,
+        allow_incomplete: float = 0.0,
+    ) -> Dict[str, str]:
+        """
+        Export historical portfolios of every address at every snapshot date.
+
+        Each (address, snapshot date) pair is a separate item on the shared
+        RetryWorkQueue, so all dates are crawled concurrently under the same rate
+        limit and retried independently. Items are queued date by date, so an
+        interrupted run leaves the oldest dates complete. Rows are streamed to one
+        CSV per snapshot date (BACKFILL_CSV_HEADERS).
+
+        Args:
+            addresses: Wallet addresses to process
+            schedule: Snapshot dates and time parameters from backfill_schedule
+            filename_prefix: Optional prefix of the CSV files, followed by _<date>.csv
+            checkpoint: Optional journal recording completed (date, address) pairs;
+                pairs already in it are replayed into the CSVs instead of being fetched again
+            allow_incomplete: Fraction of the addresses that may fail for a date while
+                it is still exported, e.g. for addresses that did not exist yet at that
+                date; the failed addresses are listed in the summary
+
+        Returns:
+            Dict[str, str]: CSV file path per snapshot date, only for dates where
+                every address succeeded or the failures are within allow_incomplete
+        """
+        if not addresses or not schedule:
+            print("No addresses or snapshot dates provided")
+            return {}
+
+        if filename_prefix is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename_prefix = f"ArcHam_portfolio_backfill_{timestamp}"
+        time_params = dict(schedule)
+        total_count = len(addresses) * len(schedule)
+        start_time = time.time()
+
+        def checkpoint_key(snapshot_date: str, address: str) -> str:
+            return f"{snapshot_date}|{address}"
+
+        completed = set()
+
+        try:
+            with ExitStack() as stack:
+                writers = {
+                    snapshot_date: stack.enter_context(
+                        StreamingCsvWriter(
+                            self.build_csv_path(f"{filename_prefix}_{snapshot_date}.csv"),
+                            self.BACKFILL_CSV_HEADERS,
+                        )
+                    )
+                    for snapshot_date, _ in schedule
+                }
+
+                if checkpoint is not None:
+                    for key, rows in checkpoint.iter_records():
+                        snapshot_date = key.split("|", 1)[0]
+                        if snapshot_date in writers and key not in completed:
+                            writers[snapshot_date].write_record(rows)
+                            completed.add(key)
+                    if completed:
+                        print(
+                            f"Resuming from checkpoint: {len(completed)}/{total_count} "
+                            f"snapshots already completed"
+                        )
+
+                items = (
+                    (snapshot_date, address)
+                    for snapshot_date, _ in schedule
+                    for address in addresses
+                    if checkpoint_key(snapshot_date, address) not in completed
+                )
+
+                def handle(
+                    item: Tuple[str, str], attempt: int
+                ) -> Optional[WalletPortfolio]:
+                    snapshot_date, address = item
+                    wallet_portfolio = self.arkham_api.get_portfolio(
+                        address, time_params[snapshot_date], self.EXPORT_CHAINS
+                    )
+                    if wallet_portfolio:
+                        logger.debug(f"[{snapshot_date}] ✅ Success - {address}")
+                    else:
+                        logger.debug(f"[{snapshot_date}] ❌ Failed - {address}")
+                    return wallet_portfolio
+
+                def collect(
+                    item: Tuple[str, str], wallet_portfolio: WalletPortfolio
+                ) -> None:
+                    snapshot_date, address = item
+                    rows = [
+                        [snapshot_date] + row
+                        for row in self.portfolio_rows(wallet_portfolio)
+                    ]
+                    writers[snapshot_date].write_record(rows)
+                    completed.add(checkpoint_key(snapshot_date, address))
+                    if checkpoint is not None:
+                        checkpoint.record(checkpoint_key(snapshot_date, address), rows)
+
+                print(
+                    f"Starting backfill of {len(addresses)} addresses over "
+                    f"{len(schedule)} snapshot dates ({total_count - len(completed)} "
+                    f"requests) with up to {self.max_retries} attempts per request..."
+                )
+                with ProgressReporter(
+                    "Backfill", total_count - len(completed)
+                ) as progress:
+                    failed_items = self.work_queue.run(items, handle, collect, progress)
+        except Exception as e:
+            print(f"Error saving CSV file: {str(e)}")
+            return {}
+
+        processing_time = time.time() - start_time
+
+        if failed_items:
+            print(f"\n⚠️  Maximum retries ({self.max_retries}) reached!")
+            print(
+                f"❌ {len(failed_items)} snapshots failed after {self.max_retries} attempts; "
+                "their dates are not exported unless within --allow-incomplete, "
+                "resume from the checkpoint to retry them"
+            )
+
+        # Only complete dates (or dates within allow_incomplete) are returned, so a
+        # date is never uploaded with unexpected gaps; the successful pairs of
+        # held-back dates stay in the checkpoint
+        output_paths = {}
+        print(f"\n{'='*60}")
+        print("Portfolio Backfill Summary:")
+        for snapshot_date, writer in writers.items():
+            failed_addresses = [
+                address
+                for address in addresses
+                if checkpoint_key(snapshot_date, address) not in completed
+            ]
+            is_complete = not failed_addresses
+            is_allowed = len(failed_addresses) <= allow_incomplete * len(addresses)
+            if is_complete:
+                status = ""
+            elif is_allowed:
+                status = " (exported with failed addresses)"
+            else:
+                status = " (incomplete)"
+            print(
+                f"  {snapshot_date}: {writer.record_count}/{len(addresses)} addresses, "
+                f"{writer.row_count} rows{status}"
+            )
+            if failed_addresses and is_allowed:
+                print(f"    Failed: {', '.join(failed_addresses[:10])}")
+                if len(failed_addresses) > 10:
+                    print(f"    ... and {len(failed_addresses) - 10} more")
+                logger.warning(
+                    f"[{snapshot_date}] exported without {len(failed_addresses)} "
+                    f"failed addresses: {', '.join(failed_addresses)}"
+                )
+            if is_allowed:
+                output_paths[snapshot_date] = writer.filepath
+            else:
+                os.remove(writer.filepath)
+        print(f"  Processing time: {processing_time:.2f} seconds")
+        print(f"{'='*60}\n")
+        return output_paths
@@ -0,0 +1,293 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .portfolio_model import WalletPortfolio
+
+
+class PortfolioSnapshotStore:
+    """
+    Local copy of the last uploaded portfolio snapshot, used to export deltas.
+
+    Rows are keyed by (chain, address, token id). Each fetched portfolio is
+    diffed against the stored snapshot and only added, changed and removed rows
+    are emitted; addresses that dropped out of the address list are closed out
+    with removed rows by diff_dropped(). New rows are first staged as pending and only become the
+    reference snapshot once commit() is called after a successful upload, so a
+    failed upload never loses a delta.
+    """
+
+    # Change types written to the change_type column
+    ADDED = "added"
+    CHANGED = "changed"
+    REMOVED = "removed"
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        price_tolerance: Optional[float] = None,
+    ):
+        """
+        Initialize the PortfolioSnapshotStore.
+
+        Args:
+            db_path: Path of the SQLite database (defaults to data/arkham_portfolio_snapshot.sqlite)
+            price_tolerance: Relative price move that also counts as a change (e.g. 0.05
+                for 5%); None compares balances only, so price-only moves are not uploaded
+        """
+        if db_path is None:
+            data_dir = os.path.join(
+                os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                ),
+                "data",
+            )
+            os.makedirs(data_dir, exist_ok=True)
+            db_path = os.path.join(data_dir, "arkham_portfolio_snapshot.sqlite")
+
+        self.db_path = db_path
+        self.price_tolerance = price_tolerance
+        self.snapshot_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self.change_counts = {self.ADDED: 0, self.CHANGED: 0, self.REMOVED: 0}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for table in ("portfolio_snapshot", "portfolio_snapshot_pending"):
+            self._connection.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    chain TEXT NOT NULL,
+                    address TEXT NOT NULL,
+                    token_id TEXT NOT NULL,
+                    symbol TEXT,
+                    balance TEXT,
+                    price TEXT,
+                    usd TEXT,
+                    PRIMARY KEY (chain, address, token_id)
+                )
+                """
+            )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS portfolio_snapshot_fetched (
+                address TEXT PRIMARY KEY
+            )
+            """
+        )  # Addresses fetched in the pending run, including empty portfolios
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_portfolio_snapshot_address "
+            "ON portfolio_snapshot (address)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_portfolio_snapshot_pending_address "
+            "ON portfolio_snapshot_pending (address)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def _to_text(value) -> Optional[str]:
+        """Store numbers as exact decimal strings, keeping missing values as NULL"""
+        return None if value is None else str(value)
+
+    def _is_changed(self, previous: tuple, current: tuple) -> bool:
+        """
+        Decide whether a token row changed enough to be uploaded.
+
+        Args:
+            previous: Stored (symbol, balance, price, usd)
+            current: New (symbol, balance, price, usd)
+
+        Returns:
+            bool: True if the row should be exported as changed
+        """
+        if previous[1] != current[1]:  # Balance changed
+            return True
+        if self.price_tolerance is None:
+            return False
+        try:
+            old_price, new_price = float(previous[2]), float(current[2])
+        except (TypeError, ValueError):
+            return previous[2] != current[2]
+        if old_price == 0:
+            return new_price != 0
+        return abs(new_price - old_price) / abs(old_price) > self.price_tolerance
+
+    def diff(
+        self, wallet_portfolio: WalletPortfolio, chains: Iterable[str]
+    ) -> List[list]:
+        """
+        Diff a fetched portfolio against the stored snapshot and stage it as pending.
+
+        Args:
+            wallet_portfolio: Newly fetched portfolio
+            chains: Chains included in the export
+
+        Returns:
+            List[list]: Delta rows (snapshot_time, change_type, chain, address,
+                token_id, symbol, balance, price, usd)
+        """
+        address = wallet_portfolio.address.lower()
+        current: Dict[Tuple[str, str], tuple] = {}
+        for chain in chains:
+            network = wallet_portfolio.networks.get(chain)
+            if network is None:
+                continue
+            for token_id, token in network.tokens.items():
+                current[(chain, token_id)] = (
+                    token.symbol,
+                    self._to_text(token.balance),
+                    self._to_text(token.price),
+                    self._to_text(token.usd),
+                )
+
+        with self._lock:
+            previous = {
+                (chain, token_id): (symbol, balance, price, usd)
+                for chain, token_id, symbol, balance, price, usd in self._connection.execute(
+                    "SELECT chain, token_id, symbol, balance, price, usd "
+                    "FROM portfolio_snapshot WHERE address = ?",
+                    (address,),
+                )
+            }
+            self._connection.execute(
+                "DELETE FROM portfolio_snapshot_pending WHERE address = ?", (address,)
+            )
+            self._connection.execute(
+                "INSERT OR IGNORE INTO portfolio_snapshot_fetched (address) VALUES (?)",
+                (address,),
+            )
+            self._connection.executemany(
+                "INSERT INTO portfolio_snapshot_pending "
+                "(chain, address, token_id, symbol, balance, price, usd) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (chain, address, token_id, *values)
+                    for (chain, token_id), values in current.items()
+                ],
+            )
+            self._connection.commit()
+
+        rows = []
+        for (chain, token_id), values in current.items():
+            old_values = previous.get((chain, token_id))
+            if old_values is None:
+                change_type = self.ADDED
+            elif self._is_changed(old_values, values):
+                change_type = self.CHANGED
+            else:
+                continue
+            rows.append(
+                [self.snapshot_time, change_type, chain, address, token_id, *values]
+            )
+
+        for (chain, token_id), (symbol, _, price, _) in previous.items():
+            if (chain, token_id) not in current:
+                rows.append(self._removed_row(chain, address, token_id, symbol, price))
+
+        with self._lock:
+            for row in rows:
+                self.change_counts[row[1]] += 1
+        return rows
+
+    def _removed_row(self, chain, address, token_id, symbol, price) -> list:
+        """Build the delta row closing a position that is no longer held"""
+        return [
+            self.snapshot_time,
+            self.REMOVED,
+            chain,
+            address,
+            token_id,
+            symbol,
+            "0",  # Position closed
+            price,
+            "0",
+        ]
+
+    def diff_dropped(self, addresses: Iterable[str]) -> List[list]:
+        """
+        Close out stored addresses that are no longer in the address list.
+
+        An address that drops out of the list is never fetched again, so without
+        this its last holdings would stay current in the history forever. Every
+        stored token of such an address is emitted as removed, and the address is
+        staged with an empty portfolio so commit() drops its snapshot. Only call
+        this for a run that covered the whole address list.
+
+        Args:
+            addresses: Every address requested in this run, whether it was fetched or not
+
+        Returns:
+            List[list]: Removed rows (same columns as diff) for the dropped addresses
+        """
+        with self._lock:
+            self._connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS portfolio_snapshot_requested "
+                "(address TEXT PRIMARY KEY)"
+            )
+            self._connection.execute("DELETE FROM portfolio_snapshot_requested")
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO portfolio_snapshot_requested (address) VALUES (?)",
+                ((address.lower(),) for address in addresses),
+            )
+            dropped = self._connection.execute(
+                "SELECT chain, address, token_id, symbol, price FROM portfolio_snapshot "
+                "WHERE address NOT IN (SELECT address FROM portfolio_snapshot_requested) "
+                "ORDER BY address, chain, token_id"
+            ).fetchall()
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO portfolio_snapshot_fetched (address) VALUES (?)",
+                {(row[1],) for row in dropped},
+            )
+            self._connection.execute("DELETE FROM portfolio_snapshot_requested")
+            self._connection.commit()
+
+            rows = [self._removed_row(*row) for row in dropped]
+            self.change_counts[self.REMOVED] += len(rows)
+        return rows
+
+    def commit(self) -> int:
+        """
+        Promote the pending rows to the reference snapshot after a successful upload.
+
+        Only addresses fetched in this run are replaced, and addresses closed out by
+        diff_dropped() are removed; addresses that failed keep their previous snapshot.
+
+        Returns:
+            int: Number of addresses committed
+        """
+        with self._lock:
+            addresses = [
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT address FROM portfolio_snapshot_fetched"
+                )
+            ]
+            self._connection.executemany(
+                "DELETE FROM portfolio_snapshot WHERE address = ?",
+                [(address,) for address in addresses],
+            )
+            self._connection.execute(
+                "INSERT INTO portfolio_snapshot SELECT * FROM portfolio_snapshot_pending"
+            )
+            self._connection.execute("DELETE FROM portfolio_snapshot_pending")
+            self._connection.execute("DELETE FROM portfolio_snapshot_fetched")
+            self._connection.commit()
+        return len(addresses)
+
+    def rollback(self) -> None:
+        """
+        Discard pending rows left over from an earlier run that was not uploaded.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM portfolio_snapshot_pending")
+            self._connection.execute("DELETE FROM portfolio_snapshot_fetched")
+            self._connection.commit()
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,297 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token-bucket rate limiter shared by all Arkham API workers.
+
+    Tokens are refilled continuously at `requests_per_second` up to `burst`.
+    Every request consumes one token; callers block until a token is available,
+    so the overall request rate stays pinned at the quota regardless of how many
+    worker threads are running.
+
+    The rate adapts with additive-increase/multiplicative-decrease (AIMD): each
+    successful response nudges the rate back up towards `max_rate`, and each
+    throttled response (HTTP 429) cuts it by `decrease_factor`.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 15.0,
+        burst: int = 5,
+        min_rate: float = 1.0,
+        max_rate: Optional[float] = None,
+        additive_increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+    ):
+        """
+        Initialize the TokenBucketRateLimiter.
+
+        Args:
+            requests_per_second: Sustained number of requests allowed per second
+            burst: Maximum number of requests that may be sent back-to-back
+            min_rate: Lower bound the rate can be decreased to after throttling
+            max_rate: Upper bound the rate can recover to (defaults to requests_per_second)
+            additive_increase: Requests/sec regained per second of successful responses
+            decrease_factor: Multiplier applied to the rate on each throttled response
+            decrease_cooldown: Minimum seconds between two consecutive rate decreases
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_rate = max_rate or requests_per_second
+        self.min_rate = min(min_rate, self.max_rate)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self._tokens = float(burst)  # Start with a full bucket
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """
+        Add the tokens accumulated since the last refill. Caller must hold the lock.
+
+        Args:
+            now: Current monotonic time
+        """
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(
+                float(self.burst), self._tokens + elapsed * self.requests_per_second
+            )
+            self._last_refill = now
+
+    def reserve(self) -> float:
+        """
+        Reserve one token and return how long the caller must wait before using it.
+
+        The token is taken immediately (the bucket may go negative), which keeps
+        waiting callers in FIFO order without holding the lock while sleeping.
+
+        Returns:
+            float: Number of seconds to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+            # _last_refill is in the future while the limiter is paused
+            wait_time = max(0.0, self._last_refill - now)
+            if self._tokens < 0:
+                wait_time += -self._tokens / self.requests_per_second
+            return wait_time
+
+    def acquire(self) -> float:
+        """
+        Block until a request slot is available.
+
+        Returns:
+            float: Number of seconds spent waiting
+        """
+        wait_time = self.reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    def on_success(self) -> None:
+        """
+        Additively increase the rate after a successful response.
+
+        The increment is scaled by the current rate so that the rate grows by
+        roughly `additive_increase` requests/sec for every second of successes.
+        """
+        with self._lock:
+            if self.requests_per_second < self.max_rate:
+                self.requests_per_second = min(
+                    self.max_rate,
+                    self.requests_per_second
+                    + self.additive_increase / self.requests_per_second,
+                )
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicatively decrease the rate and pause all callers after a 429.
+
+        Several workers usually hit the same throttling window at once, so the
+        rate is only cut once per window rather than once per response.
+
+        Args:
+            retry_after: Seconds the server asked us to wait, if provided
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.requests_per_second = max(
+                    self.min_rate, self.requests_per_second * self.decrease_factor
+                )
+                self._last_decrease = now
+            self._tokens = min(self._tokens, 0.0)  # Drop any accumulated burst
+            if retry_after:
+                self._pause(now, retry_after)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds.
+
+        Args:
+            seconds: Duration of the pause
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._pause(now, seconds)
+
+    def _pause(self, now: float, seconds: float) -> None:
+        """
+        Push the next refill into the future. Caller must hold the lock.
+
+        Args:
+            now: Current monotonic time
+            seconds: Duration of the pause
+        """
+        self._last_refill = max(self._last_refill, now + seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Resizable semaphore that bounds the number of in-flight Arkham requests.
+
+    Like TokenBucketRateLimiter it follows AIMD: the limit grows by one slot per
+    "window" of successful responses and is halved on throttled responses, so
+    concurrency backs off during 429 storms and recovers once they pass.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+    ):
+        """
+        Initialize the AdaptiveConcurrencyLimiter.
+
+        Args:
+            max_concurrency: Upper bound on concurrent in-flight requests
+            min_concurrency: Lower bound the limit can be decreased to
+            decrease_factor: Multiplier applied to the limit on each throttled response
+            decrease_cooldown: Minimum seconds between two consecutive limit decreases
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = max(1, min(min_concurrency, max_concurrency))
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Block until the number of in-flight requests is below the current limit.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        """
+        Release a slot taken by acquire().
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def __enter__(self) -> "AdaptiveConcurrencyLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+    def on_success(self) -> None:
+        """
+        Additively increase the limit after a successful response.
+        """
+        with self._condition:
+            if self.limit < self.max_concurrency:
+                self.limit = min(
+                    float(self.max_concurrency), self.limit + 1.0 / self.limit
+                )
+                self._condition.notify()
+
+    def on_throttle(self) -> None:
+        """
+        Multiplicatively decrease the limit after a throttled response.
+        """
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.limit = max(
+                    float(self.min_concurrency), self.limit * self.decrease_factor
+                )
+                self._last_decrease = now
+
+
+_shared_rate_limiter: Optional[TokenBucketRateLimiter] = None
+_shared_concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(
+    requests_per_second: float = 15.0, burst: int = 5
+) -> TokenBucketRateLimiter:
+    """
+    Get the process-wide rate limiter, creating it on first use.
+
+    All ArkhamApi clients created without an explicit limiter share this instance,
+    so LabelService and PortfolioService running in the same process draw from a
+    single quota. Arguments only take effect when the limiter is first created.
+
+    Args:
+        requests_per_second: Sustained number of requests allowed per second
+        burst: Maximum number of requests that may be sent back-to-back
+
+    Returns:
+        TokenBucketRateLimiter: Shared limiter instance
+    """
+    global _shared_rate_limiter
+    with _shared_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = TokenBucketRateLimiter(requests_per_second, burst)
+        return _shared_rate_limiter
+
+
+def get_shared_concurrency_limiter(
+    max_concurrency: int = 10,
+) -> AdaptiveConcurrencyLimiter:
+    """
+    Get the process-wide concurrency limiter, creating it on first use.
+
+    Args:
+        max_concurrency: Upper bound on concurrent in-flight requests
+
+    Returns:
+        AdaptiveConcurrencyLimiter: Shared limiter instance
+    """
+    global _shared_concurrency_limiter
+    with _shared_limiter_lock:
+        if _shared_concurrency_limiter is None:
+            _shared_concurrency_limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+        return _shared_concurrency_limiter
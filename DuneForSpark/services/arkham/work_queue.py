@@ -0,0 +1,533 @@
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sized
+
+from ..common.logger import ProgressReporter, get_logger
+from ..common.metrics import RequestMetrics, get_shared_metrics
+
+logger = get_logger("work_queue")
+
+
+Priority = Callable[[Any], Optional[float]]  # Rank of a work item; higher runs first
+
+
+class _Task:
+    """Internal queue entry tracking one work item, its rank and its attempt count"""
+
+    __slots__ = ("item", "attempts", "key")
+
+    def __init__(self, item: Any, priority: Optional[Priority] = None):
+        self.item = item
+        self.attempts = 0
+        self.key = 0.0  # Heap key: negated rank, so the highest rank pops first
+        if priority is not None:
+            rank = priority(item)
+            self.key = -float(rank) if rank is not None else math.inf  # Unranked last
+
+
+class RunBudget:
+    """
+    Time and request budget of a crawl.
+
+    Every attempt made by a RetryWorkQueue holding the budget takes one request
+    from it, and no new attempt starts once the time or request limit is
+    reached; attempts already in flight are allowed to finish. A budget can be
+    given to several queues (e.g. the label and portfolio services of one run),
+    which then share the same limits. Together with a priority order, a
+    time-boxed or quota-boxed run covers the most important items first.
+    """
+
+    def __init__(
+        self,
+        time_seconds: Optional[float] = None,
+        max_requests: Optional[int] = None,
+    ):
+        """
+        Initialize the RunBudget. The clock starts when the budget is created.
+
+        Args:
+            time_seconds: Optional wall-clock limit in seconds
+            max_requests: Optional limit on the number of attempts started
+        """
+        self.time_seconds = time_seconds
+        self.max_requests = max_requests
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.skipped = 0  # Queued items never attempted because the budget ran out
+        self.abandoned = 0  # Failed items whose remaining retries the budget cut off
+        self.skipped_is_lower_bound = False  # Part of a lazy input was never read
+        self.exhausted_reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the budget stopped a run"""
+        return self.exhausted_reason is not None
+
+    def try_acquire(self) -> bool:
+        """
+        Take one request from the budget.
+
+        Returns:
+            bool: True if the attempt may start, False once the budget is exhausted
+        """
+        with self._lock:
+            if self.exhausted_reason is not None:
+                return False
+            elapsed = time.monotonic() - self.started_at
+            if self.time_seconds is not None and elapsed >= self.time_seconds:
+                self.exhausted_reason = "time"
+            elif self.max_requests is not None and self.requests >= self.max_requests:
+                self.exhausted_reason = "requests"
+            else:
+                self.requests += 1
+                return True
+        logger.warning(f"⏱️  {self.describe()}, no new requests are started")
+        return False
+
+    def record_skipped(self, count: int, lower_bound: bool = False) -> None:
+        """
+        Add items left unattempted when the budget ran out.
+
+        Args:
+            count: Number of items left unattempted
+            lower_bound: Whether more items were left in an input that was never
+                fully read, so the real number is higher
+        """
+        with self._lock:
+            self.skipped += count
+            self.skipped_is_lower_bound = self.skipped_is_lower_bound or lower_bound
+
+    def record_abandoned(self, count: int) -> None:
+        """
+        Add failed items whose remaining retries were cut off when the budget ran out.
+
+        Args:
+            count: Number of items attempted at least once but not retried
+        """
+        with self._lock:
+            self.abandoned += count
+
+    def describe_skipped(self) -> str:
+        """
+        Describe the number of unattempted items for summaries.
+
+        Returns:
+            str: e.g. "120", or "at least 120" when part of the input was never read
+        """
+        if self.skipped_is_lower_bound:
+            return f"at least {self.skipped}"
+        return str(self.skipped)
+
+    def describe(self) -> str:
+        """
+        Describe the budget state for summaries.
+
+        Returns:
+            str: e.g. "Time budget of 30.0 min reached after 1200 requests"
+        """
+        if self.exhausted_reason == "time":
+            return (
+                f"Time budget of {self.time_seconds / 60:.1f} min reached "
+                f"after {self.requests} requests"
+            )
+        if self.exhausted_reason == "requests":
+            return f"Request budget of {self.max_requests} requests reached"
+        return f"{self.requests} requests used, budget not reached"
+
+    def print_summary(self, noun: str = "items") -> None:
+        """
+        Print how many items the budget left unattempted, if it ran out.
+
+        Args:
+            noun: Name of the work items, e.g. "addresses"
+        """
+        if not self.exhausted:
+            return
+        print(f"\n⏱️  {self.describe()}: {self.describe_skipped()} {noun} not attempted")
+        if self.abandoned:
+            print(f"   {self.abandoned} failed {noun} were not retried")
+        print("   Re-run with --resume to continue with the remaining ones")
+
+
+class RetryWorkQueue:
+    """
+    Long-lived work queue with per-item retries for concurrent API crawls.
+
+    A fixed pool of worker threads pulls items from a shared ready queue. When an
+    item fails it is rescheduled on its own with exponential backoff and jitter,
+    while the other workers keep processing, so there is no round barrier where
+    one slow address holds up every retry behind it. Items are pulled from the
+    input iterable only when a worker is free, so a lazy source such as a paged
+    Dune result reader can keep downloading while the first items are processed.
+
+    With a priority function, the ready set is a heap ordered by item rank, so
+    the highest-ranked items (e.g. the largest wallets) are attempted first and
+    a retried item goes back ahead of lower-ranked ones. An optional RunBudget
+    stops the run when its time or request limit is reached.
+
+    run_async() offers the same scheduling on an asyncio event loop for
+    coroutine handlers such as AsyncArkhamApi.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 10,
+        max_retries: int = 10,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        metrics: Optional[RequestMetrics] = None,
+        budget: Optional[RunBudget] = None,
+    ):
+        """
+        Initialize the RetryWorkQueue.
+
+        Args:
+            max_workers: Number of worker threads
+            max_retries: Maximum number of attempts per item
+            base_delay: Backoff delay in seconds before the first retry of an item
+            max_delay: Upper bound on the backoff delay in seconds
+            metrics: Optional metrics registry to use instead of the process-wide one
+            budget: Optional time and request budget; once it is exhausted no new
+                attempt starts and the remaining items are left unprocessed
+        """
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = metrics or get_shared_metrics()
+        self.budget = budget
+
+    def _backoff_delay(self, attempts: int) -> float:
+        """
+        Compute the jittered exponential backoff delay for an item and record the
+        retry in metrics.
+
+        The delay is not recorded as sleep: the item is parked while the workers
+        keep processing others, so no thread waits for it.
+
+        Args:
+            attempts: Number of attempts already made for the item
+
+        Returns:
+            float: Seconds to wait before the next attempt
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        delay = random.uniform(delay / 2, delay)  # Jitter spreads retries apart
+        self.metrics.record_retry("work_queue", "failed")
+        return delay
+
+    def run(
+        self,
+        items: Iterable[Any],
+        handler: Callable[[Any, int], Optional[Any]],
+        on_success: Optional[Callable[[Any, Any], None]] = None,
+        progress: Optional[ProgressReporter] = None,
+        priority: Optional[Priority] = None,
+    ) -> List[Any]:
+        """
+        Process all items until each one succeeds or exhausts its attempts.
+
+        Args:
+            items: Work items to process; may be a lazy iterator, which is consumed
+                on demand by the workers
+            handler: Callable taking (item, attempt number) and returning a result,
+                or None if the attempt failed
+            on_success: Optional callback invoked with (item, result) from the
+                worker thread as soon as an item succeeds
+            progress: Optional reporter receiving the start and outcome of every attempt
+            priority: Optional function returning the rank of an item (None for
+                unranked items, which run last); the items are then read up front
+                and processed highest rank first
+
+        Returns:
+            List[Any]: Items that still failed after max_retries attempts; items
+                left unattempted by an exhausted budget are not included and are
+                counted in budget.skipped instead (as a lower bound when a lazy
+                input was not read to the end), and failed items it left with
+                retries in budget.abandoned
+
+        Raises:
+            Exception: Any error raised by the items iterator, after the items
+                already pulled from it have been processed
+        """
+        total = len(items) if isinstance(items, Sized) else None
+        source = iter(items)
+        ready: list = []  # Heap of (rank key, sequence, task) ready to run
+        delayed: list = []  # Heap of (ready_at, sequence, task)
+        sequence = itertools.count()
+        failed: List[Any] = []
+        state = {
+            "in_flight": 0,
+            "pulling": False,  # A worker is reading the next item from the source
+            "pulled": 0,  # Items read from the source by the workers
+            "exhausted": False,
+            "stopped": False,  # The budget ran out
+            "error": None,
+        }
+        condition = threading.Condition()
+
+        if priority is not None:
+            # Ranking needs every item, so the source is read before the workers start
+            for item in source:
+                task = _Task(item, priority)
+                heapq.heappush(ready, (task.key, next(sequence), task))
+            state["exhausted"] = True
+
+        def pull_from_source() -> Optional[_Task]:
+            # Called with the condition released so a slow source does not block
+            # the other workers from picking up retries
+            try:
+                task = _Task(next(source))
+                state["pulled"] += 1  # Only one worker pulls at a time
+                return task
+            except StopIteration:
+                pass
+            except Exception as e:
+                logger.error(f"Work item source failed: {str(e)}")
+                state["error"] = e
+            with condition:
+                state["exhausted"] = True
+            return None
+
+        def dispatch(task: _Task) -> Optional[_Task]:
+            # Called with the condition held
+            if self.budget is not None and not self.budget.try_acquire():
+                state["stopped"] = True
+                heapq.heappush(ready, (task.key, next(sequence), task))
+                condition.notify_all()  # Budget exhausted, wake idle workers
+                return None
+            state["in_flight"] += 1
+            return task
+
+        def next_task() -> Optional[_Task]:
+            with condition:
+                while True:
+                    if state["stopped"]:
+                        return None
+                    now = time.monotonic()
+                    while delayed and delayed[0][0] <= now:
+                        task = heapq.heappop(delayed)[2]
+                        heapq.heappush(ready, (task.key, next(sequence), task))
+                    if ready:
+                        return dispatch(heapq.heappop(ready)[2])
+                    if not state["exhausted"] and not state["pulling"]:
+                        state["pulling"] = True
+                        condition.release()
+                        try:
+                            task = pull_from_source()
+                        finally:
+                            condition.acquire()
+                            state["pulling"] = False
+                            condition.notify_all()  # Let idle workers pull the next item
+                        if task is not None:
+                            return dispatch(task)
+                        continue
+                    if (
+                        state["exhausted"]
+                        and not delayed
+                        and state["in_flight"] == 0
+                    ):
+                        condition.notify_all()  # Queue drained, wake idle workers
+                        return None
+                    timeout = delayed[0][0] - now if delayed else None
+                    condition.wait(timeout)
+
+        def worker() -> None:
+            while True:
+                task = next_task()
+                if task is None:
+                    return
+
+                task.attempts += 1
+                if progress is not None:
+                    progress.item_started()
+                try:
+                    result = handler(task.item, task.attempts)
+                except Exception as e:
+                    logger.warning(f"Worker execution failed for {task.item}: {str(e)}")
+                    result = None
+
+                if result is not None and on_success is not None:
+                    try:
+                        on_success(task.item, result)
+                    except Exception as e:
+                        logger.error(f"Result callback failed for {task.item}: {str(e)}")
+
+                will_retry = result is None and task.attempts < self.max_retries
+                if progress is not None:
+                    progress.item_finished(result is not None, will_retry)
+
+                with condition:
+                    state["in_flight"] -= 1
+                    if result is None:
+                        if will_retry:
+                            ready_at = time.monotonic() + self._backoff_delay(
+                                task.attempts
+                            )
+                            heapq.heappush(delayed, (ready_at, next(sequence), task))
+                        else:
+                            failed.append(task.item)
+                    condition.notify_all()
+
+        threads = [
+            threading.Thread(target=worker, name=f"arkham-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if state["stopped"]:
+            remaining = [entry[2] for entry in ready + delayed]
+            abandoned = sum(1 for task in remaining if task.attempts)
+            skipped = len(remaining) - abandoned
+            unread = not state["exhausted"]
+            if unread and total is not None:
+                skipped += total - state["pulled"]  # Sized input: count the unread rest
+                unread = False
+            self.budget.record_skipped(skipped, lower_bound=unread)
+            self.budget.record_abandoned(abandoned)
+            logger.warning(
+                f"{self.budget.describe()}: {skipped} items were not attempted"
+                + (" and the rest of the input was not read" if unread else "")
+                + (f", {abandoned} failed items were not retried" if abandoned else "")
+            )
+        if state["error"] is not None:
+            raise state["error"]
+        return failed
+
+    async def run_async(
+        self,
+        items: Iterable[Any],
+        handler: Callable[[Any, int], Awaitable[Optional[Any]]],
+        on_success: Optional[Callable[[Any, Any], None]] = None,
+        max_concurrency: Optional[int] = None,
+        progress: Optional[ProgressReporter] = None,
+        priority: Optional[Priority] = None,
+    ) -> List[Any]:
+        """
+        Process all items on the running event loop with per-item retries.
+
+        A bounded set of worker tasks pulls from an asyncio priority queue; failed
+        items are put back after their backoff delay without blocking any worker.
+
+        Args:
+            items: Work items to process
+            handler: Coroutine function taking (item, attempt number) and returning
+                a result, or None if the attempt failed
+            on_success: Optional callback invoked with (item, result) as soon as an
+                item succeeds
+            max_concurrency: Number of worker tasks (defaults to max_workers)
+            progress: Optional reporter receiving the start and outcome of every attempt
+            priority: Optional function returning the rank of an item; higher
+                ranks are processed first
+
+        Returns:
+            List[Any]: Items that still failed after max_retries attempts; items
+                left unattempted by an exhausted budget are counted in budget.skipped,
+                and failed items it left with retries in budget.abandoned
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        sequence = itertools.count()
+
+        def enqueue(task: _Task) -> None:
+            pending_retries.pop(task, None)
+            queue.put_nowait((task.key, next(sequence), task))
+
+        pending_retries: dict = {}  # Task waiting for its backoff -> timer handle
+        for item in items:
+            enqueue(_Task(item, priority))
+
+        failed: List[Any] = []
+        state = {"outstanding": queue.qsize(), "skipped": 0, "abandoned": 0}
+        done = asyncio.Event()
+        if state["outstanding"] == 0:
+            return failed
+
+        def finish() -> None:
+            state["outstanding"] -= 1
+            if state["outstanding"] == 0:
+                done.set()
+
+        def skip(task: _Task) -> None:
+            # Items that already failed once were attempted, just not retried
+            state["abandoned" if task.attempts else "skipped"] += 1
+            finish()
+
+        def stop() -> None:
+            # Budget exhausted: retries waiting for their backoff will not run
+            for task, handle in list(pending_retries.items()):
+                handle.cancel()
+                del pending_retries[task]
+                skip(task)
+
+        async def worker() -> None:
+            while True:
+                task = (await queue.get())[2]
+                if self.budget is not None and not self.budget.try_acquire():
+                    stop()
+                    skip(task)
+                    continue
+                task.attempts += 1
+                if progress is not None:
+                    progress.item_started()
+                try:
+                    result = await handler(task.item, task.attempts)
+                except Exception as e:
+                    logger.warning(f"Worker execution failed for {task.item}: {str(e)}")
+                    result = None
+
+                if progress is not None:
+                    progress.item_finished(
+                        result is not None,
+                        result is None and task.attempts < self.max_retries,
+                    )
+
+                if result is not None:
+                    if on_success is not None:
+                        try:
+                            on_success(task.item, result)
+                        except Exception as e:
+                            logger.error(f"Result callback failed for {task.item}: {str(e)}")
+                    finish()
+                elif task.attempts >= self.max_retries:
+                    failed.append(task.item)
+                    finish()
+                elif self.budget is not None and self.budget.exhausted:
+                    skip(task)
+                else:
+                    pending_retries[task] = loop.call_later(
+                        self._backoff_delay(task.attempts), enqueue, task
+                    )
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(max_concurrency or self.max_workers)
+        ]
+        try:
+            await done.wait()
+        finally:
+            for worker_task in workers:
+                worker_task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if state["skipped"] or state["abandoned"]:
+            self.budget.record_skipped(state["skipped"])
+            self.budget.record_abandoned(state["abandoned"])
+            logger.warning(
+                f"{self.budget.describe()}: {state['skipped']} items were not attempted"
+                + (
+                    f", {state['abandoned']} failed items were not retried"
+                    if state["abandoned"]
+                    else ""
+                )
+            )
+        return failed
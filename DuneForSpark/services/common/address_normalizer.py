@@ -0,0 +1,132 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+ADDRESS_PATTERN = re.compile(r"^0x[0-9a-f]{40}$")  # Canonical lower-case EVM address
+
+
+def normalize_address(value) -> Optional[str]:
+    """
+    Convert a raw address value to its canonical lower-case form.
+
+    Args:
+        value: Raw address as read from Dune (any case, optional surrounding whitespace)
+
+    Returns:
+        str: Lower-case 0x-prefixed address, or None if the value is not a valid address
+    """
+    if value is None:
+        return None
+    address = str(value).strip().lower()
+    if ADDRESS_PATTERN.match(address):
+        return address
+    return None
+
+
+class AddressNormalizer:
+    """
+    Normalization and deduplication stage between the Dune read and the crawlers.
+
+    Raw `user_addr` values are lower-cased and validated as hex addresses, invalid
+    values are dropped and duplicates are removed with a single set-based pass,
+    preserving the order of first appearance. Counters record how many Arkham
+    requests were saved by skipping duplicate and invalid entries.
+    """
+
+    def __init__(self, max_invalid_samples: int = 5):
+        """
+        Initialize the AddressNormalizer.
+
+        Args:
+            max_invalid_samples: Number of invalid values kept for the summary
+        """
+        self.max_invalid_samples = max_invalid_samples
+        self.total_count = 0
+        self.unique_count = 0
+        self.duplicate_count = 0
+        self.invalid_count = 0
+        self.invalid_samples: List[str] = []
+        self._seen: Set[str] = set()
+
+    @property
+    def requests_saved(self) -> int:
+        """Number of Arkham requests avoided by dropping duplicate and invalid values"""
+        return self.duplicate_count + self.invalid_count
+
+    def iter_normalize(self, values: Iterable) -> Iterator[str]:
+        """
+        Lazily yield canonical, unique addresses from a stream of raw values.
+
+        Suitable for streamed Dune reads: each address is yielded as soon as it
+        is read, and the counters are complete once the stream is exhausted.
+
+        Args:
+            values: Raw address values
+
+        Yields:
+            str: Canonical address seen for the first time
+        """
+        for value in values:
+            self.total_count += 1
+            address = normalize_address(value)
+            if address is None:
+                self.invalid_count += 1
+                if len(self.invalid_samples) < self.max_invalid_samples:
+                    self.invalid_samples.append(repr(value))
+                continue
+            if address in self._seen:
+                self.duplicate_count += 1
+                continue
+            self._seen.add(address)
+            self.unique_count += 1
+            yield address
+
+    def normalize(self, values: Iterable) -> List[str]:
+        """
+        Normalize and deduplicate a list of raw values and print a summary.
+
+        Args:
+            values: Raw address values
+
+        Returns:
+            List[str]: Canonical unique addresses in order of first appearance
+        """
+        addresses = list(self.iter_normalize(values))
+        self.print_summary()
+        return addresses
+
+    def normalize_ranked(
+        self, ranked_values: Iterable[Tuple[object, Optional[float]]]
+    ) -> Dict[str, Optional[float]]:
+        """
+        Normalize and deduplicate (value, rank) pairs and print a summary.
+
+        Pairs are expected highest rank first, as returned by
+        TableApi.queryRankedRowDataByTableId, so a duplicate address keeps the
+        rank of its first (highest) appearance.
+
+        Args:
+            ranked_values: Raw address values with their rank
+
+        Returns:
+            Dict[str, Optional[float]]: Rank per canonical address, in input order;
+                iterating it gives the addresses highest rank first
+        """
+        ranks: Dict[str, Optional[float]] = {}
+        for value, rank in ranked_values:
+            for address in self.iter_normalize((value,)):
+                ranks[address] = rank
+        self.print_summary()
+        return ranks
+
+    def print_summary(self) -> None:
+        """
+        Print how many addresses were kept, dropped and requests saved.
+        """
+        print("\n=== Address Normalization Summary ===")
+        print(f"Raw values: {self.total_count}")
+        print(f"Unique addresses: {self.unique_count}")
+        print(f"Duplicates dropped: {self.duplicate_count}")
+        print(f"Invalid values dropped: {self.invalid_count}")
+        if self.invalid_samples:
+            print(f"Invalid samples: {', '.join(self.invalid_samples)}")
+        print(f"Arkham requests saved: {self.requests_saved}")
@@ -0,0 +1,104 @@
+import json
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, stdlib json is used instead
+    orjson = None
+
+JsonLoads = Callable[[bytes], Any]  # Decoder taking the raw response body
+
+
+def _stdlib_loads(data: bytes) -> Any:
+    """Decode a JSON body with the standard library"""
+    return json.loads(data)
+
+
+def _orjson_loads(data: bytes) -> Any:
+    """
+    Decode a JSON body with orjson, straight from the raw bytes.
+
+    orjson rejects numbers outside the float range (e.g. 1.5e400), which the
+    standard library accepts; such bodies are decoded again with the standard
+    library instead of failing the request.
+    """
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return _stdlib_loads(data)
+
+
+def exact_loads(data: bytes) -> Any:
+    """
+    Decode a JSON body keeping every number exact.
+
+    Integers of any size stay Python ints and non-integer numbers are parsed as
+    Decimal, so token balances are not rounded to 64-bit integers or floats as
+    orjson would. About 4x slower than orjson; pass it as portfolio_json_loads
+    to force exact decoding of every portfolio body.
+    """
+    return json.loads(data, parse_float=Decimal)
+
+
+JSON_DECODERS = {
+    "json": _stdlib_loads,  # Always available
+    "orjson": _orjson_loads,  # Requires the orjson package
+}
+
+
+def get_json_loads(backend: Optional[str] = None) -> JsonLoads:
+    """
+    Select the function used to decode JSON response bodies.
+
+    Args:
+        backend: "orjson", "json", or None to use orjson when it is installed
+            and fall back to the standard library otherwise
+
+    Returns:
+        Callable[[bytes], Any]: Decoder taking the raw response bytes
+
+    Raises:
+        ValueError: If the backend is unknown
+        ImportError: If orjson is requested but not installed
+    """
+    if backend is None:
+        backend = "orjson" if orjson is not None else "json"
+    if backend not in JSON_DECODERS:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    if backend == "orjson" and orjson is None:
+        raise ImportError("orjson is required for the orjson JSON backend")
+    return JSON_DECODERS[backend]
+
+
+loads = get_json_loads()  # Default decoder for this process
+
+
+# Maps digits and "." to "1" and every other byte to " ", so that runs of number
+# characters can be found with bytes.find instead of a much slower regex scan
+_NUMBER_CHARS = bytes(49 if chr(i) in "0123456789." else 32 for i in range(256))
+# Longer than the shortest form of any double (17 digits) and than integers safely
+# within 64 bits, so such a number may lose digits when decoded by orjson
+_LONG_NUMBER = b"1" * 19
+
+
+def portfolio_loads(data: bytes) -> Any:
+    """
+    Decode a portfolio body with the fast default decoder, exactly only when needed.
+
+    A number written by the server as a double has at most 17 significant digits
+    and comes back unchanged through float and parse_decimal, so most bodies are
+    decoded with the default decoder. Bodies containing a number with 19 or
+    more characters (a fraction longer than that, or an integer that may not
+    fit in 64 bits) are decoded with exact_loads instead.
+
+    Args:
+        data: Raw portfolio response body
+
+    Returns:
+        Any: Decoded JSON value
+    """
+    if data.translate(_NUMBER_CHARS).find(_LONG_NUMBER) != -1:
+        return exact_loads(data)
+    return loads(data)
+
@@ -0,0 +1,271 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+
+LOGGER_NAME = "duneforspark"  # Parent of every logger returned by get_logger
+DEFAULT_BODY_LIMIT = 300  # Characters of an error response body kept in log lines
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger below the project's root logger.
+
+    Args:
+        name: Component name, e.g. "arkham_api"
+
+    Returns:
+        logging.Logger: Logger named "duneforspark.<name>"
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def truncate_body(text: Optional[str], limit: int = DEFAULT_BODY_LIMIT) -> str:
+    """
+    Shorten a response body for logging, collapsing whitespace.
+
+    Throttling and gateway errors often come back as full HTML pages; only the
+    beginning is useful in a log line.
+
+    Args:
+        text: Response body
+        limit: Maximum number of characters kept
+
+    Returns:
+        str: Single-line body, cut to the limit with the number of dropped characters
+    """
+    if not text:
+        return ""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more chars)"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line for the optional log file.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_log_path: Optional[str] = None,
+    stream: Optional[TextIO] = None,
+) -> logging.Logger:
+    """
+    Route project logs through a queue to the console and an optional JSON file.
+
+    Worker threads only put records on an in-memory queue; a single listener
+    thread formats them and writes to the outputs, so threads never contend on
+    the console while requests are in flight. Calling it again replaces the
+    previous configuration.
+
+    Args:
+        level: Minimum level logged, e.g. "DEBUG" for per-address lines
+        json_log_path: Optional path of a file receiving every record as JSON lines
+        stream: Console stream (defaults to stdout)
+
+    Returns:
+        logging.Logger: The project's root logger
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+
+        console = logging.StreamHandler(stream or sys.stdout)
+        console.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)-7s %(message)s", "%H:%M:%S")
+        )
+        handlers = [console]
+        if json_log_path:
+            json_handler = logging.FileHandler(json_log_path, encoding="utf-8")
+            json_handler.setFormatter(JsonFormatter())
+            handlers.append(json_handler)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *handlers)
+        _listener.start()
+
+        root = logging.getLogger(LOGGER_NAME)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(level.upper())
+        root.propagate = False
+    return root
+
+
+def ensure_logging() -> None:
+    """
+    Configure console logging with the defaults unless it was configured already.
+    """
+    if _listener is None:
+        configure_logging()
+
+
+def flush_logging() -> None:
+    """
+    Write out every queued record before returning.
+
+    Used before printing run summaries, so they appear after the log lines of
+    the run they summarize.
+    """
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()  # Drains the queue
+            _listener.start()
+
+
+def _stop_listener() -> None:
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
+class ProgressReporter:
+    """
+    Periodic progress line for a batch, replacing one log line per address.
+
+    Workers report when an item starts and finishes; a background thread logs
+    the completed count, rate, ETA, in-flight items and retries every interval
+    seconds, plus a final line when the reporter is stopped.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        total: Optional[int] = None,
+        interval: float = 10.0,  # Seconds between progress lines
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize the ProgressReporter.
+
+        Args:
+            label: Name of the batch shown at the start of each line
+            total: Number of items, or None if the input is streamed
+            interval: Seconds between progress lines
+            logger: Logger to write to (defaults to the "progress" logger)
+        """
+        ensure_logging()
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.logger = logger or get_logger("progress")
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.start_time = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ProgressReporter":
+        """Start logging progress lines in the background"""
+        self.start_time = time.monotonic()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"progress-{self.label}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread and log the final line"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.logger.info(self.format_line(final=True))
+        flush_logging()
+
+    def __enter__(self) -> "ProgressReporter":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def item_started(self) -> None:
+        """Record that a worker started an attempt"""
+        with self._lock:
+            self.in_flight += 1
+
+    def item_finished(self, succeeded: bool, will_retry: bool = False) -> None:
+        """
+        Record the outcome of an attempt.
+
+        Args:
+            succeeded: Whether the attempt succeeded
+            will_retry: Whether a failed item is scheduled for another attempt
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if succeeded:
+                self.succeeded += 1
+            elif will_retry:
+                self.retries += 1
+            else:
+                self.failed += 1
+
+    def format_line(self, final: bool = False) -> str:
+        """
+        Build the progress line.
+
+        Args:
+            final: Whether this is the line logged at the end of the batch
+
+        Returns:
+            str: Progress line
+        """
+        with self._lock:
+            done = self.succeeded + self.failed
+            elapsed = time.monotonic() - self.start_time
+            rate = done / elapsed if elapsed > 0 else 0.0
+            if self.total:
+                position = f"{done}/{self.total} ({done / self.total * 100:.1f}%)"
+            else:
+                position = f"{done}/?"
+            parts = [
+                f"{self.label}: {position} done, {self.failed} failed",
+                f"{rate:.1f}/s",
+            ]
+            if final:
+                parts.append(f"finished in {elapsed:.1f}s")
+            else:
+                if self.total and rate > 0:
+                    remaining = max(0, self.total - done) / rate
+                    parts.append(f"ETA {int(remaining // 60)}m{int(remaining % 60):02d}s")
+                parts.append(f"in flight {self.in_flight}")
+            parts.append(f"retries {self.retries}")
+        return " | ".join(parts)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.logger.info(self.format_line())
@@ -0,0 +1,373 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+# Upper bounds in seconds of the request latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+Status = Union[int, str]  # HTTP status code, or a failure name such as "timeout"
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram, exported with cumulative Prometheus buckets.
+
+    Not thread-safe on its own; RequestMetrics guards it with its lock.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize the LatencyHistogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add one observation"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            fraction: Quantile as a fraction, e.g. 0.99
+
+        Returns:
+            float: Bucket upper bound in seconds (inf for the overflow bucket),
+                or None if nothing was observed
+        """
+        if self.count == 0:
+            return None
+        rank = fraction * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        def json_value(value: Optional[float]):
+            return "+Inf" if value == float("inf") else value  # JSON has no infinity
+
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "buckets": buckets,
+            "p50_seconds": json_value(self.quantile(0.5)),
+            "p99_seconds": json_value(self.quantile(0.99)),
+        }
+
+
+class RequestMetrics:
+    """
+    Thread-safe per-request metrics for the Arkham and Dune clients.
+
+    Records, per endpoint, a latency histogram, status code counts, retries and
+    bytes downloaded and uploaded, plus the time spent sleeping (rate limiting,
+    backoff) by reason. Request latencies add up to the time spent in I/O, so the
+    two totals show whether a run is bound by the quota, by API latency, or by
+    our own delays. Only time a thread or coroutine actually spends waiting is
+    recorded as sleep; work items parked for a later retry count as retries.
+    Times are summed across threads and coroutines.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize the RequestMetrics.
+
+        Args:
+            buckets: Latency histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear all recorded metrics.
+        """
+        with self._lock:
+            self.started_at = time.time()
+            self.latency: Dict[str, LatencyHistogram] = {}
+            self.status_codes: Dict[Tuple[str, str], int] = {}
+            self.retries: Dict[Tuple[str, str], int] = {}
+            self.bytes_downloaded: Dict[str, int] = {}
+            self.bytes_uploaded: Dict[str, int] = {}
+            self.sleep_seconds: Dict[str, float] = {}
+
+    def record_request(
+        self,
+        endpoint: str,
+        status: Status,
+        seconds: float,
+        bytes_downloaded: int = 0,
+        bytes_uploaded: int = 0,
+    ) -> None:
+        """
+        Record one completed or failed HTTP request.
+
+        Args:
+            endpoint: Short endpoint name, e.g. "arkham_portfolio"
+            status: HTTP status code, or a failure name when no response arrived
+            seconds: Time spent in the request
+            bytes_downloaded: Size of the response body
+            bytes_uploaded: Size of the request body sent on the wire
+        """
+        with self._lock:
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+            key = (endpoint, str(status))
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+            if bytes_downloaded:
+                self.bytes_downloaded[endpoint] = (
+                    self.bytes_downloaded.get(endpoint, 0) + bytes_downloaded
+                )
+            if bytes_uploaded:
+                self.bytes_uploaded[endpoint] = (
+                    self.bytes_uploaded.get(endpoint, 0) + bytes_uploaded
+                )
+
+    def record_retry(self, endpoint: str, reason: str) -> None:
+        """
+        Record that a request or work item is being retried.
+
+        Args:
+            endpoint: Endpoint or work queue name
+            reason: Why it is retried, e.g. "throttled" or "failed"
+        """
+        with self._lock:
+            key = (endpoint, reason)
+            self.retries[key] = self.retries.get(key, 0) + 1
+
+    def record_sleep(self, reason: str, seconds: float) -> None:
+        """
+        Record time a thread or coroutine spent blocked instead of doing I/O.
+
+        Args:
+            reason: Why the caller waited, e.g. "rate_limit" or "upload_backoff"
+            seconds: Time waited
+        """
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.sleep_seconds[reason] = self.sleep_seconds.get(reason, 0.0) + seconds
+
+    def snapshot(self) -> dict:
+        """
+        Return all metrics as a JSON-serializable dictionary.
+
+        Returns:
+            dict: Per-endpoint latency, status codes, retries and bytes, plus
+                I/O and sleep totals
+        """
+        with self._lock:
+            endpoints = {}
+            for endpoint, histogram in self.latency.items():
+                endpoints[endpoint] = {
+                    "latency": histogram.to_dict(),
+                    "status_codes": {
+                        status: count
+                        for (name, status), count in self.status_codes.items()
+                        if name == endpoint
+                    },
+                    "bytes_downloaded": self.bytes_downloaded.get(endpoint, 0),
+                    "bytes_uploaded": self.bytes_uploaded.get(endpoint, 0),
+                }
+            retries: Dict[str, Dict[str, int]] = {}
+            for (name, reason), count in self.retries.items():
+                retries.setdefault(name, {})[reason] = count
+            return {
+                "elapsed_seconds": round(time.time() - self.started_at, 3),
+                "io_seconds": round(
+                    sum(histogram.total for histogram in self.latency.values()), 3
+                ),
+                "sleep_seconds": {
+                    reason: round(seconds, 3)
+                    for reason, seconds in self.sleep_seconds.items()
+                },
+                "endpoints": endpoints,
+                "retries": retries,
+            }
+
+    def to_json(self) -> str:
+        """
+        Render the metrics as a JSON document.
+        """
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = "duneforspark") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            str: Exposition text, suitable for a node_exporter textfile collector
+        """
+        with self._lock:
+            lines = [
+                f"# TYPE {prefix}_request_duration_seconds histogram",
+            ]
+            for endpoint, histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(
+                    list(histogram.buckets) + ["+Inf"], histogram.counts
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{prefix}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram.total:.6f}'
+                )
+                lines.append(
+                    f'{prefix}_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram.count}'
+                )
+
+            lines.append(f"# TYPE {prefix}_requests_total counter")
+            for (endpoint, status), count in sorted(self.status_codes.items()):
+                lines.append(
+                    f'{prefix}_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}'
+                )
+
+            lines.append(f"# TYPE {prefix}_retries_total counter")
+            for (endpoint, reason), count in sorted(self.retries.items()):
+                lines.append(
+                    f'{prefix}_retries_total{{endpoint="{endpoint}",reason="{reason}"}} {count}'
+                )
+
+            for direction, counters in (
+                ("downloaded", self.bytes_downloaded),
+                ("uploaded", self.bytes_uploaded),
+            ):
+                lines.append(f"# TYPE {prefix}_bytes_{direction}_total counter")
+                for endpoint, count in sorted(counters.items()):
+                    lines.append(
+                        f'{prefix}_bytes_{direction}_total{{endpoint="{endpoint}"}} {count}'
+                    )
+
+            lines.append(f"# TYPE {prefix}_sleep_seconds_total counter")
+            for reason, seconds in sorted(self.sleep_seconds.items()):
+                lines.append(
+                    f'{prefix}_sleep_seconds_total{{reason="{reason}"}} {seconds:.6f}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> str:
+        """
+        Write the metrics to a file, as Prometheus text for .prom files and JSON otherwise.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            str: The path written
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"📈 Metrics written to: {path}")
+        return path
+
+    def print_summary(self) -> None:
+        """
+        Print request counts, latency percentiles, and I/O compared with sleep time.
+        """
+        snapshot = self.snapshot()
+        if not snapshot["endpoints"]:
+            return
+
+        print("\n📈 Request metrics")
+        for endpoint, data in sorted(snapshot["endpoints"].items()):
+            latency = data["latency"]
+            codes = ", ".join(
+                f"{status}: {count}"
+                for status, count in sorted(data["status_codes"].items())
+            )
+            print(
+                f"  {endpoint}: {latency['count']} requests "
+                f"(p50 <= {latency['p50_seconds']}s, p99 <= {latency['p99_seconds']}s), "
+                f"{data['bytes_downloaded'] / (1024*1024):.2f} MB down, "
+                f"{data['bytes_uploaded'] / (1024*1024):.2f} MB up [{codes}]"
+            )
+        for endpoint, reasons in sorted(snapshot["retries"].items()):
+            print(
+                f"  Retries {endpoint}: "
+                + ", ".join(f"{reason}: {count}" for reason, count in sorted(reasons.items()))
+            )
+        sleep_total = sum(snapshot["sleep_seconds"].values())
+        print(
+            f"  Time in I/O: {snapshot['io_seconds']:.1f}s, waiting: {sleep_total:.1f}s "
+            + (
+                "("
+                + ", ".join(
+                    f"{reason} {seconds:.1f}s"
+                    for reason, seconds in sorted(snapshot["sleep_seconds"].items())
+                )
+                + ")"
+                if sleep_total
+                else ""
+            )
+            + " summed over threads"
+        )
+
+
+_shared_metrics: Optional[RequestMetrics] = None
+_shared_metrics_lock = threading.Lock()
+
+
+def get_shared_metrics() -> RequestMetrics:
+    """
+    Get the process-wide metrics registry, creating it on first use.
+
+    ArkhamApi, TableApi and the work queues record into this instance unless
+    given their own, so one export covers the whole run.
+
+    Returns:
+        RequestMetrics: Shared metrics instance
+    """
+    global _shared_metrics
+    with _shared_metrics_lock:
+        if _shared_metrics is None:
+            _shared_metrics = RequestMetrics()
+        return _shared_metrics
+
+
+def report_metrics_at_exit(path: Optional[str] = None) -> RequestMetrics:
+    """
+    Print the shared metrics summary when the process exits, and optionally export it.
+
+    Args:
+        path: Optional export path (.prom for Prometheus text, JSON otherwise)
+
+    Returns:
+        RequestMetrics: Shared metrics instance
+    """
+    metrics = get_shared_metrics()
+    atexit.register(metrics.print_summary)
+    if path:
+        atexit.register(metrics.export, path)  # Runs before the summary (LIFO)
+    return metrics
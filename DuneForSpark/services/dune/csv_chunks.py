@@ -0,0 +1,195 @@
+import os
+import zlib
+from typing import List, Tuple
+
+
+class CsvChunkReader:
+    """
+    File-like view over one chunk of a CSV file, with the header row prepended.
+
+    Data is read from disk on demand, so only one read buffer is held in memory
+    at a time regardless of chunk size. The object reports its total length,
+    which lets requests send it with a Content-Length header.
+    """
+
+    def __init__(self, csv_file_path: str, header: bytes, start: int, end: int):
+        """
+        Initialize the CsvChunkReader.
+
+        Args:
+            csv_file_path: Path to the CSV file
+            header: Raw header row, including the trailing newline
+            start: Byte offset of the first data row in the chunk
+            end: Byte offset just past the last data row in the chunk
+        """
+        self.csv_file_path = csv_file_path
+        self.header = header
+        self.start = start
+        self.end = end
+        self._header_pos = 0
+        self._file = None
+        self._remaining = end - start
+
+    def __len__(self) -> int:
+        return len(self.header) + (self.end - self.start)
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read up to `size` bytes of the chunk (header first, then data rows).
+
+        Args:
+            size: Maximum number of bytes to return (-1 reads everything left)
+
+        Returns:
+            bytes: Next part of the chunk, or b"" when exhausted
+        """
+        if size is None or size < 0:
+            size = len(self)
+
+        parts = []
+        if self._header_pos < len(self.header):
+            part = self.header[self._header_pos : self._header_pos + size]
+            self._header_pos += len(part)
+            size -= len(part)
+            parts.append(part)
+
+        if size > 0 and self._remaining > 0:
+            if self._file is None:
+                self._file = open(self.csv_file_path, "rb")
+                self._file.seek(self.start)
+            part = self._file.read(min(size, self._remaining))
+            self._remaining -= len(part)
+            parts.append(part)
+            if self._remaining <= 0:
+                self.close()
+
+        return b"".join(parts)
+
+    def close(self) -> None:
+        """
+        Close the underlying file handle.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def split_csv_chunks(
+    csv_file_path: str, chunk_bytes: int
+) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Plan size-bounded chunks of a CSV file on row boundaries.
+
+    The file is scanned line by line without loading it into memory. Newlines
+    inside quoted fields are not treated as row boundaries, so a chunk never
+    splits a record.
+
+    Args:
+        csv_file_path: Path to the CSV file
+        chunk_bytes: Target maximum number of data bytes per chunk
+
+    Returns:
+        Tuple[bytes, List[Tuple[int, int]]]: (header row, list of (start, end) byte ranges)
+    """
+    chunks: List[Tuple[int, int]] = []
+    with open(csv_file_path, "rb") as f:
+        header = f.readline()
+        chunk_start = f.tell()
+        position = chunk_start
+        in_quotes = False
+
+        for line in iter(f.readline, b""):
+            position += len(line)
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            if in_quotes:
+                continue  # Record continues on the next line
+            if position - chunk_start >= chunk_bytes:
+                chunks.append((chunk_start, position))
+                chunk_start = position
+
+        if position > chunk_start:
+            chunks.append((chunk_start, position))
+
+    if header and not header.endswith(b"\n"):
+        header += b"\n"
+    return header, chunks
+
+
+def count_csv_records(csv_file_path: str) -> int:
+    """
+    Count the data records of a CSV file without loading it into memory.
+
+    Newlines inside quoted fields do not start a new record, matching the row
+    boundaries used by split_csv_chunks.
+
+    Args:
+        csv_file_path: Path to the CSV file
+
+    Returns:
+        int: Number of records, excluding the header row
+    """
+    count = 0
+    with open(csv_file_path, "rb") as f:
+        f.readline()  # Skip header
+        in_quotes = False
+        for line in f:
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes and line.strip():
+                count += 1
+    return count
+
+
+def csv_file_signature(csv_file_path: str) -> str:
+    """
+    Build a cheap signature of a CSV file used to validate upload progress files.
+
+    Args:
+        csv_file_path: Path to the CSV file
+
+    Returns:
+        str: Signature made of the file size and modification time
+    """
+    stat = os.stat(csv_file_path)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+class GzipStream:
+    """
+    Iterator that gzip-compresses a file-like body on the fly.
+
+    Blocks are read from the source, compressed and yielded one at a time, so
+    the upload never holds more than one block in memory. The number of raw and
+    compressed bytes is tracked for reporting.
+    """
+
+    def __init__(self, source, block_size: int = 1024 * 1024, level: int = 6):
+        """
+        Initialize the GzipStream.
+
+        Args:
+            source: File-like object providing the uncompressed body
+            block_size: Number of raw bytes read per block
+            level: zlib compression level (1 fastest, 9 smallest)
+        """
+        self.source = source
+        self.block_size = block_size
+        self.level = level
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    def __iter__(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31 = gzip wrapper
+        while True:
+            block = self.source.read(self.block_size)
+            if not block:
+                break
+            self.raw_bytes += len(block)
+            compressed = compressor.compress(block)
+            if compressed:
+                self.compressed_bytes += len(compressed)
+                yield compressed
+        tail = compressor.flush()
+        self.compressed_bytes += len(tail)
+        yield tail
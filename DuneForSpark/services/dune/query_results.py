@@ -0,0 +1,190 @@
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+import requests
+
+from ..common.json_decoder import loads
+from ..common.logger import get_logger, truncate_body
+from ..common.metrics import RequestMetrics, get_shared_metrics
+
+logger = get_logger("query_results")
+
+
+class QueryResultPager:
+    """
+    Paginated reader over the latest result of a Dune query.
+
+    Rows are fetched page by page from the `/query/{id}/results` endpoint using
+    its limit and offset parameters, and yielded as soon as each page arrives.
+    Only one page is held in memory at a time, and callers can start working on
+    the first rows while the rest of the result is still being downloaded.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        query_id: int,
+        base_url: str = "https://api.dune.com",
+        page_size: int = 10000,  # Rows requested per page
+        columns: Optional[List[str]] = None,
+        max_retries: int = 5,  # Attempts per page before giving up
+        metrics: Optional[RequestMetrics] = None,
+    ):
+        """
+        Initialize the QueryResultPager.
+
+        Args:
+            api_key: Dune API key
+            query_id: ID of the Dune query whose latest result is read
+            base_url: Base URL for the Dune API endpoint
+            page_size: Number of rows requested per page
+            columns: Optional list of columns to fetch; other columns are not downloaded
+            max_retries: Number of attempts per page for throttled or failed requests
+            metrics: Optional metrics registry to use instead of the process-wide one
+        """
+        self.api_key = api_key
+        self.query_id = query_id
+        self.base_url = base_url
+        self.page_size = page_size
+        self.columns = columns
+        self.max_retries = max_retries
+        self.metrics = metrics or get_shared_metrics()
+        self.total_row_count: Optional[int] = None  # Known once the first page arrived
+        self.rows_read = 0
+        self.pages_read = 0
+
+    def _fetch_page(self, offset: int) -> dict:
+        """
+        Fetch one page of results, retrying throttled and server errors.
+
+        Args:
+            offset: Row offset of the page
+
+        Returns:
+            dict: Decoded response body
+
+        Raises:
+            RuntimeError: If the page could not be fetched after max_retries attempts
+        """
+        url = f"{self.base_url}/api/v1/query/{self.query_id}/results"  # Dune API endpoint for query results
+        headers = {"X-DUNE-API-KEY": self.api_key}  # Authentication header with API key
+        params = {"limit": self.page_size, "offset": offset}
+        if self.columns:
+            params["columns"] = ",".join(self.columns)
+
+        last_error = ""
+        for attempt in range(1, self.max_retries + 1):
+            request_start = time.monotonic()
+            try:
+                response = requests.get(
+                    url, headers=headers, params=params, timeout=60
+                )  # Request timeout in seconds
+                self.metrics.record_request(
+                    "dune_query_results",
+                    response.status_code,
+                    time.monotonic() - request_start,
+                    bytes_downloaded=len(response.content),
+                )
+
+                if response.status_code == 200:  # Success status code
+                    return loads(response.content)
+
+                last_error = f"HTTP {response.status_code}: {truncate_body(response.text)}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break  # Client errors will not succeed on retry
+            except requests.exceptions.RequestException as e:
+                self.metrics.record_request(
+                    "dune_query_results",
+                    type(e).__name__,
+                    time.monotonic() - request_start,
+                )
+                last_error = str(e)
+
+            logger.warning(
+                f"Result page at offset {offset} failed "
+                f"(attempt {attempt}/{self.max_retries}): {last_error}"
+            )
+            if attempt < self.max_retries:
+                self.metrics.record_retry("dune_query_results", "failed")
+                delay = min(60, 2**attempt)  # Backoff delay before retrying
+                self.metrics.record_sleep("dune_read_backoff", delay)
+                time.sleep(delay)
+
+        raise RuntimeError(
+            f"Failed to fetch results of query {self.query_id} at offset {offset}: {last_error}"
+        )
+
+    def iter_rows(self) -> Iterator[dict]:
+        """
+        Yield result rows page by page.
+
+        Yields:
+            dict: One result row keyed by column name
+
+        Raises:
+            RuntimeError: If a page could not be fetched; rows already yielded are
+                not repeated
+        """
+        offset: Optional[int] = 0
+        while offset is not None:
+            page = self._fetch_page(offset)
+            result = page.get("result") or {}
+            metadata = result.get("metadata") or {}
+            if self.total_row_count is None:
+                self.total_row_count = metadata.get("total_row_count")
+
+            rows = result.get("rows") or []
+            self.pages_read += 1
+            for row in rows:
+                self.rows_read += 1
+                yield row
+
+            offset = page.get("next_offset")
+            if not rows:
+                break  # Guard against a cursor that never advances
+
+    def iter_values(self, column: str) -> Iterator[Any]:
+        """
+        Yield the values of one column page by page.
+
+        Rows without the column are skipped.
+
+        Args:
+            column: Name of the column to extract
+
+        Yields:
+            Any: Column value of each row
+        """
+        for row in self.iter_rows():
+            if column in row:
+                yield row[column]
+
+    def iter_ranked(
+        self, column: str, rank_column: str
+    ) -> Iterator[Tuple[Any, Optional[float]]]:
+        """
+        Yield the values of one column with a numeric rank from another column.
+
+        Rows without the value column are skipped; a missing or non-numeric
+        rank is yielded as None.
+
+        Args:
+            column: Name of the column to extract
+            rank_column: Name of the numeric column ranking each value, e.g. a USD balance
+
+        Yields:
+            Tuple[Any, Optional[float]]: (column value, rank)
+        """
+        for row in self.iter_rows():
+            if column not in row:
+                continue
+            try:
+                rank = float(row.get(rank_column))
+            except (TypeError, ValueError):
+                rank = None
+            if rank is not None and rank != rank:
+                rank = None  # NaN cannot be ordered
+            yield row[column], rank
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_rows()
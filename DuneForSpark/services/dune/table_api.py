@@ -1,7 +1,21 @@
 from dune_client.client import DuneClient
 import requests
+import json
 import os
-from typing import List
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .csv_chunks import (
+    CsvChunkReader,
+    GzipStream,
+    count_csv_records,
+    csv_file_signature,
+    split_csv_chunks,
+)
+from .query_results import QueryResultPager
+from ..common.logger import truncate_body
+from ..common.metrics import RequestMetrics, get_shared_metrics
 
 
 class TableApi:
@@ -9,15 +23,24 @@ class TableApi:
     Dune Analytics api class, encapsulating all Dune-related operations.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.dune.com",
+        metrics: Optional[RequestMetrics] = None,
+    ):
         """
         Initialize DuneService
 
         Args:
             api_key: Dune API key
+            base_url: Base URL for the Dune API endpoint
+            metrics: Optional metrics registry to use instead of the process-wide one
         """
         self.api_key = api_key
-        self.dune = DuneClient(api_key)
+        self.base_url = base_url
+        self.dune = DuneClient(api_key, base_url=base_url)
+        self.metrics = metrics or get_shared_metrics()
 
     def createTable(
         self, namespace, table_name, description, schema, is_private: str = False
@@ -35,7 +58,8 @@ class TableApi:
             description: Description of the table's purpose
 
         Returns:
-            bool: True if table creation was successful or already exists, False otherwise
+            bool: True if table creation was successful or the table already exists
+                with the expected column types, False otherwise
         """
         try:
             table = self.dune.create_table(
@@ -48,6 +72,18 @@ class TableApi:
 
             if hasattr(table, "already_existed") and table.already_existed:
                 print(f"Table already exists: {table.full_name}")
+                mismatches = self.checkTableSchema(namespace, table_name, schema)
+                if mismatches:
+                    print(
+                        f"❌ Existing table {namespace}.{table_name} does not match the expected schema:"
+                    )
+                    for mismatch in mismatches:
+                        print(f"  {mismatch}")
+                    print(
+                        "Recreate it with migrateTableSchema if its rows can be dropped, "
+                        "or load through a staged, versioned table instead"
+                    )
+                    return False
             else:
                 print(f"Table created successfully: {table.full_name}")
                 print("Credits consumed: 10")
@@ -63,7 +99,7 @@ class TableApi:
                 print(f"Error details: {error_detail}")
             except:
                 print(f"Error code: {status_code}")
-                print(f"Response: {e.response.text}")
+                print(f"Response: {truncate_body(e.response.text)}")
             return False
 
         except Exception as e:
@@ -71,6 +107,119 @@ class TableApi:
             print(f"Error message: {str(e)}")
             return False
 
+    def getTableColumns(self, namespace, table_name) -> Optional[Dict[str, str]]:
+        """
+        Look up the column types of an uploaded table.
+
+        Pages through the tables owned by the API key (GET /api/v1/uploads)
+        until the table is found.
+
+        Args:
+            namespace: Namespace of the table
+            table_name: Name of the table
+
+        Returns:
+            Dict[str, str]: Column type by column name (empty if the table does not
+                exist), or None if the listing failed
+        """
+        url = f"{self.base_url}/api/v1/uploads"  # Dune API endpoint listing uploaded tables
+        headers = {"X-DUNE-API-KEY": self.api_key}  # Authentication header with API key
+        suffix = f"{namespace}.{table_name}"
+        offset: Optional[int] = 0
+        try:
+            while offset is not None:
+                response = requests.get(
+                    url,
+                    headers=headers,
+                    params={"limit": 1000, "offset": offset},
+                    timeout=30,
+                )  # Request timeout in seconds
+                if response.status_code != 200:  # Success status code
+                    print(
+                        f"Table listing failed - HTTP {response.status_code}: "
+                        f"{truncate_body(response.text)}"
+                    )
+                    return None
+                page = response.json()
+                tables = page.get("tables") or []
+                for table in tables:
+                    full_name = table.get("full_name", "")
+                    if full_name == suffix or full_name.endswith(f".{suffix}"):
+                        return {
+                            column["name"]: column["type"]
+                            for column in table.get("columns") or []
+                        }
+                offset = page.get("next_offset")
+                if not tables:
+                    break  # Guard against a cursor that never advances
+        except Exception as e:
+            print(f"Table listing error: {str(e)}")
+            return None
+        return {}
+
+    def checkTableSchema(self, namespace, table_name, schema) -> Optional[List[str]]:
+        """
+        Compare the columns of an existing table with the expected schema.
+
+        Args:
+            namespace: Namespace of the table
+            table_name: Name of the table
+            schema: Expected columns, as passed to createTable
+
+        Returns:
+            List[str]: One description per missing or differently typed column
+                (empty when the table matches), or None if the columns could not
+                be looked up
+        """
+        columns = self.getTableColumns(namespace, table_name)
+        if columns is None:
+            print(
+                f"⚠️  Could not verify the column types of {namespace}.{table_name}"
+            )
+            return None
+        if not columns:
+            return []  # Table does not exist yet, nothing to compare
+        actual = {name.lower(): column_type.lower() for name, column_type in columns.items()}
+        mismatches = []
+        for column in schema:
+            name = column["name"].lower()
+            expected_type = column["type"].lower()
+            if name not in actual:
+                mismatches.append(f"{column['name']}: missing, expected {expected_type}")
+            elif not actual[name].startswith(expected_type):
+                mismatches.append(
+                    f"{column['name']}: {actual[name]}, expected {expected_type}"
+                )
+        return mismatches
+
+    def migrateTableSchema(
+        self, namespace, table_name, description, schema, is_private: bool = False
+    ) -> bool:
+        """
+        Create a table, recreating it when its columns differ from the schema.
+
+        Only for tables whose contents are fully replaced on every run (such as
+        the portfolio table): the existing rows are deleted with the table.
+
+        Args:
+            namespace: Namespace of the table
+            table_name: Name of the table
+            description: Description of the table's purpose
+            schema: Expected columns
+            is_private: Whether a recreated table is private
+
+        Returns:
+            bool: True if the table exists with the expected schema, False otherwise
+        """
+        mismatches = self.checkTableSchema(namespace, table_name, schema)
+        if mismatches:
+            print(f"🔧 Recreating {namespace}.{table_name} with the expected schema:")
+            for mismatch in mismatches:
+                print(f"  {mismatch}")
+            if not self.deleteTable(namespace, table_name):
+                return False
+        return self.createTable(namespace, table_name, description, schema, is_private)
+
     def deleteTable(self, namespace, table_name):
         """
         Delete a table from Dune Analytics.
@@ -117,7 +266,7 @@ class TableApi:
                 error_detail = e.response.json()
                 print(f"Error details: {error_detail}")
             except:
-                print(f"Response content: {e.response.text}")
+                print(f"Response content: {truncate_body(e.response.text)}")
 
             return False
 
@@ -153,13 +302,20 @@ class TableApi:
                     return False
             else:
                 print(f"Clearing table: {namespace}.{table_name} (using direct API)")
-                url = f"https://api.dune.com/api/v1/table/{namespace}/{table_name}/clear"  # Dune API endpoint for table clearing
+                url = f"{self.base_url}/api/v1/table/{namespace}/{table_name}/clear"  # Dune API endpoint for table clearing
                 headers = {
                     "X-DUNE-API-KEY": self.api_key
                 }  # Authentication header with API key
+                request_start = time.monotonic()
                 response = requests.post(
                     url, headers=headers, timeout=30
                 )  # Request timeout in seconds
+                self.metrics.record_request(
+                    "dune_table_clear",
+                    response.status_code,
+                    time.monotonic() - request_start,
+                    bytes_downloaded=len(response.content),
+                )
 
                 if response.status_code == 200:  # Success status code
                     print("Table cleared successfully")
@@ -169,32 +325,97 @@ class TableApi:
                     return False
 
         except requests.exceptions.HTTPError as e:
-            print(f"HTTP error {e.response.status_code}: {e.response.text}")
+            print(f"HTTP error {e.response.status_code}: {truncate_body(e.response.text)}")
             return False
         except Exception as e:
             print(f"Error: {str(e)}")
             return False
 
-    def insertCsvToTable(self, csv_file_path, namespace, table_name):
+    def insertCsvToTable(
+        self,
+        csv_file_path,
+        namespace,
+        table_name,
+        chunk_size_mb: float = 50.0,
+        max_chunk_retries: int = 5,
+        compress: bool = False,
+        resume: bool = True,
+    ):
         """
         Insert CSV data into a Dune Analytics table by directly calling the API.
 
-        This function bypasses the DuneClient and makes a direct HTTP POST request
-        to the Dune Analytics API endpoint to insert CSV file data into a specified table.
+        See insertCsvRowsToTable, which also returns the number of rows written.
 
         Args:
             csv_file_path: File path to the CSV file to be inserted
             namespace: Namespace of the target table
             table_name: Name of the target table
+            chunk_size_mb: Maximum size of each uploaded chunk in megabytes
+            max_chunk_retries: Maximum number of attempts per chunk
+            compress: Gzip-compress request bodies while streaming them
+            resume: Continue after the chunks recorded in the progress file of an
+                earlier upload of the same file (False uploads every chunk again)
 
         Returns:
             bool: True if data insertion was successful, False otherwise
         """
+        rows_written = self.insertCsvRowsToTable(
+            csv_file_path,
+            namespace,
+            table_name,
+            chunk_size_mb=chunk_size_mb,
+            max_chunk_retries=max_chunk_retries,
+            compress=compress,
+            resume=resume,
+        )
+        return rows_written is not None
+
+    def insertCsvRowsToTable(
+        self,
+        csv_file_path,
+        namespace,
+        table_name,
+        chunk_size_mb: float = 50.0,
+        max_chunk_retries: int = 5,
+        compress: bool = False,
+        resume: bool = True,
+    ) -> Optional[int]:
+        """
+        Insert CSV data into a Dune Analytics table and return the rows written.
+
+        This function bypasses the DuneClient and makes direct HTTP POST requests
+        to the Dune Analytics API endpoint to insert CSV file data into a specified table.
+        The file is split on row boundaries into size-bounded chunks that are each
+        streamed from disk as a separate insert with the header row repeated. Each
+        chunk is retried on its own, and completed chunks are recorded in a progress
+        file next to the CSV, so uploading the same file again resumes after the
+        last successful chunk. The entry points record the exported CSV in their
+        CheckpointJournal, and --resume uploads that file instead of a new export.
+        With compress enabled each chunk is gzip-compressed on the fly and sent
+        with Content-Encoding: gzip.
+
+        Args:
+            csv_file_path: File path to the CSV file to be inserted
+            namespace: Namespace of the target table
+            table_name: Name of the target table
+            chunk_size_mb: Maximum size of each uploaded chunk in megabytes
+            max_chunk_retries: Maximum number of attempts per chunk
+            compress: Gzip-compress request bodies while streaming them
+            resume: Continue after the chunks recorded in the progress file of an
+                earlier upload of the same file (False uploads every chunk again,
+                e.g. after the table was cleared)
+
+        Returns:
+            int: Number of rows Dune reported as written (including chunks of a
+                resumed upload), or None if the insertion failed. Returned rather
+                than stored on the instance, so concurrent uploads sharing one
+                TableApi each see their own count.
+        """
         if not os.path.exists(csv_file_path):
             print(f"File not found: {csv_file_path}")
-            return False
+            return None
 
-        url = f"https://api.dune.com/api/v1/table/{namespace}/{table_name}/insert"  # Dune API endpoint for table insertion
+        url = f"{self.base_url}/api/v1/table/{namespace}/{table_name}/insert"  # Dune API endpoint for table insertion
 
         headers = {
             "X-Dune-API-Key": self.api_key,  # API authentication header
@@ -202,75 +423,534 @@ class TableApi:
             "Accept": "application/json",  # Expected response format
             "Accept-Encoding": "identity",  # Encoding preference
         }
+        if compress:
+            headers["Content-Encoding"] = "gzip"  # Request body is gzip-compressed
 
         file_size = os.path.getsize(csv_file_path)
         print(f"File size: {file_size / (1024*1024):.2f} MB")
 
-        try:
-            print(f"Uploading to: {url}")
+        chunk_bytes = max(1, int(chunk_size_mb * 1024 * 1024))
+        header, chunks = split_csv_chunks(csv_file_path, chunk_bytes)
+        if not chunks:
+            print("No data rows to upload")
+            return 0
+
+        progress_path = f"{csv_file_path}.upload.json"  # Resume state for this upload
+        progress = self._load_upload_progress(
+            progress_path, csv_file_path, namespace, table_name, chunk_bytes, resume
+        )
+        completed = set(progress["completed"])
+        if completed:
+            print(f"Resuming upload: {len(completed)}/{len(chunks)} chunks already done")
+
+        print(f"Uploading to: {url} in {len(chunks)} chunk(s)")
+        rows_written = progress.get("rows_written", 0)  # Includes chunks of a resumed run
+        raw_bytes = 0
+        wire_bytes = 0
+        start_time = time.time()
+
+        for index, (start, end) in enumerate(chunks):
+            if index in completed:
+                continue
+
+            result, chunk_wire_bytes = self._upload_csv_chunk(
+                url,
+                headers,
+                csv_file_path,
+                header,
+                start,
+                end,
+                index,
+                len(chunks),
+                max_chunk_retries,
+                compress,
+            )
+            if result is None:
+                print(
+                    f"Upload failed at chunk {index + 1}/{len(chunks)}, "
+                    "re-run with --resume to continue from this chunk"
+                )
+                return None
+
+            rows_written += result.get("rows_written", 0) or 0
+            raw_bytes += len(header) + (end - start)
+            wire_bytes += chunk_wire_bytes
+            completed.add(index)
+            progress["completed"] = sorted(completed)
+            progress["rows_written"] = rows_written
+            with open(progress_path, "w", encoding="utf-8") as f:
+                json.dump(progress, f)
+
+            elapsed = time.time() - start_time
+            print(
+                f"Chunk {index + 1}/{len(chunks)} uploaded "
+                f"({len(completed)}/{len(chunks)} done, "
+                f"{raw_bytes / (1024*1024) / elapsed if elapsed > 0 else 0:.2f} MB/s)"
+            )
+
+        if os.path.exists(progress_path):
+            os.remove(progress_path)
+
+        elapsed = time.time() - start_time
+        print("Upload successful")
+        print(f"Rows written: {rows_written}")
+        print(f"Raw size: {raw_bytes / (1024*1024):.2f} MB")
+        if compress:
+            print(
+                f"Compressed size: {wire_bytes / (1024*1024):.2f} MB "
+                f"(ratio {raw_bytes / wire_bytes if wire_bytes else 0:.1f}x)"
+            )
+        if elapsed > 0:
+            print(
+                f"Throughput: {raw_bytes / (1024*1024) / elapsed:.2f} MB/s raw, "
+                f"{wire_bytes / (1024*1024) / elapsed:.2f} MB/s on the wire "
+                f"({elapsed:.1f} seconds)"
+            )
+        return rows_written
+
+    def _load_upload_progress(
+        self, progress_path, csv_file_path, namespace, table_name, chunk_bytes, resume=True
+    ) -> dict:
+        """
+        Load the progress file of an interrupted upload of the same file and table.
+
+        Progress is discarded if the file, target table or chunk size changed, or
+        if resuming was not requested.
+
+        Args:
+            progress_path: Path of the progress file
+            csv_file_path: File path to the CSV file being uploaded
+            namespace: Namespace of the target table
+            table_name: Name of the target table
+            chunk_bytes: Chunk size in bytes
+            resume: Whether the recorded progress may be reused
+
+        Returns:
+            dict: Progress state with the list of completed chunk indexes
+        """
+        expected = {
+            "table": f"{namespace}.{table_name}",
+            "signature": csv_file_signature(csv_file_path),
+            "chunk_bytes": chunk_bytes,
+        }
+        if resume and os.path.exists(progress_path):
+            try:
+                with open(progress_path, encoding="utf-8") as f:
+                    progress = json.load(f)
+                if all(progress.get(key) == value for key, value in expected.items()):
+                    return progress
+            except (OSError, ValueError):
+                pass
+        return {**expected, "completed": [], "rows_written": 0}
+
+    def _upload_csv_chunk(
+        self,
+        url,
+        headers,
+        csv_file_path,
+        header,
+        start,
+        end,
+        index,
+        total,
+        max_retries,
+        compress=False,
+    ):
+        """
+        Upload one CSV chunk, retrying with exponential backoff on failure.
+
+        Args:
+            url: Dune insert endpoint URL
+            headers: Request headers
+            csv_file_path: File path to the CSV file
+            header: Raw CSV header row
+            start: Byte offset of the first data row in the chunk
+            end: Byte offset just past the last data row in the chunk
+            index: Zero-based chunk index (for logging purposes)
+            total: Total number of chunks (for logging purposes)
+            max_retries: Maximum number of attempts
+            compress: Gzip-compress the request body while streaming it
 
-            with open(csv_file_path, "rb") as f:
+        Returns:
+            Tuple[dict, int]: (decoded insert response or None if every attempt
+                failed, number of body bytes sent on the wire)
+        """
+        for attempt in range(1, max_retries + 1):
+            body = CsvChunkReader(csv_file_path, header, start, end)
+            data = GzipStream(body) if compress else body
+            request_start = time.monotonic()
+            try:
                 response = requests.post(
                     url,
                     headers=headers,
-                    data=f,
-                    timeout=600,  # Request timeout in seconds (10 minutes)
+                    data=data,
+                    timeout=300,  # Request timeout in seconds per chunk
                 )
+                wire_bytes = data.compressed_bytes if compress else len(body)
+                self.metrics.record_request(
+                    "dune_table_insert",
+                    response.status_code,
+                    time.monotonic() - request_start,
+                    bytes_downloaded=len(response.content),
+                    bytes_uploaded=wire_bytes,
+                )
+                request_start = None  # Recorded; later errors are not request failures
 
-            if response.status_code == 200:  # Success status code
-                result = response.json()
-                print("Upload successful")
-                print(f"Rows written: {result.get('rows_written', 'N/A')}")
-                print(f"Bytes written: {result.get('bytes_written', 'N/A')}")
-                return True
-            else:
-                print(f"Upload failed: {response.status_code}")
-                print(f"Response: {response.text}")
-                return False
+                if response.status_code == 200:  # Success status code
+                    return response.json(), wire_bytes
 
-        except requests.exceptions.ReadTimeout:
-            print("Request timeout")
+                print(
+                    f"Chunk {index + 1}/{total} failed: {response.status_code} "
+                    f"(attempt {attempt}/{max_retries})"
+                )
+                print(f"Response: {truncate_body(response.text)}")
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    return None, 0  # Client errors will not succeed on retry
+
+            except requests.exceptions.ReadTimeout:
+                self.metrics.record_request(
+                    "dune_table_insert", "timeout", time.monotonic() - request_start
+                )
+                print(
+                    f"Chunk {index + 1}/{total} request timeout "
+                    f"(attempt {attempt}/{max_retries})"
+                )
+            except Exception as e:
+                if request_start is not None:
+                    self.metrics.record_request(
+                        "dune_table_insert",
+                        type(e).__name__,
+                        time.monotonic() - request_start,
+                    )
+                print(
+                    f"Chunk {index + 1}/{total} error: {str(e)} "
+                    f"(attempt {attempt}/{max_retries})"
+                )
+            finally:
+                body.close()
+
+            if attempt < max_retries:
+                self.metrics.record_retry("dune_table_insert", "failed")
+                delay = min(60, 2**attempt)  # Backoff delay before retrying
+                self.metrics.record_sleep("upload_backoff", delay)
+                time.sleep(delay)
+
+        return None, 0
+
+    def stagedLoadCsvToTable(
+        self,
+        csv_file_path,
+        namespace,
+        table_name,
+        description,
+        schema,
+        view_query_id,
+        is_private: bool = False,
+        chunk_size_mb: float = 50.0,
+        compress: bool = False,
+        state_path: Optional[str] = None,
+    ):
+        """
+        Replace the contents of a table without ever exposing an empty or partial table.
+
+        The CSV is uploaded into a new shadow table named `<table_name>_v<version>`
+        while readers keep using the current version. Once the number of rows Dune
+        reports as written matches the number of records in the CSV, the view query
+        is repointed to the new version and the previous version is deleted.
+        Dashboards read the view query (`query_<view_query_id>`) instead of the
+        table itself, so a slow upload never blocks them and a failed load leaves
+        the existing data in place.
+
+        The current and pending versions are tracked in a local state file, keyed
+        on the path and size/mtime signature of the CSV. If a load fails during
+        upload, loading the same file again (as --resume does with the CSV recorded
+        in the run's CheckpointJournal) reuses the shadow table and resumes the
+        chunked upload; a different file discards the half-loaded shadow table.
+
+        Args:
+            csv_file_path: File path to the CSV file to be loaded
+            namespace: Namespace of the table
+            table_name: Base name of the table; versions are created as <table_name>_v<version>
+            description: Description of the table's purpose
+            schema: Column schema of the table
+            view_query_id: ID of the Dune query readers use to access the table
+            is_private: Create the versioned tables as private
+            chunk_size_mb: Maximum size of each uploaded chunk in megabytes
+            compress: Gzip-compress request bodies while streaming them
+            state_path: Optional path of the state file (defaults to data/dune_staged_tables.json)
+
+        Returns:
+            bool: True if the new version was loaded and readers were switched to it
+        """
+        if not os.path.exists(csv_file_path):
+            print(f"File not found: {csv_file_path}")
+            return False
+
+        if state_path is None:
+            data_dir = os.path.join(
+                os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                ),
+                "data",
+            )
+            os.makedirs(data_dir, exist_ok=True)
+            state_path = os.path.join(data_dir, "dune_staged_tables.json")
+
+        state_key = f"{namespace}.{table_name}"
+        all_state = self._load_staged_state(state_path)
+        table_state = all_state.setdefault(state_key, {})
+        signature = csv_file_signature(csv_file_path)
+
+        pending = table_state.get("pending")
+        if (
+            pending
+            and pending.get("path") == csv_file_path
+            and pending.get("signature") == signature
+        ):
+            shadow_table = pending["table"]
+            print(f"Resuming staged load into {namespace}.{shadow_table}")
+        else:
+            if pending:
+                print(f"Discarding stale staged table {namespace}.{pending['table']}")
+                self.deleteTable(namespace, pending["table"])
+            version = datetime.now().strftime("%Y%m%d%H%M%S")
+            shadow_table = f"{table_name}_v{version}"
+            table_state["pending"] = {
+                "table": shadow_table,
+                "path": csv_file_path,
+                "signature": signature,
+            }
+            self._save_staged_state(state_path, all_state)
+
+        # Create the shadow table (a no-op if a previous attempt already created it)
+        if not self.createTable(namespace, shadow_table, description, schema, is_private):
+            print(f"Staged load aborted: could not create {namespace}.{shadow_table}")
+            return False
+
+        # Upload into the shadow table; readers still use the current version
+        rows_written = self.insertCsvRowsToTable(
+            csv_file_path,
+            namespace,
+            shadow_table,
+            chunk_size_mb=chunk_size_mb,
+            compress=compress,
+        )
+        if rows_written is None:
+            print("Staged load aborted: upload failed, current version left in place")
+            return False
+
+        expected_rows = count_csv_records(csv_file_path)
+        if rows_written != expected_rows:
+            print(
+                f"Staged load aborted: {rows_written} rows written, "
+                f"{expected_rows} expected; current version left in place"
+            )
+            self.deleteTable(namespace, shadow_table)
+            table_state.pop("pending", None)
+            self._save_staged_state(state_path, all_state)
+            return False
+        print(f"Row count validated: {expected_rows} rows")
+
+        # Switch readers to the new version
+        if not self._point_view_query(
+            view_query_id, f"dune.{namespace}.{shadow_table}"
+        ):
+            print("Staged load aborted: view query not updated, re-run to retry the switch")
+            return False
+
+        previous_table = table_state.get("current")
+        table_state["current"] = shadow_table
+        table_state["view_query_id"] = view_query_id
+        table_state.pop("pending", None)
+        self._save_staged_state(state_path, all_state)
+        print(f"Readers switched to {namespace}.{shadow_table}")
+
+        if previous_table and previous_table != shadow_table:
+            self.deleteTable(namespace, previous_table)
+
+        return True
+
+    def _point_view_query(self, view_query_id, table_full_name) -> bool:
+        """
+        Repoint the view query readers use to a new table version.
+
+        Args:
+            view_query_id: ID of the Dune query readers use to access the table
+            table_full_name: Fully qualified name of the table version to expose
+
+        Returns:
+            bool: True if the query was updated, False otherwise
+        """
+        query_sql = f"SELECT * FROM {table_full_name}"
+        try:
+            self.dune.update_query(view_query_id, query_sql=query_sql)
+            print(f"View query {view_query_id} now reads {table_full_name}")
+            return True
+        except requests.exceptions.HTTPError as e:
+            print(f"HTTP error {e.response.status_code}: {truncate_body(e.response.text)}")
             return False
         except Exception as e:
-            print(f"Error: {str(e)}")
+            print(f"Error updating view query {view_query_id}: {str(e)}")
             return False
 
-    def queryRowDataByTableId(self, dune_table_id, row_name) -> List[str]:
+    @staticmethod
+    def _load_staged_state(state_path) -> dict:
+        """
+        Load the versions of staged tables from the local state file.
+
+        Args:
+            state_path: Path of the state file
+
+        Returns:
+            dict: State keyed by "<namespace>.<table_name>"
+        """
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                print(f"Unreadable staged table state, starting fresh: {state_path}")
+        return {}
+
+    @staticmethod
+    def _save_staged_state(state_path, state) -> None:
+        """
+        Atomically write the versions of staged tables to the local state file.
+
+        Args:
+            state_path: Path of the state file
+            state: State keyed by "<namespace>.<table_name>"
+        """
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, state_path)
+
+    def getResultPager(
+        self,
+        dune_table_id,
+        columns: Optional[List[str]] = None,
+        page_size: int = 10000,
+    ) -> QueryResultPager:
+        """
+        Create a paginated reader over the latest result of a Dune query.
+
+        Args:
+            dune_table_id: ID of the Dune query to read
+            columns: Optional list of columns to fetch (defaults to all columns)
+            page_size: Number of rows requested per page
+
+        Returns:
+            QueryResultPager: Reader yielding rows page by page
+        """
+        return QueryResultPager(
+            self.api_key,
+            dune_table_id,
+            base_url=self.base_url,
+            page_size=page_size,
+            columns=columns,
+            metrics=self.metrics,
+        )
+
+    def streamRowDataByTableId(
+        self, dune_table_id, row_name, page_size: int = 10000
+    ) -> Iterator[str]:
+        """
+        Stream the values of one column of a Dune query result page by page.
+
+        Only the requested column is downloaded, and values are yielded as soon
+        as their page arrives, so crawling can start before the whole result has
+        been read.
+
+        Args:
+            dune_table_id: ID of the Dune query to read
+            row_name: Name of the column to extract data from
+            page_size: Number of rows requested per page
+
+        Returns:
+            Iterator[str]: Lazily fetched values of the specified column
+        """
+        pager = self.getResultPager(dune_table_id, [row_name], page_size)
+        return pager.iter_values(row_name)
+
+    def queryRowDataByTableId(
+        self, dune_table_id, row_name, rank_column: Optional[str] = None
+    ) -> List[str]:
         """
         Query and extract specific row data from a Dune Analytics table.
 
-        This method retrieves the latest query results from a Dune table using the provided
-        table ID and extracts values from a specified column across all rows in the result set.
+        This method pages through the latest query results from a Dune table using the
+        provided table ID and extracts values from a specified column across all rows in the
+        result set. Only the requested column is downloaded.
 
         Args:
             dune_table_id: ID of the Dune table to query
             row_name: Name of the column to extract data from
+            rank_column: Optional numeric column to order the values by, highest
+                first (see queryRankedRowDataByTableId)
 
         Returns:
             List[str]: List of extracted values from the specified column, or empty list if error occurs
         """
+        if rank_column:
+            return [
+                value
+                for value, _ in self.queryRankedRowDataByTableId(
+                    dune_table_id, row_name, rank_column
+                )
+            ]
         try:
-            query_result = self.dune.get_latest_result(dune_table_id)
+            pager = self.getResultPager(dune_table_id, [row_name])
+            extracted_values = list(
+                pager.iter_values(row_name)
+            )  # Container for storing extracted column values
+
+            print("\n=== Data Extraction Summary ===")
+            print(f"Total rows: {pager.rows_read} ({pager.pages_read} pages)")
+            print(f"Total values extracted: {len(extracted_values)}")
 
-            extracted_values = []  # Container for storing extracted column values
+            return extracted_values
 
-            if hasattr(query_result, "result") and hasattr(query_result.result, "rows"):
-                for row in query_result.result.rows:
-                    if row_name in row:
-                        extracted_values.append(row[row_name])
+        except Exception as e:
+            print(f"Error fetching data from Dune Analytics: {str(e)}")
+            return []
+
+    def queryRankedRowDataByTableId(
+        self, dune_table_id, row_name, rank_column
+    ) -> List[Tuple[str, Optional[float]]]:
+        """
+        Query one column of a Dune table together with a ranking column.
 
-            total_rows = (
-                len(query_result.result.rows)
-                if hasattr(query_result, "result")
-                and hasattr(query_result.result, "rows")
-                else 0
-            )  # Total number of rows returned from query result
+        Both columns are downloaded page by page and the values are returned
+        highest rank first, e.g. wallets ordered by their USD balance, so the
+        crawlers can process the most important addresses first. Values whose
+        rank is missing or not numeric come last, in their original order.
 
+        Args:
+            dune_table_id: ID of the Dune table to query
+            row_name: Name of the column to extract data from
+            rank_column: Name of the numeric column ranking each value
+
+        Returns:
+            List[Tuple[str, Optional[float]]]: (value, rank) pairs, highest rank
+                first, or empty list if error occurs
+        """
+        try:
+            pager = self.getResultPager(dune_table_id, [row_name, rank_column])
+            ranked_values = list(pager.iter_ranked(row_name, rank_column))
+            ranked_values.sort(
+                key=lambda pair: (pair[1] is None, -(pair[1] or 0.0))
+            )  # Stable, so equal ranks keep the query order
+
+            unranked_count = sum(1 for _, rank in ranked_values if rank is None)
             print("\n=== Data Extraction Summary ===")
-            print(f"Total rows: {total_rows}")
-            print(f"Total values extracted: {len(extracted_values)}")
+            print(f"Total rows: {pager.rows_read} ({pager.pages_read} pages)")
+            print(f"Total values extracted: {len(ranked_values)}")
+            print(f"Ranked by {rank_column}: {len(ranked_values) - unranked_count} values")
+            if unranked_count:
+                print(f"⚠️  {unranked_count} values without a numeric {rank_column}, queued last")
 
-            return extracted_values
+            return ranked_values
 
         except Exception as e:
             print(f"Error fetching data from Dune Analytics: {str(e)}")
@@ -0,0 +1,87 @@
+import sys
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.arkham.portfolio_model import Network, Token, WalletPortfolio
+from services.arkham.portfolio_snapshot import PortfolioSnapshotStore
+
+CHAINS = ["ethereum"]
+
+
+def make_portfolio(address: str, balances: dict) -> WalletPortfolio:
+    """Build a one-chain portfolio holding the given {token_id: balance}"""
+    tokens = {
+        token_id: Token(
+            id=token_id,
+            name=token_id,
+            symbol=token_id.upper(),
+            balance=Decimal(balance),
+            price=Decimal("2"),
+            usd=Decimal(balance) * 2,
+        )
+        for token_id, balance in balances.items()
+    }
+    return WalletPortfolio(
+        address=address, networks={"ethereum": Network(name="ethereum", tokens=tokens)}
+    )
+
+
+class PortfolioSnapshotDroppedAddressTest(unittest.TestCase):
+    """Addresses that drop out of the address list are closed out in the history"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "snapshot.sqlite")
+        store = PortfolioSnapshotStore(self.db_path)
+        store.diff(make_portfolio("0xaaa", {"weth": "1"}), CHAINS)
+        store.diff(make_portfolio("0xbbb", {"usdc": "5", "dai": "7"}), CHAINS)
+        store.commit()
+        store.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_dropped_address_is_removed_and_committed(self):
+        store = PortfolioSnapshotStore(self.db_path)
+        self.assertEqual(
+            store.diff(make_portfolio("0xaaa", {"weth": "1"}), CHAINS), []
+        )
+
+        rows = store.diff_dropped(["0xAAA"])  # 0xbbb is no longer requested
+        self.assertEqual(
+            sorted((row[1], row[3], row[4], row[6]) for row in rows),
+            [
+                ("removed", "0xbbb", "dai", "0"),
+                ("removed", "0xbbb", "usdc", "0"),
+            ],
+        )
+        self.assertEqual(store.change_counts["removed"], 2)
+
+        store.commit()
+        self.assertEqual(store.diff_dropped(["0xaaa"]), [])  # Not closed out twice
+        store.close()
+
+    def test_requested_but_unfetched_address_keeps_its_snapshot(self):
+        store = PortfolioSnapshotStore(self.db_path)
+        # 0xbbb failed this run but is still in the address list
+        self.assertEqual(store.diff_dropped(["0xaaa", "0xbbb"]), [])
+        store.commit()
+
+        rows = store.diff(make_portfolio("0xbbb", {"usdc": "5", "dai": "7"}), CHAINS)
+        self.assertEqual(rows, [])
+        store.close()
+
+    def test_rollback_keeps_dropped_address(self):
+        store = PortfolioSnapshotStore(self.db_path)
+        self.assertEqual(len(store.diff_dropped(["0xaaa"])), 2)
+        store.rollback()  # Upload failed, nothing committed
+
+        self.assertEqual(len(store.diff_dropped(["0xaaa"])), 2)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()